@@ -0,0 +1,53 @@
+"""采购看板的分析计算：不依赖 Streamlit 的纯函数，输入为 YearData，输出为数据表或 plotly 图表对象。
+
+看板页面只负责渲染；同样的计算可以在批处理任务或基准测试中直接调用。
+各子模块在第一次取用其中的名称时才导入（PEP 562），只用到数据加载时不会导入 plotly。
+"""
+import importlib
+
+_EXPORTS = {
+    'analytics.dataset': [
+        'YearColumns', 'YearData', 'year_columns', 'year_data', 'filter_year_data', 'load_dataset',
+        'load_delta_with_ids',
+    ],
+    'analytics.factory': ['factory_scale_figure', 'factory_growth_figure', 'factory_scale_lines'],
+    'analytics.concentration': ['supplier_concentration', 'bulk_material_growth'],
+    'analytics.category': [
+        'category_summary', 'category_matrix_figure', 'growth_rankings', 'growth_ranking_figure',
+        'category_trends', 'trend_matrix_figure', 'category_changes', 'category_change_conclusions',
+        'category_suppliers', 'category_supplier_pie', 'subcategory_growth', 'growth_label',
+        'subcategory_amount_figure', 'subcategory_growth_figure', 'subcategory_growth_summary',
+        'top_growth_subcategories', 'top_growth_subcategories_figure', 'subcategory_budget', 'subcategory_budget_donut',
+    ],
+    'analytics.suppliers': [
+        'TIERS', 'supplier_matrix_figure', 'top_suppliers', 'top_supplier_changes', 'category_supplier_stats',
+        'category_supplier_donut', 'supplier_tiers', 'tier_distribution_figures', 'tier_suppliers', 'tier_summary',
+        'tier_category_figure', 'top_growth_suppliers', 'top_growth_suppliers_figure', 'top_growth_supplier_table',
+        'subcategory_suppliers', 'subcategory_supplier_count', 'subcategory_budget_suppliers',
+    ],
+    'analytics.risk': [
+        'RISK_MATRIX', 'RISK_TYPES', 'significant_decline', 'risk_matrix_figure', 'risk_suppliers', 'risk_type_suppliers',
+    ],
+    'analytics.details': ['subcategory_table', 'supplier_detail_columns', 'supplier_detail', 'all_supplier_detail'],
+    'analytics.search': ['SupplierSearchIndex', 'build_search_index', 'search_suppliers'],
+    'analytics.profile': [
+        'SupplierProfileIndex', 'build_profile_index', 'supplier_profile', 'supplier_factory_year_figure',
+        'supplier_category_figure',
+    ],
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module 'analytics' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
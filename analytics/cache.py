@@ -0,0 +1,139 @@
+"""进程内的计算结果缓存：按数据版本分组，有总内存上限、按对象大小淘汰的 LRU 与 TTL。
+
+与 st.cache_data 不同，命中时直接返回缓存的对象而不是反序列化的副本，调用方不能原地修改返回值。
+键的约定与 st.cache_data 相同：以下划线开头的参数不参与缓存键；名为 version 的参数作为数据版本，
+数据更新后可以按版本整体失效。
+"""
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from config import COMPUTE_CACHE_MB, COMPUTE_CACHE_TTL
+from memory import deep_size
+
+
+def _freeze(value):
+    # 列表、字典等参数转为可哈希的元组
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, set):
+        return tuple(sorted(value))
+    return value
+
+
+class ComputeCache:
+    def __init__(self, max_bytes=COMPUTE_CACHE_MB * 2 ** 20, ttl=COMPUTE_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # (version, 函数, 参数) -> (值, 字节, 过期时间)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.oversized = 0
+
+    def get(self, key):
+        """返回 (是否命中, 值)；过期的条目在读取时移除。"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            value, size, expires = entry
+            if expires is not None and expires < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def put(self, key, value):
+        size = deep_size(value)
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            # 单个结果超过总上限时不缓存，避免清空其他全部条目
+            if size > self.max_bytes:
+                self.oversized += 1
+                return value
+            self._entries[key] = (value, size, expires)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def invalidate(self, version=None, keep=None, function=None):
+        """移除指定数据版本（或除 keep 以外所有版本）的条目，function 指定时只移除该函数的条目；返回移除的条目数。"""
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if (version is None or key[0] == version) and (keep is None or key[0] != keep)
+                and (function is None or key[1] == function)
+            ]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def clear(self):
+        return self.invalidate()
+
+    def memoize(self, function=None):
+        """装饰器，用法与 st.cache_data 相同：@compute_cache.memoize()。"""
+        def decorator(func):
+            name = f'{func.__module__}.{func.__qualname__}'
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                params = [(k, _freeze(v)) for k, v in bound.arguments.items() if not k.startswith('_')]
+                key = (bound.arguments.get('version'), name, tuple(params))
+                hit, value = self.get(key)
+                if hit:
+                    return value
+                return self.put(key, func(*args, **kwargs))
+
+            wrapper.clear = lambda: self.invalidate(function=name)
+            return wrapper
+
+        return decorator(function) if function is not None else decorator
+
+    def stats(self):
+        with self._lock:
+            versions = {}
+            for (version, _, _), (_, size, _) in self._entries.items():
+                entry = versions.setdefault(version, {'entries': 0, 'bytes': 0})
+                entry['entries'] += 1
+                entry['bytes'] += size
+            return {
+                'entries': len(self._entries), 'bytes': self._bytes, 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'expirations': self.expirations, 'oversized': self.oversized, 'versions': versions,
+            }
+
+    def report(self):
+        """各条目的版本、函数、参数与大小，按最近使用排序。"""
+        with self._lock:
+            rows = [
+                {'版本': version, '函数': name.rsplit('.', 1)[-1], '参数': ', '.join(f'{k}={v}' for k, v in params
+                                                                              if k != 'version'), '字节': size}
+                for (version, name, params), (_, size, _) in reversed(self._entries.items())
+            ]
+        return pd.DataFrame(rows, columns=['版本', '函数', '参数', '字节'])
+
+
+# 看板与批处理共用的进程级缓存
+compute_cache = ComputeCache()
@@ -0,0 +1,279 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+def category_summary(data):
+    """按 Category 汇总两个年度的 Spend、增长金额与增长率。"""
+    cols = data.columns
+    summary = data.category_data.groupby('Category').agg({
+        cols.base_spend: 'sum',
+        cols.compare_spend: 'sum',
+        '增长金额': 'sum'
+    }).reset_index()
+    summary['增长率'] = (summary['增长金额'] / summary[cols.base_spend] * 100).round(1)
+    return summary
+
+
+def category_matrix_figure(data, summary):
+    """品类战略矩阵：基准年度规模 × 增长率，气泡大小为对比年度规模。"""
+    cols = data.columns
+    fig = px.scatter(
+        summary,
+        x=cols.base_spend,
+        y='增长率',
+        size=cols.compare_spend,
+        color='Category',
+        text='Category',
+        title="品类战略矩阵分析",
+        labels={
+            cols.base_spend: f'{cols.base_year}年采购规模',
+            '增长率': '增长率(%)',
+            cols.compare_spend: f'{cols.compare_year}年预测规模'
+        }
+    )
+    fig.update_traces(textposition='top center')
+    fig.update_layout(height=600)
+    return fig
+
+
+def growth_rankings(data, n=10, min_base=100000):
+    """增长率最高/最低的 n 个子品类，不含新增、停止采购及基准年度基数不足 min_base 的子品类。"""
+    category_data = data.category_data
+    valid_growth_data = category_data[
+        (category_data['增长率'] != float('inf')) &
+        (category_data['增长率'] != -100) &
+        (category_data[data.columns.base_spend] > min_base)
+    ]
+    return valid_growth_data.nlargest(n, '增长率'), valid_growth_data.nsmallest(n, '增长率')
+
+
+def growth_ranking_figure(ranking, title):
+    fig = px.bar(
+        ranking,
+        x='Sub category',
+        y='增长率',
+        title=title,
+        color='Category',
+        text=ranking['增长率'].apply(lambda x: f'{x:.1f}%')
+    )
+    fig.update_layout(
+        height=400,
+        xaxis_title="子品类",
+        yaxis_title="增长率(%)",
+        xaxis_tickangle=-45,
+        showlegend=True
+    )
+    return fig
+
+
+def category_trends(data, summary):
+    """两个年度各品类的采购占比与年度变化额，返回 (基准年度, 对比年度)。"""
+    cols = data.columns
+    trends = []
+    for spend_col in (cols.base_spend, cols.compare_spend):
+        analysis = summary.copy()
+        analysis['采购占比'] = analysis[spend_col] / analysis[spend_col].sum() * 100
+        analysis['年度变化额'] = analysis[cols.compare_spend] - analysis[cols.base_spend]
+        trends.append(analysis)
+    return tuple(trends)
+
+
+def trend_matrix_figure(analysis, year, size_col):
+    """品类趋势矩阵：采购占比 × 增长率，以零增长和平均占比为分界。"""
+    fig = px.scatter(
+        analysis,
+        x='采购占比',
+        y='增长率',
+        size=size_col,
+        color='年度变化额',
+        text='Category',
+        labels={
+            '采购占比': f'{year}年采购占比 (%)',
+            '增长率': '增长率 (%)',
+            '年度变化额': '年度变化金额'
+        }
+    )
+    fig.add_hline(y=0, line_dash="dash", line_color="gray")
+    fig.add_vline(x=analysis['采购占比'].mean(), line_dash="dash", line_color="gray")
+    fig.update_layout(height=500)
+    return fig
+
+
+def category_changes(data, analysis_base, analysis_compare):
+    """各品类采购占比的变化，按占比变化降序。"""
+    cols = data.columns
+    return pd.DataFrame({
+        'Category': analysis_base['Category'],
+        f'{cols.base_year}采购占比': analysis_base['采购占比'],
+        f'{cols.compare_year}采购占比': analysis_compare['采购占比'],
+        '占比变化': analysis_compare['采购占比'] - analysis_base['采购占比'],
+        cols.base_spend: analysis_base[cols.base_spend],
+        cols.compare_spend: analysis_base[cols.compare_spend],
+        '增长率': analysis_base['增长率']
+    }).sort_values('占比变化', ascending=False)
+
+
+def category_change_conclusions(data, changes):
+    """占比变化最大的品类，以及占比跨过平均值的新晋重要/地位下降品类。"""
+    base_share = changes[f'{data.columns.base_year}采购占比']
+    compare_share = changes[f'{data.columns.compare_year}采购占比']
+    return {
+        'up_cat': changes.iloc[0]['Category'],
+        'up_pct': changes.iloc[0]['占比变化'],
+        'down_cat': changes.iloc[-1]['Category'],
+        'down_pct': changes.iloc[-1]['占比变化'],
+        'new_important': ', '.join(changes[
+            (base_share < base_share.mean()) & (compare_share > compare_share.mean())
+        ]['Category'].tolist()),
+        'declining': ', '.join(changes[
+            (base_share > base_share.mean()) & (compare_share < compare_share.mean())
+        ]['Category'].tolist()),
+    }
+
+
+def category_suppliers(data, category):
+    """某品类下的供应商及其基准年度采购占比。"""
+    supplier_data = data.supplier_data
+    base_total = data.columns.base_total
+    suppliers = supplier_data[supplier_data['Category'] == category].copy()
+    suppliers['采购占比'] = suppliers[base_total] / suppliers[base_total].sum() * 100
+    return suppliers
+
+
+def category_supplier_pie(data, suppliers, category):
+    fig = px.pie(
+        suppliers,
+        values=data.columns.base_total,
+        names='供应商',
+        title=f"{category}供应商采购金额分布"
+    )
+    fig.update_layout(height=300)
+    return fig
+
+
+def subcategory_growth(data):
+    """子类别增长金额与增长率（不取整）；基准为0时新增记为 inf，对比年度为0时停止采购记为 -100。"""
+    cols = data.columns
+    subcategory_data = data.category_data.copy()
+    base = subcategory_data[cols.base_spend]
+    compare = subcategory_data[cols.compare_spend]
+    subcategory_data['增长金额'] = compare - base
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = subcategory_data['增长金额'] / base * 100
+    subcategory_data['增长率'] = np.select(
+        [(base == 0) & (compare == 0), (base == 0) & (compare > 0), compare == 0],
+        [0.0, float('inf'), -100.0],
+        default=rate
+    )
+    return subcategory_data
+
+
+def growth_label(rate):
+    return '新增' if rate == float('inf') else ('停止' if rate == -100 else f'{rate:.1f}%')
+
+
+def subcategory_amount_figure(data, detail, category):
+    """某品类下各子类别两个年度的采购金额对比。"""
+    cols = data.columns
+    fig = go.Figure()
+    for year, spend_col in ((cols.base_year, cols.base_spend), (cols.compare_year, cols.compare_spend)):
+        fig.add_trace(go.Bar(
+            name=f'{year}年',
+            x=detail['Sub category'],
+            y=detail[spend_col],
+            text=detail[spend_col].apply(lambda x: f'{x:,.0f}'),
+            textposition='auto',
+        ))
+    fig.update_layout(
+        title=f"{category} - Sub Category采购金额对比",
+        barmode='group',
+        height=400,
+        yaxis_title="采购金额",
+        xaxis_title="Sub Category"
+    )
+    return fig
+
+
+def subcategory_growth_figure(detail, category):
+    """某品类下各子类别的增长率，新增按 100% 显示。"""
+    rate = detail['增长率']
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=detail['Sub category'],
+        y=rate.replace(float('inf'), 100),
+        text=rate.apply(growth_label),
+        textposition='auto',
+        marker_color=np.where(rate < -30, 'red', np.where(rate > 30, 'green', 'orange'))
+    ))
+    fig.update_layout(
+        title=f"{category} - Sub Category增长率分析",
+        height=400,
+        yaxis_title="增长率 (%)",
+        xaxis_title="Sub Category"
+    )
+    return fig
+
+
+def subcategory_growth_summary(detail):
+    """增长率统计（不含新增和停止项）及新增、停止、高增长、大幅下降的子类别。"""
+    rate = detail['增长率']
+    valid_growth = rate[(rate != float('inf')) & (rate != -100)]
+    return {
+        'avg_growth': valid_growth.mean() if not valid_growth.empty else 0,
+        'max_growth': valid_growth.max() if not valid_growth.empty else 0,
+        'min_growth': valid_growth.min() if not valid_growth.empty else 0,
+        'new_items': detail[rate == float('inf')],
+        'stopped_items': detail[rate == -100],
+        'high_growth_items': detail[(rate > 30) & (rate != float('inf'))].sort_values('增长率', ascending=False),
+        'low_growth_items': detail[(rate < -30) & (rate != -100)].sort_values('增长率'),
+    }
+
+
+def top_growth_subcategories(data, n=10):
+    """按绝对增长金额排名的子类别。"""
+    return data.category_data.nlargest(n, '增长金额').reset_index(drop=True)
+
+
+def top_growth_subcategories_figure(data, top):
+    cols = data.columns
+    fig = px.bar(
+        top,
+        x='Sub category',
+        y='增长金额',
+        title=f"Top 10 子类别 - 绝对增长金额 ({cols.compare_label} vs {cols.base_label})",
+        text='增长金额',
+        labels={'Sub category': '子类别名称', '增长金额': '增长金额 (元)'},
+        color='Category',  # 按父品类着色
+        hover_data=['Category', '增长率']
+    )
+    fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+    fig.update_layout(xaxis_tickangle=-45, height=500, yaxis_title="增长金额 (元)")
+    return fig
+
+
+def subcategory_budget(data):
+    """按 Category 和 Sub Category 聚合对比年度预算，只保留预算大于0的子类别。"""
+    compare_total = data.columns.compare_total
+    budget = data.supplier_data.groupby(['Category', 'Sub Category'], observed=True)[compare_total].sum().reset_index()
+    return budget[budget[compare_total] > 0]
+
+
+def subcategory_budget_donut(data, budget, category):
+    """某品类下各子类别的对比年度预算占比（环形图）。"""
+    fig = go.Figure(data=[go.Pie(
+        labels=budget['Sub Category'],
+        values=budget[data.columns.compare_total],
+        hole=.4,
+        textinfo='percent',
+        hoverinfo='label+value+percent',
+        insidetextorientation='radial'
+    )])
+    fig.update_layout(
+        title_text=f"{category} - 子类别预算占比",
+        height=400,
+        showlegend=False,  # 子类别较多时图例意义不大
+        margin=dict(t=50, l=0, r=0, b=0)
+    )
+    return fig
@@ -0,0 +1,22 @@
+from entity_resolution import supplier_totals
+
+
+def supplier_concentration(data, dependency_share=0.1):
+    """基准年度的供应商集中度指标（按供应商ID合并同一供应商的多个子类别/写法）。"""
+    spend = supplier_totals(data.supplier_data, data.columns.base_total)
+    total = spend.sum()
+    return {
+        'spend_by_supplier': spend,
+        'total_spend': total,
+        'top10_share': spend.nlargest(10).sum() / total * 100,
+        'top5_concentration': spend.nlargest(5).sum() / total * 100,
+        'high_dependency': int((spend / total > dependency_share).sum()),
+        'max_supplier_share': spend.max() / total * 100,
+    }
+
+
+def bulk_material_growth(data):
+    """铜、铝等大宗原材料供应商的平均增长率。"""
+    supplier_data = data.supplier_data
+    bulk = supplier_data[supplier_data['Category'].str.contains('Copper|Aluminum', na=False)]
+    return bulk['增长率'].mean()
@@ -0,0 +1,146 @@
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    DATA_FILES, FILE_ENCODING, FACTORIES, SUPPLIER_ID_MAP_FILE, SUPPLIER_ALIAS_FILE, VALIDATION_FAIL_FAST,
+    DELTA_DIR
+)
+from schema import load_validated, load_delta
+from entity_resolution import build_supplier_index, attach_supplier_ids
+from reconciliation import reconcile, factory_unit_key
+from datastore import (
+    build_store, year_slice, supplier_column, category_column, factory_column, apply_delta, delta_files, delta_version
+)
+
+
+@dataclass
+class YearColumns:
+    """所选两个年度在各宽表中的列名。"""
+    base_year: int
+    compare_year: int
+    base_total: str         # 如 2024合计入库金额
+    compare_total: str      # 如 2025合计预算金额
+    base_factory: dict      # 工厂 -> 分厂列名
+    compare_factory: dict
+    base_spend: str         # 如 2024年Spend
+    compare_spend: str
+    base_unit: str          # 如 2024年入库金额
+    compare_unit: str
+    base_label: str         # 如 2024实际
+    compare_label: str      # 如 2025预算
+
+
+@dataclass
+class YearData:
+    """两个年度的宽表视图及对应列名，是 analytics 中各计算函数的统一输入。"""
+    factory_data: pd.DataFrame
+    supplier_data: pd.DataFrame
+    category_data: pd.DataFrame
+    columns: YearColumns
+
+
+def year_columns(store, base_year, compare_year):
+    base_total = supplier_column(store, base_year)
+    compare_total = supplier_column(store, compare_year)
+    return YearColumns(
+        base_year=base_year,
+        compare_year=compare_year,
+        base_total=base_total,
+        compare_total=compare_total,
+        base_factory={factory: supplier_column(store, base_year, factory) for factory in FACTORIES},
+        compare_factory={factory: supplier_column(store, compare_year, factory) for factory in FACTORIES},
+        base_spend=category_column(store, base_year),
+        compare_spend=category_column(store, compare_year),
+        base_unit=factory_column(store, base_year),
+        compare_unit=factory_column(store, compare_year),
+        base_label=f"{base_year}{'预算' if '预算' in base_total else '实际'}",
+        compare_label=f"{compare_year}{'预算' if '预算' in compare_total else '实际'}",
+    )
+
+
+def year_data(store, base_year, compare_year):
+    """按所选年度从 DataStore 取宽表视图（只在年度切片上计算，不重新读取文件）。"""
+    factory_data, supplier_data, category_data = year_slice(store, base_year, compare_year)
+    return YearData(factory_data, supplier_data, category_data, year_columns(store, base_year, compare_year))
+
+
+def filter_year_data(data, category=None, sub_category=None, factory=None):
+    """按 Category / Sub Category 过滤各表的行；factory 指定时供应商的合计列换为该工厂的分厂列，增长金额/增长率随之重算。
+
+    指定 factory 时只保留在该工厂两个年度中至少一年有金额的供应商行（两年均为0或空的行不属于该工厂）；
+    子类别 Spend 没有工厂维度，category_data 不变。
+    """
+    supplier_data, category_data, factory_data = data.supplier_data, data.category_data, data.factory_data
+    if category is not None:
+        supplier_data = supplier_data[supplier_data['Category'] == category]
+        category_data = category_data[category_data['Category'] == category]
+    if sub_category is not None:
+        supplier_data = supplier_data[supplier_data['Sub Category'] == sub_category]
+        category_data = category_data[category_data['Sub category'] == sub_category]
+    columns = data.columns
+    if factory is not None:
+        columns = replace(
+            columns, base_total=columns.base_factory[factory], compare_total=columns.compare_factory[factory]
+        )
+        active = (np.nan_to_num(supplier_data[columns.base_total].to_numpy(dtype=float)) != 0) | \
+            (np.nan_to_num(supplier_data[columns.compare_total].to_numpy(dtype=float)) != 0)
+        supplier_data = supplier_data[active]
+        base = supplier_data[columns.base_total].to_numpy(dtype=float)
+        compare = supplier_data[columns.compare_total].to_numpy(dtype=float)
+        # 与 datastore 一致：增长率为取整后的百分数，基准为0时为空
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.where(base != 0, np.round((compare - base) / base * 100), np.nan)
+        supplier_data = supplier_data.assign(增长金额=compare - base, 增长率=rate)
+        factory_data = factory_data[factory_data['Business Unit'].map(factory_unit_key) == factory]
+    return YearData(
+        factory_data.reset_index(drop=True), supplier_data.reset_index(drop=True),
+        category_data.reset_index(drop=True), columns
+    )
+
+
+def load_delta_with_ids(path, encoding=FILE_ENCODING, fail_fast=VALIDATION_FAIL_FAST,
+                        map_path=SUPPLIER_ID_MAP_FILE, alias_path=SUPPLIER_ALIAS_FILE):
+    """读取并校验一个入库增量文件，并映射供应商ID；增量中的名称不改变已有供应商的标准名称。"""
+    delta, _ = load_delta(path, encoding, fail_fast=fail_fast)
+    supplier_map = build_supplier_index(delta['供应商'], map_path, alias_path, keep_canonical=True)
+    return attach_supplier_ids(delta, supplier_map)
+
+
+def load_dataset(paths=DATA_FILES, encoding=FILE_ENCODING, fail_fast=VALIDATION_FAIL_FAST,
+                 map_path=SUPPLIER_ID_MAP_FILE, alias_path=SUPPLIER_ALIAS_FILE, delta_dir=DELTA_DIR):
+    """读取、校验并整理三个数据文件，返回 (DataStore, 数据质量报告)。
+
+    结构校验存在致命错误时抛出 SchemaValidationError。delta_dir 为 None 时不重放月度增量。
+    """
+    # 按声明的结构读取并校验三个CSV文件（缺列、类型转换失败、重复记录等致命错误会拒绝加载）
+    frames, validation_warnings = load_validated(paths, encoding, fail_fast=fail_fast)
+    factory_data = frames['factory_data']
+    supplier_data = frames['supplier_data']
+    category_data = frames['category_data']
+
+    # 供应商实体识别：将同一供应商的不同写法映射到统一的供应商ID
+    supplier_map = build_supplier_index(supplier_data['供应商'], map_path, alias_path)
+    supplier_data = attach_supplier_ids(supplier_data, supplier_map)
+
+    # 多年度长表存储：各页面按所选的两个年度从中取宽表视图
+    store = build_store(factory_data, supplier_data, category_data)
+    # 按顺序重放已追加的月度入库增量
+    if delta_dir is not None:
+        for path in delta_files(delta_dir):
+            apply_delta(store, load_delta_with_ids(path, encoding, fail_fast, map_path, alias_path))
+        store.version = delta_version(store.base_version, delta_dir)
+
+    # 跨文件对账：子类别Spend、工厂合计与供应商明细是否一致，增长金额/增长率是否可重算
+    # 文件中的增长金额/增长率对应最近两个年度
+    reconcile_summary, reconcile_details = reconcile(
+        factory_data, supplier_data, category_data,
+        base_year=store.years[-2], compare_year=store.years[-1]
+    )
+    quality_report = {
+        'summary': reconcile_summary,
+        'details': reconcile_details,
+        'validation': validation_warnings
+    }
+    return store, quality_report
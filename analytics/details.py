@@ -0,0 +1,37 @@
+def subcategory_table(data, category):
+    """某品类下各子类别两个年度的 Spend 与增长情况。"""
+    cols = data.columns
+    category_data = data.category_data
+    subcategories = category_data[category_data['Category'] == category]
+    return subcategories[['Sub category', cols.base_spend, cols.compare_spend, '增长金额', '增长率']].copy()
+
+
+def supplier_detail_columns(data):
+    """供应商明细表的列顺序：两个年度的分厂列、合计与占比，以及增长情况。"""
+    cols = data.columns
+    columns = ['供应商']
+    for year, factory_cols, total_col in (
+        (cols.base_year, cols.base_factory, cols.base_total),
+        (cols.compare_year, cols.compare_factory, cols.compare_total),
+    ):
+        columns += list(factory_cols.values()) + [total_col, f'{year}年占比']
+    return columns + ['增长金额', '增长率']
+
+
+def supplier_detail(data, sub_category):
+    """某子类别下各供应商在不同工厂的采购金额及两个年度的份额。"""
+    cols = data.columns
+    supplier_data = data.supplier_data
+    detail = supplier_data[supplier_data['Sub Category'] == sub_category].copy()
+    for year, total_col in ((cols.base_year, cols.base_total), (cols.compare_year, cols.compare_total)):
+        detail[f'{year}年占比'] = detail[total_col] / detail[total_col].sum() * 100
+    return detail[supplier_detail_columns(data)]
+
+
+def all_supplier_detail(data):
+    """全部子类别的供应商明细，占比按所在子类别计算，用于导出完整供应商清单。"""
+    cols = data.columns
+    detail = data.supplier_data.copy()
+    for year, total_col in ((cols.base_year, cols.base_total), (cols.compare_year, cols.compare_total)):
+        detail[f'{year}年占比'] = detail[total_col] / detail.groupby('Sub Category')[total_col].transform('sum') * 100
+    return detail[['Category', 'Sub Category'] + supplier_detail_columns(data)]
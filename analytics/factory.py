@@ -0,0 +1,75 @@
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+def factory_scale_figure(data):
+    """各工厂两个年度的采购规模对比（分组柱状图）。"""
+    cols = data.columns
+    units = data.factory_data.set_index('Business Unit')
+    fig = go.Figure()
+    for factory in units.index:
+        if factory != '合计':
+            values = [units.at[factory, cols.base_unit], units.at[factory, cols.compare_unit]]
+            fig.add_trace(go.Bar(
+                name=factory,
+                x=[f'{cols.base_year}年', f'{cols.compare_year}年'],
+                y=values,
+                text=[f"{value/10000:.0f}万" for value in values]
+            ))
+
+    fig.update_layout(
+        title="各工厂采购规模对比",
+        barmode='group',
+        height=400
+    )
+    return fig
+
+
+def factory_growth_figure(data):
+    """各工厂对比年度的增长率。"""
+    growth_data = data.factory_data[data.factory_data['Business Unit'] != '合计'].copy()
+    fig = px.bar(
+        growth_data,
+        x='Business Unit',
+        y='增长率',
+        text=growth_data['增长率'].apply(lambda x: f'{x}%'),
+        title=f"各工厂{data.columns.compare_year}年预测增长率",
+        color='增长率',
+        color_continuous_scale='RdYlGn'
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+def _amount(value):
+    return f"{value/1e8:.2f}亿"
+
+
+def _change(base, compare):
+    if not base:
+        return "无基准年度数据"
+    rate = (compare - base) / base * 100
+    return f"增长{rate:.0f}%" if rate >= 0 else f"下降{-rate:.0f}%"
+
+
+def factory_scale_lines(data):
+    """按所选年度生成各工厂及天津/苏州地区的规模说明，返回 (工厂说明, 地区汇总) 两个列表。"""
+    cols = data.columns
+    units = data.factory_data.set_index('Business Unit')
+    total = units.at['合计', cols.compare_unit] if '合计' in units.index else units[cols.compare_unit].sum()
+    units = units[units.index != '合计']
+    factory_lines = [
+        f"{name}{cols.base_label}{_amount(row[cols.base_unit])}，{cols.compare_label}{_amount(row[cols.compare_unit])}，"
+        f"{_change(row[cols.base_unit], row[cols.compare_unit])}"
+        for name, row in units.iterrows()
+    ]
+    # 苏州铜盟以外的工厂都在天津
+    suzhou = units.index.str.startswith('苏州')
+    regions = []
+    for region, mask in (('天津', ~suzhou), ('苏州', suzhou)):
+        base, compare = units.loc[mask, cols.base_unit].sum(), units.loc[mask, cols.compare_unit].sum()
+        regions.append({
+            '地区': region, '基准': base, '对比': compare, '变化': _change(base, compare),
+            '占比': compare / total * 100 if total else 0.0,
+        })
+    return factory_lines, regions
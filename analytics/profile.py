@@ -0,0 +1,142 @@
+"""供应商画像：按供应商ID分组的行号索引，打开任一供应商的画像只需一次字典查找和一段切片，不扫描 supplier_data。
+
+同一供应商ID可能出现在多个子类别、多个工厂；索引按所选年度构建一次，
+各行预先附上子类别份额、供应商等级与风险标记，各供应商分工厂、分年度的金额也预先汇总。
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from config import FACTORIES
+from datastore import BUDGET, FACTORY_CODES, supplier_year_values
+from analytics.details import all_supplier_detail
+from analytics.risk import risk_suppliers
+from analytics.suppliers import TIERS, supplier_tiers
+
+
+@dataclass
+class SupplierProfileIndex:
+    """一个数据版本、一组对比年度的供应商画像索引；第 i 个供应商的行为 rows.iloc[starts[i]:starts[i + 1]]。"""
+    base_year: int
+    compare_year: int
+    base_total: str
+    compare_total: str
+    years: list                 # factory_years 的年度轴
+    year_labels: list           # 各年度的标签，如 ['2024实际', '2025预算']
+    positions: dict             # 供应商ID -> 序号
+    starts: np.ndarray          # 各供应商在 rows 中的起始行，长度为供应商数 + 1
+    rows: pd.DataFrame          # 按供应商ID排序的明细行，同一供应商的行相邻
+    factory_years: np.ndarray   # (供应商, 工厂及合计, 年度) 的金额
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, supplier_id):
+        return supplier_id in self.positions
+
+
+def _year_label(store, year):
+    return f"{year}{'预算' if store.year_kind(year) == BUDGET else '实际'}"
+
+
+def build_profile_index(store, data):
+    """由 DataStore 与所选年度的 YearData 构建索引；data.supplier_data 的行与 store 的供应商维度一一对应。"""
+    cols = data.columns
+    codes, supplier_ids = pd.factorize(data.supplier_data['供应商ID'].astype(str), sort=True)
+    order = np.argsort(codes, kind='stable')
+    starts = np.searchsorted(codes[order], np.arange(len(supplier_ids) + 1))
+
+    # 子类别份额与 all_supplier_detail 一致，按所在子类别计算；等级与风险标记与供应商管理、风险预警页面一致
+    rows = all_supplier_detail(data)
+    rows['供应商等级'] = supplier_tiers(data)['供应商等级'].to_numpy()
+    risks = risk_suppliers(data)
+    rows['集中度风险'] = risks['集中度风险'].to_numpy()
+    rows['增长风险'] = risks['增长风险'].to_numpy()
+    rows.insert(0, '供应商ID', data.supplier_data['供应商ID'].astype(str).to_numpy())
+    rows.insert(3, '标准供应商名称', data.supplier_data['标准供应商名称'].to_numpy())
+    rows = rows.iloc[order].reset_index(drop=True)
+
+    cube = np.nan_to_num(supplier_year_values(store)[order])
+    factory_years = np.add.reduceat(cube, starts[:-1], axis=0) if len(order) else cube
+    return SupplierProfileIndex(
+        base_year=cols.base_year, compare_year=cols.compare_year,
+        base_total=cols.base_total, compare_total=cols.compare_total,
+        years=list(store.years), year_labels=[_year_label(store, year) for year in store.years],
+        positions={supplier_id: i for i, supplier_id in enumerate(supplier_ids)},
+        starts=starts, rows=rows, factory_years=factory_years,
+    )
+
+
+def _growth_rate(base, compare):
+    # 与 datastore 一致：增长率为取整后的百分数，基准为0时为空
+    return round((compare - base) / base * 100) if base else np.nan
+
+
+def supplier_profile(index, supplier_id):
+    """某供应商的画像；供应商ID不在索引中时返回 None。
+
+    返回 {summary: 汇总数值, factory_years: 分工厂分年度金额, categories: 品类构成, subcategories: 各子类别明细}。
+    """
+    position = index.positions.get(supplier_id)
+    if position is None:
+        return None
+    rows = index.rows.iloc[index.starts[position]:index.starts[position + 1]]
+    base_year, compare_year = index.base_year, index.compare_year
+    base_total, compare_total = index.base_total, index.compare_total
+
+    factory_years = pd.DataFrame(
+        index.factory_years[position], index=FACTORY_CODES, columns=index.year_labels
+    )
+    base_label, compare_label = (index.year_labels[index.years.index(year)] for year in (base_year, compare_year))
+    factory_years['增长金额'] = factory_years[compare_label] - factory_years[base_label]
+    factory_years['增长率'] = [
+        _growth_rate(base, compare) for base, compare in zip(factory_years[base_label], factory_years[compare_label])
+    ]
+
+    categories = rows.groupby('Category', sort=False)[[base_total, compare_total]].sum()
+    for year, total_col in ((base_year, base_total), (compare_year, compare_total)):
+        total = categories[total_col].sum()
+        categories[f'{year}年占比'] = categories[total_col] / total * 100 if total else np.nan
+    categories = categories.sort_values(compare_total, ascending=False).reset_index()
+
+    base, compare = rows[base_total].sum(), rows[compare_total].sum()
+    tiers = [tier for tier in rows['供应商等级'] if pd.notna(tier)]
+    summary = {
+        'supplier_id': supplier_id,
+        'name': rows['标准供应商名称'].iloc[0],
+        'names': list(dict.fromkeys(rows['供应商'])),
+        'base_total': base,
+        'compare_total': compare,
+        'growth': compare - base,
+        'growth_rate': _growth_rate(base, compare),
+        'tier': max(tiers, key=TIERS.index) if tiers else None,
+        'concentration_risk': bool(rows['集中度风险'].any()),
+        'growth_risk': bool(rows['增长风险'].any()),
+        'categories': rows['Category'].nunique(),
+        'subcategories': rows['Sub Category'].nunique(),
+        'factories': [
+            factory for factory in FACTORIES
+            if factory_years.loc[factory, [base_label, compare_label]].abs().sum() > 0
+        ],
+    }
+    subcategories = rows.drop(columns=['供应商ID', '标准供应商名称']).reset_index(drop=True)
+    return {'summary': summary, 'factory_years': factory_years, 'categories': categories,
+            'subcategories': subcategories}
+
+
+def supplier_factory_year_figure(profile):
+    """各工厂各年度的采购金额（分组柱状图）。"""
+    factory_years = profile['factory_years'].drop(index='合计').drop(columns=['增长金额', '增长率'])
+    frame = factory_years.rename_axis('工厂').reset_index().melt(id_vars='工厂', var_name='年度', value_name='金额')
+    fig = px.bar(frame, x='年度', y='金额', color='工厂', barmode='group', title="各工厂分年度采购金额")
+    fig.update_layout(height=400)
+    return fig
+
+
+def supplier_category_figure(profile, total_col):
+    """供应商在各品类的采购金额构成。"""
+    fig = px.pie(profile['categories'], values=total_col, names='Category', title="品类构成", hole=0.4)
+    fig.update_layout(height=400)
+    return fig
@@ -0,0 +1,94 @@
+import pandas as pd
+import plotly.express as px
+
+# 风险评估矩阵：影响程度与发生概率为 1-5 分
+RISK_MATRIX = pd.DataFrame({
+    '风险项': [
+        '供应商过度集中',
+        '原材料价格波动',
+        '品质一致性',
+        '交付及时性',
+        '技术迭代风险',
+        '供应商财务风险'
+    ],
+    '影响程度': [5, 4, 3, 3, 4, 3],
+    '发生概率': [4, 5, 2, 2, 3, 2],
+    '风险等级': ['高', '高', '中', '中', '高', '中']
+})
+
+RISK_TYPES = ['供应商过度集中风险', '原材料价格波动风险', '品质一致性风险',
+              '交付及时性风险', '技术迭代风险', '供应商财务风险']
+
+# 各风险类型关注的品类
+COMMODITY_CATEGORIES = ['Copper &Aluminum', 'Steel']
+QUALITY_RISK_CATEGORIES = ['Assembly &Mechanical Parts', 'Electrical &Electronic']
+TECH_RISK_CATEGORIES = ['Electrical &Electronic']
+
+
+def significant_decline(data, threshold=-30, min_base=1000000):
+    """增长率低于 threshold 的子品类，按增长率升序；min_base 为 None 时不限制基准年度基数。"""
+    category_data = data.category_data
+    mask = category_data['增长率'] < threshold
+    if min_base is not None:
+        mask &= category_data[data.columns.base_spend] > min_base
+    return category_data[mask].sort_values('增长率')
+
+
+def risk_matrix_figure(risk_matrix=RISK_MATRIX):
+    fig = px.scatter(
+        risk_matrix,
+        x='发生概率',
+        y='影响程度',
+        size=[20]*len(risk_matrix),
+        text='风险项',
+        color='风险等级',
+        title="风险评估矩阵"
+    )
+    fig.update_traces(textposition='top center')
+    fig.update_layout(
+        xaxis=dict(range=[0, 6], title="发生概率"),
+        yaxis=dict(range=[0, 6], title="影响程度"),
+        height=400
+    )
+    return fig
+
+
+def risk_suppliers(data, concentration_quantile=0.9, decline_threshold=-30):
+    """供应商行及集中度风险（基准年度采购额高于分位数）、增长风险标记；金额列名如 2024采购额。"""
+    cols = data.columns
+    supplier_data = data.supplier_data
+    amount_col = f'{cols.base_year}采购额'
+    suppliers = pd.DataFrame({
+        '供应商': supplier_data['供应商'],
+        'Category': supplier_data['Category'],
+        'Sub Category': supplier_data['Sub Category'],
+        amount_col: supplier_data[cols.base_total],
+        '增长率': supplier_data['增长率']
+    })
+    suppliers['集中度风险'] = suppliers[amount_col] > suppliers[amount_col].quantile(concentration_quantile)
+    suppliers['增长风险'] = suppliers['增长率'] < decline_threshold
+    return suppliers
+
+
+def _with_share(frame, amount_col):
+    frame['采购占比'] = frame[amount_col] / frame[amount_col].sum() * 100
+    return frame
+
+
+def risk_type_suppliers(data, suppliers, risk_type):
+    """某一风险类型涉及的供应商；集中度与价格波动风险附带组内采购占比。"""
+    amount_col = f'{data.columns.base_year}采购额'
+    if risk_type == '供应商过度集中风险':
+        return _with_share(suppliers[suppliers['集中度风险']].copy(), amount_col)
+    if risk_type == '原材料价格波动风险':
+        return _with_share(suppliers[suppliers['Category'].isin(COMMODITY_CATEGORIES)].copy(), amount_col)
+    if risk_type == '品质一致性风险':
+        return suppliers[suppliers['Category'].isin(QUALITY_RISK_CATEGORIES)].copy()
+    if risk_type == '交付及时性风险':
+        # 增长率较高的供应商可能面临产能压力
+        return suppliers[suppliers['增长率'] > 50].copy()
+    if risk_type == '技术迭代风险':
+        return suppliers[suppliers['Category'].isin(TECH_RISK_CATEGORIES)].copy()
+    if risk_type == '供应商财务风险':
+        return suppliers[suppliers['增长率'] < 0].copy()
+    raise ValueError(f"未知的风险类型：{risk_type}")
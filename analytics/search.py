@@ -0,0 +1,166 @@
+"""供应商搜索：按数据版本构建一次倒排索引，输入名称片段即可在毫秒内返回排好序的供应商。
+
+中文名称按单字与相邻二字建立索引，拉丁字母名称按每个单词的前缀建立索引；
+同一供应商ID下的全部原始名称与标准名称都参与索引，跨品类、跨工厂的同一供应商只返回一条。
+"""
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from datastore import supplier_values
+
+# 拉丁字母单词只索引前若干个字符的前缀，更长的查询词截断后查找，再由子串匹配确认
+PREFIX_MAX = 12
+# 排序：完全一致 > 名称开头 > 名称中连续出现 > 各片段都出现 > 只出现部分片段
+MATCH_LABELS = ['完全一致', '名称开头', '包含', '分词匹配', '部分匹配']
+
+_RUN = re.compile(r'[㐀-鿿]+|[0-9a-z]+')
+_CJK = re.compile(r'[㐀-鿿]')
+
+
+@dataclass
+class SupplierSearchIndex:
+    """一个数据版本的供应商搜索索引；各数组按供应商（去重后的供应商ID）对齐。"""
+    version: str
+    supplier_ids: np.ndarray    # 供应商ID
+    names: np.ndarray           # 标准供应商名称
+    categories: np.ndarray      # 涉及的 Category，以"、"连接
+    spend: np.ndarray           # 最近一个年度的合计金额，同等匹配时金额大的排在前面
+    rank: np.ndarray            # 按金额从大到小的名次
+    texts: list                 # 各名称去掉空格后的检索文本，以 | 连接，如 abb中国有限公司上海分公司
+    sorted_texts: list          # 全部名称的检索文本（排序后），用二分查找定位完全一致与开头一致的名称
+    sorted_codes: np.ndarray    # sorted_texts 对应的供应商序号
+    postings: dict              # 单字/二字/前缀 -> 供应商序号（升序）
+
+    def __len__(self):
+        return len(self.supplier_ids)
+
+
+def search_text(name):
+    """统一全角/半角与大小写，标点等替换为空格；不剥离公司类型后缀，输入"有限公司"也能查到。"""
+    text = unicodedata.normalize('NFKC', str(name)).lower()
+    return ' '.join(_RUN.findall(text))
+
+
+def query_terms(text):
+    """查询文本中的索引项：中文连续片段取相邻二字（单字片段取单字），拉丁字母单词取前缀。"""
+    terms = []
+    for run in _RUN.findall(text):
+        if _CJK.match(run):
+            terms.extend([run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)])
+        else:
+            terms.append(run[:PREFIX_MAX])
+    return list(dict.fromkeys(terms))
+
+
+def _index_terms(text):
+    terms = set()
+    for run in _RUN.findall(text):
+        if _CJK.match(run):
+            terms.update(run)
+            terms.update(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            terms.update(run[:i] for i in range(1, min(len(run), PREFIX_MAX) + 1))
+    return terms
+
+
+def build_search_index(store):
+    """由 DataStore 的供应商维度构建索引；同一供应商ID的多行（不同品类/子类别/名称写法）合并为一个供应商。"""
+    dim = store.supplier_dim
+    codes, supplier_ids = pd.factorize(dim['供应商ID'].astype(str), sort=True)
+    latest = supplier_values(store, store.years[-1])
+    spend = np.bincount(codes, weights=np.nan_to_num(latest), minlength=len(supplier_ids))
+
+    names = [None] * len(supplier_ids)
+    categories = [{} for _ in supplier_ids]
+    variants = [set() for _ in supplier_ids]
+    for code, name, standard, category in zip(
+            codes, dim['供应商'].astype(str), dim['标准供应商名称'].astype(str), dim['Category'].astype(str)):
+        if names[code] is None:
+            names[code] = standard
+        categories[code][category] = None
+        variants[code].update((name, standard))
+
+    postings = {}
+    texts = []
+    compact_names = []
+    for code, names_of_supplier in enumerate(variants):
+        normalized = {search_text(name) for name in names_of_supplier} - {''}
+        compact = sorted({text.replace(' ', '') for text in normalized})
+        texts.append('|'.join(compact))
+        compact_names.extend((text, code) for text in compact)
+        for term in set().union(*(_index_terms(text) for text in normalized)):
+            postings.setdefault(term, []).append(code)
+    postings = {term: np.asarray(items, dtype=np.int32) for term, items in postings.items()}
+    compact_names.sort()
+    rank = np.empty(len(spend), dtype=np.int64)
+    rank[np.argsort(-spend, kind='stable')] = np.arange(len(spend))
+    return SupplierSearchIndex(
+        version=store.version, supplier_ids=np.asarray(supplier_ids, dtype=object),
+        names=np.asarray(names, dtype=object), categories=np.asarray(['、'.join(c) for c in categories], dtype=object),
+        spend=spend, rank=rank, texts=texts, sorted_texts=[text for text, _ in compact_names],
+        sorted_codes=np.asarray([code for _, code in compact_names], dtype=np.int32), postings=postings
+    )
+
+
+def _by_spend(index, codes):
+    codes = np.unique(codes)
+    return codes[np.argsort(index.rank[codes])]
+
+
+def _ranked_matches(index, candidates, compact, limit):
+    # 完全一致与开头一致由二分查找得到；其余候选按金额从大到小确认是否连续包含，凑满 limit 个即停止
+    lo = bisect_left(index.sorted_texts, compact)
+    exact = _by_spend(index, index.sorted_codes[lo:bisect_right(index.sorted_texts, compact)])
+    prefix = _by_spend(index, index.sorted_codes[lo:bisect_left(index.sorted_texts, compact + '\uffff')])
+    prefix = prefix[~np.isin(prefix, exact)][:limit]
+    codes = list(exact) + list(prefix)
+    match = [0] * len(exact) + [1] * len(prefix)
+    contained, scattered = [], []
+    seen = set(codes)
+    for code in candidates[np.argsort(index.rank[candidates])]:
+        if len(codes) + len(contained) >= limit:
+            break
+        if code not in seen:
+            (contained if compact in index.texts[code] else scattered).append(code)
+    codes += contained + scattered
+    match += [2] * len(contained) + [3] * len(scattered)
+    return np.asarray(codes[:limit], dtype=np.int64), match[:limit]
+
+
+def search_suppliers(index, query, limit=20):
+    """返回与 query 匹配的供应商，按匹配程度、金额排序，列为 供应商ID、供应商、Category、金额、匹配。
+
+    所有索引项都命中的供应商优先；没有时退而返回命中三分之一以上索引项的供应商（如输入有错字）。
+    """
+    text = search_text(query)
+    terms = query_terms(text)
+    columns = ['供应商ID', '供应商', 'Category', '金额', '匹配']
+    if not terms:
+        return pd.DataFrame(columns=columns)
+    postings = [index.postings.get(term, np.empty(0, dtype=np.int32)) for term in terms]
+
+    # 从最短的倒排表开始求交集
+    candidates = None
+    for items in sorted(postings, key=len):
+        candidates = items if candidates is None else np.intersect1d(candidates, items, assume_unique=True)
+        if not len(candidates):
+            break
+    if len(candidates):
+        chosen, match = _ranked_matches(index, candidates, text.replace(' ', ''), limit)
+    else:
+        counts = np.bincount(np.concatenate(postings), minlength=len(index))
+        candidates = np.flatnonzero(counts >= max(1, -(-len(terms) // 3)))
+        chosen = candidates[np.lexsort((index.rank[candidates], -counts[candidates]))][:limit]
+        match = [4] * len(chosen)
+    return pd.DataFrame({
+        '供应商ID': index.supplier_ids[chosen],
+        '供应商': index.names[chosen],
+        'Category': index.categories[chosen],
+        '金额': index.spend[chosen],
+        '匹配': [MATCH_LABELS[m] for m in match],
+    }, columns=columns)
@@ -0,0 +1,174 @@
+"""按页面分组的全部输出：看板在线计算与 precompute.py 预计算共用同一组函数。
+
+每个 section 返回 {名称: 数据表 / 图表 / 数值 / 嵌套字典}；带 key 的 section 按下拉框的每个选项各算一次。
+"""
+from analytics.category import (
+    category_summary, category_matrix_figure, growth_rankings, growth_ranking_figure,
+    category_trends, trend_matrix_figure, category_changes, category_change_conclusions,
+    category_suppliers, category_supplier_pie, subcategory_growth,
+    subcategory_amount_figure, subcategory_growth_figure, subcategory_growth_summary,
+    top_growth_subcategories, top_growth_subcategories_figure, subcategory_budget, subcategory_budget_donut
+)
+from analytics.concentration import supplier_concentration, bulk_material_growth
+from analytics.details import subcategory_table, supplier_detail
+from analytics.factory import factory_scale_figure, factory_growth_figure
+from analytics.risk import (
+    RISK_TYPES, significant_decline, risk_matrix_figure, risk_suppliers, risk_type_suppliers
+)
+from analytics.suppliers import (
+    TIERS, supplier_matrix_figure, top_suppliers, top_supplier_changes, category_supplier_stats,
+    category_supplier_donut, supplier_tiers, tier_distribution_figures, tier_suppliers, tier_summary,
+    tier_category_figure, top_growth_suppliers, top_growth_suppliers_figure, top_growth_supplier_table,
+    subcategory_suppliers, subcategory_supplier_count, subcategory_budget_suppliers
+)
+
+
+def overview_section(data):
+    """工厂业务概览及各页面共用的集中度指标。"""
+    concentration = supplier_concentration(data)
+    return {
+        'scale_figure': factory_scale_figure(data),
+        'growth_figure': factory_growth_figure(data),
+        'top10_share': concentration['top10_share'],
+        'top5_concentration': concentration['top5_concentration'],
+        'high_dependency': concentration['high_dependency'],
+        'max_supplier_share': concentration['max_supplier_share'],
+        'bulk_material_growth': bulk_material_growth(data),
+        'decline_count': len(significant_decline(data, threshold=-30, min_base=None)),
+    }
+
+
+def manager_section(data):
+    """管理者决策辅助：Top 10 增长子类别/供应商及对比年度子类别预算。"""
+    top_subcategories = top_growth_subcategories(data, 10)
+    top_suppliers_ = top_growth_suppliers(data, 10)
+    names = top_subcategories['Sub category'].tolist()
+    return {
+        'top_subcategories': top_subcategories,
+        'top_subcategories_figure': top_growth_subcategories_figure(data, top_subcategories),
+        'subcategory_supplier_count': {name: subcategory_supplier_count(data, name) for name in names},
+        'subcategory_suppliers': {name: subcategory_suppliers(data, name) for name in names},
+        'top_suppliers': top_suppliers_,
+        'top_suppliers_figure': top_growth_suppliers_figure(data, top_suppliers_),
+        'top_supplier_table': top_growth_supplier_table(data, top_suppliers_),
+        'budget': subcategory_budget(data),
+    }
+
+
+def category_section(data):
+    """品类战略分析中与下拉框无关的部分。"""
+    summary = category_summary(data)
+    top_growth, top_decline = growth_rankings(data, n=10, min_base=100000)
+    analysis_base, analysis_compare = category_trends(data, summary)
+    changes = category_changes(data, analysis_base, analysis_compare)
+    cols = data.columns
+    return {
+        'summary': summary,
+        'matrix_figure': category_matrix_figure(data, summary),
+        'top_growth_figure': growth_ranking_figure(top_growth, "Top 10 高增长子品类"),
+        'top_decline_figure': growth_ranking_figure(top_decline, "Top 10 负增长子品类"),
+        'analysis_base': analysis_base,
+        'base_trend_figure': trend_matrix_figure(analysis_base, cols.base_year, cols.base_spend),
+        'compare_trend_figure': trend_matrix_figure(analysis_compare, cols.compare_year, cols.compare_spend),
+        'changes': changes,
+        'conclusions': category_change_conclusions(data, changes),
+        'subcategory_categories': sorted(data.category_data['Category'].unique()),
+    }
+
+
+def category_detail_section(data, category):
+    """某一品类在各页面下拉框中对应的全部输出。"""
+    suppliers = category_suppliers(data, category)
+    subcategory_data = subcategory_growth(data)
+    detail = subcategory_data[subcategory_data['Category'] == category].copy()
+    budget = subcategory_budget(data)
+    budget = budget[budget['Category'] == category].sort_values(data.columns.compare_total, ascending=False)
+    subcategories = subcategory_table(data, category)
+    result = {
+        'suppliers': suppliers,
+        'supplier_pie': category_supplier_pie(data, suppliers, category),
+        'detail': detail,
+        'amount_figure': subcategory_amount_figure(data, detail, category),
+        'growth_figure': subcategory_growth_figure(detail, category),
+        'growth_summary': subcategory_growth_summary(detail),
+        'budget': budget,
+        'budget_suppliers': {
+            name: subcategory_budget_suppliers(data, category, name) for name in budget['Sub Category']
+        },
+        'subcategories': subcategories,
+        'supplier_detail': {
+            name: supplier_detail(data, name) for name in subcategories['Sub category'].unique()
+        },
+    }
+    if not budget.empty:
+        result['budget_donut'] = subcategory_budget_donut(data, budget, category)
+    return result
+
+
+def supplier_section(data):
+    """供应商管理矩阵中与下拉框无关的部分。"""
+    cols = data.columns
+    top_base = top_suppliers(data, cols.base_year, cols.base_total, 10)
+    top_compare = top_suppliers(data, cols.compare_year, cols.compare_total, 10)
+    new_top, exit_top = top_supplier_changes(top_base, top_compare)
+    stats = category_supplier_stats(data)
+    tier_count_figure, tier_amount_figure = tier_distribution_figures(data, supplier_tiers(data))
+    return {
+        'matrix_figure': supplier_matrix_figure(data, 50),
+        'top_base': top_base,
+        'top_compare': top_compare,
+        'new_top': sorted(new_top),
+        'exit_top': sorted(exit_top),
+        'category_stats': stats,
+        'category_donut': category_supplier_donut(stats),
+        'tier_count_figure': tier_count_figure,
+        'tier_amount_figure': tier_amount_figure,
+    }
+
+
+def tier_section(data, level):
+    suppliers = tier_suppliers(supplier_tiers(data), level)
+    return {
+        'suppliers': suppliers,
+        'summary': tier_summary(data, suppliers),
+        'category_figure': tier_category_figure(data, suppliers, level),
+    }
+
+
+def risk_section(data):
+    suppliers = risk_suppliers(data)
+    return {
+        'decline': significant_decline(data, threshold=-30, min_base=1000000),
+        'matrix_figure': risk_matrix_figure(),
+        'by_type': {risk_type: risk_type_suppliers(data, suppliers, risk_type) for risk_type in RISK_TYPES},
+    }
+
+
+# section 名称 -> (计算函数, 下拉框选项)；选项为 None 的 section 只算一次
+SECTIONS = {
+    'overview': (overview_section, None),
+    'manager': (manager_section, None),
+    'category': (category_section, None),
+    'category_detail': (category_detail_section, lambda data: sorted(
+        set(data.category_data['Category'].dropna()) | set(data.supplier_data['Category'].dropna())
+    )),
+    'supplier': (supplier_section, None),
+    'tier': (tier_section, lambda data: TIERS),
+    'risk': (risk_section, None),
+}
+
+
+def compute_section(data, name, key=None):
+    function, _ = SECTIONS[name]
+    return function(data) if key is None else function(data, key)
+
+
+def section_tasks(data):
+    """全部 (section, key) 组合，供预计算逐个执行。"""
+    tasks = []
+    for name, (_, options) in SECTIONS.items():
+        if options is None:
+            tasks.append((name, None))
+        else:
+            tasks += [(name, str(option)) for option in options(data)]
+    return tasks
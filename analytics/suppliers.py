@@ -0,0 +1,204 @@
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+TIERS = ['D级', 'C级', 'B级', 'A级']
+
+
+def supplier_matrix_figure(data, n=50):
+    """供应商战略矩阵：基准年度规模 × 增长率，气泡大小为对比年度规模。"""
+    cols = data.columns
+    fig = px.scatter(
+        data.supplier_data.head(n),
+        x=cols.base_total,
+        y='增长率',
+        size=cols.compare_total,
+        color='Category',
+        hover_name='供应商',
+        title=f"供应商战略矩阵（Top {n}）",
+        labels={
+            cols.base_total: f'{cols.base_year}年采购规模',
+            '增长率': '增长率(%)',
+            cols.compare_total: f'{cols.compare_year}年预测规模'
+        }
+    )
+    fig.update_layout(height=600)
+    return fig
+
+
+def top_suppliers(data, year, total_col, n=10):
+    """某年度采购额最大的 n 个供应商行及其占比（列名如 2024占比）。"""
+    supplier_data = data.supplier_data
+    top = supplier_data.nlargest(n, total_col).copy()
+    top[f'{year}占比'] = top[total_col] / supplier_data[total_col].sum() * 100
+    return top
+
+
+def top_supplier_changes(top_base, top_compare):
+    """返回 (新进入Top N 的供应商, 退出Top N 的供应商)。"""
+    new_top = set(top_compare['供应商']) - set(top_base['供应商'])
+    exit_top = set(top_base['供应商']) - set(top_compare['供应商'])
+    return new_top, exit_top
+
+
+def category_supplier_stats(data):
+    """各品类的供应商数量（按供应商ID去重）、基准年度采购金额和供应商数量占比。"""
+    grouped = data.supplier_data.groupby('Category', observed=True)
+    stats = pd.DataFrame({
+        '供应商数量': grouped['供应商ID'].nunique(),
+        '采购金额': grouped[data.columns.base_total].sum()
+    }).reset_index()
+    stats['供应商占比'] = stats['供应商数量'] / stats['供应商数量'].sum() * 100
+    return stats
+
+
+def category_supplier_donut(stats):
+    total_suppliers = stats['供应商数量'].sum()
+    fig = go.Figure()
+    fig.add_trace(go.Pie(
+        labels=stats['Category'],
+        values=stats['供应商占比'],
+        hole=0.6,
+        textinfo='label+percent',
+        textposition='outside',
+        texttemplate='%{label}<br>%{value:.1f}%',  # 显示精确的占比值
+        showlegend=False,
+        marker=dict(colors=px.colors.qualitative.Set3)
+    ))
+    # 在中心添加总计信息
+    fig.add_annotation(
+        text=f"总供应商数量<br>{total_suppliers}家",
+        x=0.5, y=0.5,
+        font=dict(size=14, color='black'),
+        showarrow=False
+    )
+    fig.update_layout(
+        height=400,
+        title={
+            'text': "供应商数量分布",
+            'y': 0.95,
+            'x': 0.5,
+            'xanchor': 'center',
+            'yanchor': 'top'
+        },
+        margin=dict(t=60, l=20, r=20, b=20)
+    )
+    return fig
+
+
+def supplier_tiers(data):
+    """按基准年度采购额四分位将供应商行分为 A-D 四级，并计算采购占比。"""
+    base_total = data.columns.base_total
+    analysis = data.supplier_data.copy()
+    analysis['采购占比'] = analysis[base_total] / analysis[base_total].sum() * 100
+    analysis['供应商等级'] = pd.qcut(analysis[base_total], q=4, labels=TIERS)
+    return analysis
+
+
+def tier_distribution_figures(data, tiers):
+    """返回 (各等级供应商数量饼图, 各等级采购金额占比柱状图)。"""
+    counts = tiers.groupby('供应商等级', observed=False).size()
+    count_fig = px.pie(
+        values=counts.values,
+        names=counts.index,
+        title="供应商等级分布",
+        hole=0.4
+    )
+    count_fig.update_layout(height=400)
+
+    amount = tiers.groupby('供应商等级', observed=False)[data.columns.base_total].sum()
+    amount_pct = amount / amount.sum() * 100
+    amount_fig = px.bar(
+        x=amount_pct.index,
+        y=amount_pct.values,
+        title="各等级供应商采购金额占比",
+        labels={'x': '供应商等级', 'y': '采购金额占比 (%)'},
+        text=amount_pct.round(1).astype(str) + '%'
+    )
+    amount_fig.update_layout(height=400)
+    return count_fig, amount_fig
+
+
+def tier_suppliers(tiers, level):
+    return tiers[tiers['供应商等级'] == level].copy()
+
+
+def tier_summary(data, level_suppliers):
+    base_total = data.columns.base_total
+    return {
+        'count': len(level_suppliers),
+        'total': level_suppliers[base_total].sum(),
+        'mean': level_suppliers[base_total].mean(),
+        'mean_growth': level_suppliers['增长率'].mean(),
+    }
+
+
+def tier_category_figure(data, level_suppliers, level):
+    fig = px.pie(
+        level_suppliers,
+        values=data.columns.base_total,
+        names='Category',
+        title=f"{level}供应商品类分布"
+    )
+    fig.update_layout(height=300)
+    return fig
+
+
+def top_growth_suppliers(data, n=10):
+    """按绝对增长金额排名的供应商行。"""
+    return data.supplier_data.nlargest(n, '增长金额').copy()
+
+
+def top_growth_suppliers_figure(data, top):
+    cols = data.columns
+    fig = px.bar(
+        top,
+        x='供应商',
+        y='增长金额',
+        title=f"Top 10 供应商 - 绝对增长金额 ({cols.compare_label} vs {cols.base_label})",
+        text='增长金额',
+        labels={'供应商': '供应商名称', '增长金额': '增长金额 (元)'},
+        color='Category',  # 按品类着色
+        hover_data=['Category', 'Sub Category', '增长率']
+    )
+    fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+    fig.update_layout(xaxis_tickangle=-45, height=500, yaxis_title="增长金额 (元)")
+    return fig
+
+
+def top_growth_supplier_table(data, top):
+    """增长供应商明细，带排名列。"""
+    cols = data.columns
+    table = top[[
+        '供应商', 'Category', 'Sub Category',
+        cols.base_total, cols.compare_total, '增长金额', '增长率'
+    ]].copy()
+    table.insert(0, '排名', range(1, 1 + len(table)))
+    return table
+
+
+def subcategory_suppliers(data, sub_category):
+    """某子类别的供应商，按基准年度采购额降序。"""
+    cols = data.columns
+    supplier_data = data.supplier_data
+    suppliers = supplier_data[supplier_data['Sub Category'] == sub_category]
+    return suppliers[[
+        '供应商', cols.base_total, cols.compare_total, '增长率'
+    ]].sort_values(cols.base_total, ascending=False).reset_index(drop=True)
+
+
+def subcategory_supplier_count(data, sub_category):
+    supplier_data = data.supplier_data
+    return supplier_data.loc[supplier_data['Sub Category'] == sub_category, '供应商ID'].nunique()
+
+
+def subcategory_budget_suppliers(data, category, sub_category):
+    """某品类、子类别下有对比年度预算的供应商，按预算降序。"""
+    compare_total = data.columns.compare_total
+    supplier_data = data.supplier_data
+    suppliers = supplier_data[
+        (supplier_data['Category'] == category) &
+        (supplier_data['Sub Category'] == sub_category) &
+        (supplier_data[compare_total] > 0)
+    ]
+    return suppliers[['供应商', compare_total]].sort_values(compare_total, ascending=False).reset_index(drop=True)
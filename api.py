@@ -0,0 +1,249 @@
+"""本地 JSON 接口：以 HTTP 提供看板中的品类汇总、Top 增长供应商、集中度指标与风险标记，供其他内部工具读取。
+
+与看板共用同一个 DataStore 和进程级计算缓存（analytics/cache.py）；每个响应的 ETag 由数据版本与规范化后的参数计算，
+客户端带 If-None-Match 重复轮询时，数据未变则直接返回 304，不做任何计算。
+看板进程中在 config.API_PORT 非0时随第一次重跑启动；也可以单独运行：python api.py --port 8600
+
+接口（均为 GET，参数均可省略）：
+  /api/version                                        数据版本与可选年度
+  /api/categories     ?category=                      各 Category 的 Spend、增长金额与增长率
+  /api/top-suppliers  ?category=&sub_category=&factory=&limit=10   增长金额最大的供应商
+  /api/concentration  ?category=&sub_category=&factory=            供应商集中度指标
+  /api/risks          ?category=&sub_category=&factory=&risk_type= 带风险标记的供应商
+各接口都接受 base_year、compare_year（默认最近两个年度）。factory 为工厂名（如 苏州），按该工厂的分厂金额计算，
+只包含在该工厂两个年度中至少一年有金额的供应商。
+"""
+import argparse
+import hashlib
+import json
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from config import API_HOST, API_PORT, API_MAX_LIMIT, FACTORIES
+from analytics import (
+    year_data, filter_year_data, category_summary, top_growth_suppliers, top_growth_supplier_table,
+    supplier_concentration, risk_suppliers, risk_type_suppliers, RISK_TYPES
+)
+from analytics.cache import compute_cache
+from metrics import observe_api
+from shared_data import bind_store, set_current
+
+ENDPOINTS = ['version', 'categories', 'top-suppliers', 'concentration', 'risks']
+# 各接口接受的过滤参数（base_year / compare_year 均接受）
+FILTERS = {
+    'version': [],
+    'categories': ['category', 'sub_category'],
+    'top-suppliers': ['category', 'sub_category', 'factory', 'limit'],
+    'concentration': ['category', 'sub_category', 'factory'],
+    'risks': ['category', 'sub_category', 'factory', 'risk_type'],
+}
+
+_lock = threading.Lock()
+_server = None
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _records(frame):
+    # 金额中的 NaN/inf 输出为 null；列名按原表保留（如 2024合计入库金额）
+    return json.loads(frame.to_json(orient='records', force_ascii=False))
+
+
+def _number(value):
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def resolve_params(store, endpoint, query):
+    """校验并补全参数，返回规范化后的参数字典；同样含义的请求得到同一个字典（同一个 ETag）。"""
+    allowed = set(FILTERS[endpoint]) | {'base_year', 'compare_year'}
+    unknown = sorted(set(query) - allowed)
+    if unknown:
+        raise BadRequest(f"不支持的参数：{', '.join(unknown)}，该接口可用：{', '.join(sorted(allowed))}")
+    if endpoint == 'version':
+        return {}
+    params = {key: values[-1] for key, values in query.items() if values and values[-1] != ''}
+    base_year, compare_year = store.year_pairs()[-1]
+    try:
+        base_year = int(params.get('base_year', base_year))
+        compare_year = int(params.get('compare_year', compare_year))
+    except ValueError:
+        raise BadRequest('base_year / compare_year 须为年份')
+    if (base_year, compare_year) not in store.year_pairs():
+        raise BadRequest(f'没有 {base_year} → {compare_year} 的年度数据，可选年度：{store.years}')
+    params.update(base_year=base_year, compare_year=compare_year)
+    if params.get('factory') is not None and params['factory'] not in FACTORIES:
+        raise BadRequest(f"未知的工厂：{params['factory']}，可选：{'、'.join(FACTORIES)}")
+    if params.get('risk_type') is not None and params['risk_type'] not in RISK_TYPES:
+        raise BadRequest(f"未知的风险类型：{params['risk_type']}，可选：{'、'.join(RISK_TYPES)}")
+    if endpoint == 'top-suppliers':
+        try:
+            params['limit'] = int(params.get('limit', 10))
+        except ValueError:
+            raise BadRequest('limit 须为整数')
+        if not 1 <= params['limit'] <= API_MAX_LIMIT:
+            raise BadRequest(f'limit 须在 1 到 {API_MAX_LIMIT} 之间')
+    return params
+
+
+def etag(version, endpoint, params):
+    key = json.dumps([version, endpoint, sorted(params.items())], ensure_ascii=False)
+    return '"' + hashlib.sha1(key.encode('utf-8')).hexdigest()[:20] + '"'
+
+
+@compute_cache.memoize()
+def _filtered_data(_store, version, base_year, compare_year, category, sub_category, factory):
+    data = year_data(_store, base_year, compare_year)
+    if category is None and sub_category is None and factory is None:
+        return data
+    return filter_year_data(data, category, sub_category, factory)
+
+
+def _payload(store, endpoint, params):
+    if endpoint == 'version':
+        return {'version': store.version, 'years': store.years, 'year_pairs': store.year_pairs()}
+    data = _filtered_data(
+        store, store.version, params['base_year'], params['compare_year'],
+        params.get('category'), params.get('sub_category'), params.get('factory')
+    )
+    cols = data.columns
+    if endpoint == 'categories':
+        result = {'columns': {'base_spend': cols.base_spend, 'compare_spend': cols.compare_spend},
+                  'data': _records(category_summary(data))}
+    elif endpoint == 'top-suppliers':
+        top = top_growth_supplier_table(data, top_growth_suppliers(data, params['limit']))
+        result = {'columns': {'base_total': cols.base_total, 'compare_total': cols.compare_total},
+                  'data': _records(top)}
+    elif endpoint == 'concentration':
+        concentration = supplier_concentration(data)
+        result = {key: _number(value) for key, value in concentration.items() if key != 'spend_by_supplier'}
+        result['suppliers'] = len(concentration['spend_by_supplier'])
+    else:
+        suppliers = risk_suppliers(data)
+        if params.get('risk_type') is not None:
+            suppliers = risk_type_suppliers(data, suppliers, params['risk_type'])
+        else:
+            suppliers = suppliers[suppliers['集中度风险'] | suppliers['增长风险']]
+        result = {'data': _records(suppliers.reset_index(drop=True))}
+    return dict(result, version=store.version, params=params)
+
+
+@compute_cache.memoize()
+def _body(_store, version, endpoint, params):
+    # 同一版本、同样参数的响应体只序列化一次；params 为排序后的元组
+    payload = _payload(_store, endpoint, dict(params))
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+
+def _etag_matches(header, tag):
+    if header is None:
+        return False
+    candidates = [item.strip() for item in header.split(',')]
+    return '*' in candidates or tag in candidates or f'W/{tag}' in candidates
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        endpoint = url.path.rstrip('/')[len('/api/'):] if url.path.startswith('/api/') else None
+        if endpoint not in ENDPOINTS:
+            self._send_json(404, {'error': f'未知的接口：{url.path}', 'endpoints': [f'/api/{e}' for e in ENDPOINTS]})
+            observe_api('unknown', 404)
+            return
+        # 每个请求只绑定一次 DataStore：其他 worker 或看板发布了新版本时使用新的对象，ETag 随之变化
+        bound = bind_store()
+        if bound is None:
+            self._send_json(503, {'error': '数据尚未加载'})
+            observe_api(endpoint, 503)
+            return
+        store = bound[0]
+        version = store.version
+        try:
+            params = resolve_params(store, endpoint, parse_qs(url.query))
+        except BadRequest as e:
+            self._send_json(400, {'error': str(e)})
+            observe_api(endpoint, 400)
+            return
+        tag = etag(version, endpoint, params)
+        if _etag_matches(self.headers.get('If-None-Match'), tag):
+            self.send_response(304)
+            self.send_header('ETag', tag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            observe_api(endpoint, 304)
+            return
+        body = _body(store, version, endpoint, tuple(sorted(params.items())))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', tag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+        observe_api(endpoint, 200)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=API_PORT, host=API_HOST):
+    """在后台线程中提供接口；每个进程只启动一次，端口被占用时返回 None。"""
+    global _server
+    with _lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _Handler)
+            except OSError:
+                return None
+            threading.Thread(target=_server.serve_forever, name='api-server', daemon=True).start()
+    return _server
+
+
+def serve():
+    """看板每次重跑时调用：按配置启动接口；接口使用 shared_data 中本进程当前的 DataStore。"""
+    if API_PORT:
+        start_server()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='单独运行本地 JSON 接口。')
+    parser.add_argument('--host', default=API_HOST)
+    parser.add_argument('--port', type=int, default=API_PORT or 8600)
+    args = parser.parse_args(argv)
+
+    from analytics import load_dataset
+    from shared_data import source_fingerprint, load_shared, publish_store
+
+    # 与看板相同：有对应当前数据文件的共享数据集时直接映射，否则加载并发布
+    fingerprint = source_fingerprint()
+    shared = load_shared(fingerprint)
+    if shared is None:
+        shared = load_dataset()
+        publish_store(shared[0], shared[1], fingerprint)
+    set_current(shared[0], shared[1], fingerprint)
+    server = ThreadingHTTPServer((args.host, args.port), _Handler)
+    print(f'接口已启动：http://{args.host}:{args.port}/api/version')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,30 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
+import os
 from datetime import datetime
-from config import DATA_FILES, FILE_ENCODING
+from config import (
+    FACTORIES, DELTA_DIR, SNAPSHOT_DIR, ARTIFACT_DIR, EXPORT_DIR, WARM_UP, SEARCH_LIMIT
+)
+from schema import SchemaValidationError
+from datastore import apply_delta, copy_store, delta_version, plan_delta, save_delta
+from snapshots import supplier_table, save_snapshot, list_snapshots, load_snapshot, diff_snapshots
+from artifacts import artifact_path, section_id, load_section as load_artifact_section
+from exports import EXPORT_FORMATS, available_formats, export_table
+from instrumentation import start_run, finish_run, timed, track_cache
+from metrics import publish, observe_load, observe_load_error, observe_cache_clear, observe_data
+from profiling import profile_requested, start_profile, stop_abandoned, stop_profile
+from shared_data import source_fingerprint, load_shared, publish_store, bind_store, set_current, clear_current, clear_shared
+from memory import session_usage, sessions_usage, streamlit_cache_usage, resident_memory
+from scenario import build_scenario_base, run_monte_carlo, simulate, results_frame, summarize
+from optimizer import optimize_reallocation
+from warmup import VIEW_MODULES, import_modules, start_warm_up, status as warm_up_status
+from analytics import load_dataset, load_delta_with_ids, year_data
+from analytics.cache import compute_cache
+
+# WARM_UP=eager：在首屏之前同步导入全部页面模块（原来的行为），用于对比冷启动耗时
+if WARM_UP == 'eager':
+    import_modules(VIEW_MODULES)
 
 # 设置页面配置
 st.set_page_config(
@@ -14,65 +33,69 @@ st.set_page_config(
     layout="wide"
 )
 
+# 性能埋点：记录本次重跑的分段耗时、缓存命中和各元素的大小，脚本末尾写入日志
+start_run()
+
+# 按需剖析：地址中的 ?profile=1 只剖析本次重跑，随即从地址中移除；
+# 先停用之前以 st.stop()/st.rerun()/异常结束、没有执行到 stop_profile 的剖析器
+stop_abandoned()
+profiler = start_profile() if profile_requested(st.query_params) else None
+if 'profile' in st.query_params:
+    del st.query_params['profile']
+
 # 添加侧边栏控件
 st.sidebar.title("数据控制")
 
 # 添加手动刷新按钮
 if st.sidebar.button('🔄 刷新数据'):
     st.cache_data.clear()
+    st.cache_resource.clear()
+    compute_cache.clear()
+    clear_current()
+    clear_shared()
+    observe_cache_clear()
     st.rerun() # 使用 st.rerun() 替代 st.experimental_rerun()
 
+# 首屏已经发出，在后台预先导入各页面用到的模块，与数据加载同时进行
+if WARM_UP == 'background':
+    start_warm_up()
+
 # 数据加载函数
-@st.cache_data(ttl=60)  # 设置缓存时间为60秒
+# 使用 cache_resource 共享同一个 DataStore；追加的月度增量在副本上更新后整体替换，无需重新读取全部文件
+@track_cache('load_data', st.cache_resource(ttl=60))  # 设置缓存时间为60秒
 def load_data():
     try:
-        # 读取三个CSV文件
-        factory_data = pd.read_csv(DATA_FILES['factory_data'], encoding=FILE_ENCODING)
-        supplier_data = pd.read_csv(DATA_FILES['supplier_data'], encoding=FILE_ENCODING)
-        category_data = pd.read_csv(DATA_FILES['category_data'], encoding=FILE_ENCODING)
+        start = datetime.now()
+        # 其他 worker 已为当前数据文件发布了共享数据集时直接映射，否则解析 CSV 并发布
+        fingerprint = source_fingerprint()
+        shared = load_shared(fingerprint)
+        if shared is not None:
+            store, quality_report = shared
+        else:
+            store, quality_report = load_dataset()
+            publish_store(store, quality_report, fingerprint)
         
         # 记录数据加载时间
         st.session_state['last_data_update'] = datetime.now()
         st.session_state['data_load_status'] = 'success'
+        observe_load(store, (st.session_state['last_data_update'] - start).total_seconds())
         
-        # 安全的数值转换函数
-        def safe_numeric_convert(series):
-            if series.dtype == 'object':
-                return pd.to_numeric(series.str.replace(',', '').str.rstrip('%'), errors='coerce')
-            return series
-        
-        # 处理工厂数据
-        numeric_columns = ['2025年预测采购额', '2024年入库金额', '增长金额', '增长率']
-        for col in numeric_columns:
-            if col in factory_data.columns:
-                factory_data[col] = safe_numeric_convert(factory_data[col])
-        
-        # 处理供应商数据
-        supplier_numeric_columns = [
-            '2024合计入库金额', '2025合计预算金额', '增长金额', '增长率',
-            '2024汇风入库金额', '2024铜盟入库金额', '2024苏州入库金额',
-            '2025汇风预算金额', '2025铜盟预算金额', '2025苏州预算金额'
-        ]
-        for col in supplier_numeric_columns:
-            if col in supplier_data.columns:
-                supplier_data[col] = safe_numeric_convert(supplier_data[col])
-        
-        # 处理品类数据
-        category_numeric_columns = ['2024年Spend', '2025年Spend', '增长金额', '增长率']
-        for col in category_numeric_columns:
-            if col in category_data.columns:
-                category_data[col] = safe_numeric_convert(category_data[col])
-        
-        return factory_data, supplier_data, category_data
+        # 保存本次加载的版本快照（同一版本只保存一次）
+        save_snapshot(supplier_table(store), store.version, SNAPSHOT_DIR)
+        return store, quality_report, fingerprint
         
     except Exception as e:
         st.session_state['data_load_status'] = 'error'
         st.session_state['data_load_error'] = str(e)
+        observe_load_error()
         raise e
 
 # 加载数据
 try:
-    factory_data, supplier_data, category_data = load_data()
+    # 本次重跑只绑定一次 DataStore，之后全程使用同一个对象；
+    # 本进程或其他 worker 追加增量、重新加载后发布的新版本是新的对象，从下一次重跑开始使用
+    store, quality_report = bind_store(load_data())
+    observe_data(store)
     
     # 显示数据更新时间
     if 'last_data_update' in st.session_state:
@@ -82,25 +105,292 @@ try:
     if st.session_state.get('data_load_status') == 'success':
         st.sidebar.success("✅ 数据加载成功")
     
+    # 显示数据质量报告
+    quality_summary = quality_report['summary']
+    quality_details = quality_report['details']
+    validation_warnings = quality_report['validation']
+    mismatch_count = int(quality_summary['差异数量'].sum()) + len(validation_warnings)
+    with st.sidebar.expander(f"🧾 数据质量报告（{mismatch_count}项差异）", expanded=False):
+        st.dataframe(
+            quality_summary[['检查项', '字段', '检查数量', '差异数量']],
+            use_container_width=True,
+            hide_index=True
+        )
+        if not quality_details.empty:
+            st.markdown("**差异明细**")
+            st.dataframe(
+                quality_details.style.format({
+                    '文件值': '{:,.0f}',
+                    '重算值': '{:,.0f}',
+                    '差异': '{:+,.0f}'
+                }, na_rep='空'),
+                use_container_width=True,
+                hide_index=True
+            )
+        if not validation_warnings.empty:
+            st.markdown("**结构校验警告**")
+            st.dataframe(validation_warnings, use_container_width=True, hide_index=True)
+    
+except SchemaValidationError as e:
+    st.sidebar.error(f"❌ 数据加载失败：{str(e)}")
+    st.error("数据文件未通过结构校验，已拒绝加载。请修正以下问题后点击“刷新数据”。")
+    st.dataframe(e.errors, use_container_width=True, hide_index=True)
+    st.stop()
 except Exception as e:
     st.sidebar.error(f"❌ 数据加载失败：{str(e)}")
     st.stop()
 
+# 追加月度入库增量：金额只累加到涉及的供应商、子类别和工厂；复制、快照、发布与缓存失效的开销仍随数据量增长（见 README）
+with st.sidebar.expander("📥 追加月度入库数据", expanded=False):
+    st.caption("CSV列：供应商, Category, Sub Category, 年份, 月份, 工厂, 入库金额")
+    st.caption("增量按年份+月份保存，同一月份的相同文件不会重复累加")
+    delta_upload = st.file_uploader("增量文件", type=['csv'], key="delta_upload")
+    replace_months = st.checkbox("替换已追加的月份", key="delta_replace")
+    if delta_upload is not None and st.button("追加", key="delta_apply"):
+        try:
+            delta = load_delta_with_ids(delta_upload)
+            changes, months, duplicates = plan_delta(delta, DELTA_DIR, replace=replace_months)
+            # 在副本上追加，其他会话与接口请求正在使用的对象不变；本次重跑随后改用新对象
+            updated = copy_store(store)
+            affected = apply_delta(updated, changes)
+            save_delta(months, DELTA_DIR)
+            # 版本由已保存的增量内容决定，与重启后重放得到的版本一致
+            updated.version = delta_version(updated.base_version, DELTA_DIR)
+            save_snapshot(supplier_table(updated), updated.version, SNAPSHOT_DIR)
+            fingerprint = source_fingerprint()
+            publish_store(updated, quality_report, fingerprint)
+            set_current(updated, quality_report, fingerprint)
+            store = updated
+            st.session_state['last_data_update'] = datetime.now()
+            observe_data(store)
+            st.success(
+                f"已追加{'、'.join(f'{year}年{month}月' for year, month in months)}共"
+                f"{sum(len(part) for part in months.values())}行：{len(affected['suppliers'])}个供应商、"
+                f"{len(affected['sub_categories'])}个子类别、{len(affected['factories'])}个工厂"
+            )
+            if duplicates:
+                st.info(f"{'、'.join(f'{year}年{month}月' for year, month in duplicates)}的数据已追加过，已跳过")
+        except SchemaValidationError as e:
+            st.error(f"增量文件未通过结构校验：{str(e)}")
+            st.dataframe(e.errors, use_container_width=True, hide_index=True)
+        except ValueError as e:
+            st.error(str(e))
+
+# 版本对比：快照不可变，同一对版本的对比结果可一直缓存
+@track_cache('compare_versions', st.cache_data(max_entries=20))
+def compare_versions(old_version, new_version):
+    return diff_snapshots(load_snapshot(SNAPSHOT_DIR, old_version), load_snapshot(SNAPSHOT_DIR, new_version))
+
+snapshot_list = list_snapshots(SNAPSHOT_DIR)
+with st.sidebar.expander(f"🔀 数据版本变更（当前版本 {store.version}）", expanded=False):
+    if len(snapshot_list) < 2:
+        st.info("暂无可对比的历史版本。")
+    else:
+        version_labels = dict(zip(snapshot_list['版本'], snapshot_list['保存时间'] + ' · ' + snapshot_list['版本']))
+        versions = list(version_labels)
+        new_version = st.selectbox(
+            "新版本", versions[::-1],
+            index=versions[::-1].index(store.version) if store.version in versions else 0,
+            format_func=version_labels.get, key="diff_new_version"
+        )
+        older = versions[:versions.index(new_version)] or versions
+        old_version = st.selectbox(
+            "对比版本", older[::-1], format_func=version_labels.get, key="diff_old_version"
+        )
+        version_diff = compare_versions(old_version, new_version)
+        st.dataframe(version_diff['summary'], use_container_width=True, hide_index=True)
+        for key, title in [('added', '新增供应商行'), ('removed', '删除供应商行'), ('moved', '品类变更'), ('changed', '金额变化')]:
+            if not version_diff[key].empty:
+                st.markdown(f"**{title}**")
+                st.dataframe(version_diff[key], use_container_width=True, hide_index=True)
+
+# 年度对比选择：默认最近两个年度
+year_pairs = store.year_pairs()
+base_year, compare_year = st.sidebar.selectbox(
+    "对比年度",
+    year_pairs,
+    index=len(year_pairs) - 1,
+    format_func=lambda pair: f"{pair[0]} → {pair[1]}"
+)
+
+# 按所选年度取宽表视图（只在年度切片上计算，不重新读取文件）
+# 计算结果保存在进程级的 compute_cache 中，按数据版本失效，总内存有上限
+@track_cache('load_year_data', compute_cache.memoize())
+def load_year_data(_store, version, base_year, compare_year):
+    return year_data(_store, base_year, compare_year)
+
+# 各会话共用同一个 DataStore，追加增量或重新加载后其他版本的计算结果不会再被用到
+compute_cache.invalidate(keep=store.version)
+# 年度数据与各页面结果只由 compute_cache 持有，各会话共用同一份对象，会话中不另外保留引用
+data = load_year_data(store, store.version, base_year, compare_year)
+factory_data, supplier_data, category_data = data.factory_data, data.supplier_data, data.category_data
+
+# 所选年度对应的列名
+base_total_col = data.columns.base_total            # 如 2024合计入库金额
+compare_total_col = data.columns.compare_total      # 如 2025合计预算金额
+base_factory_cols = data.columns.base_factory
+compare_factory_cols = data.columns.compare_factory
+base_spend_col = data.columns.base_spend            # 如 2024年Spend
+compare_spend_col = data.columns.compare_spend
+
+# 各页面的计算与图表模块在侧边栏渲染之后才导入，首屏不必等待 plotly 等模块加载（后台预热通常已完成导入）
+import plotly.express as px
+from analytics import (
+    growth_label, supplier_tiers, all_supplier_detail, TIERS, RISK_TYPES, build_search_index, search_suppliers,
+    build_profile_index, supplier_profile, supplier_factory_year_figure, supplier_category_figure, factory_scale_lines
+)
+from analytics.sections import compute_section
+from api import serve as serve_api
+
+# 本地 JSON 接口（CAIGOU_API_PORT 非0时启动）：与看板共用当前的 DataStore 与计算缓存
+serve_api()
+
+# 各页面的数据表与图表：precompute.py 已为当前数据版本生成的直接读取，否则在线计算
+@track_cache('load_section', compute_cache.memoize())
+def load_section(_data, version, base_year, compare_year, name, key=None):
+    stored = load_artifact_section(artifact_path(ARTIFACT_DIR, version, base_year, compare_year), section_id(name, key))
+    return stored if stored is not None else compute_section(_data, name, key)
+
+def section(name, key=None):
+    # 返回的对象由各会话共用，页面中需要改动时先复制
+    return load_section(data, store.version, base_year, compare_year, name, key)
+
+# 供应商搜索索引：每个数据版本只构建一次，各会话共用
+@track_cache('supplier_search_index', compute_cache.memoize())
+def load_search_index(_store, version):
+    return build_search_index(_store)
+
+# 供应商画像索引：按数据版本与所选年度构建一次，打开任一供应商的画像只需一次查找
+@track_cache('supplier_profile_index', compute_cache.memoize())
+def load_profile_index(_store, _data, version, base_year, compare_year):
+    return build_profile_index(_store, _data)
+
+# 明细表导出：在服务器端按块写入 CSV/XLSX 文件后再提供下载，数值保持为数字，不经过 Styler 渲染
+def export_controls(key, views, name):
+    """views 为 {导出范围: 返回数据表的函数}，只在点击生成时才取数据并写文件。"""
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        scope = st.radio("导出范围", list(views), horizontal=True, key=f'{key}_scope')
+    with col2:
+        fmt = st.radio("导出格式", available_formats(), horizontal=True, key=f'{key}_format')
+    # 数据版本、年度或筛选条件变化后，之前生成的文件不再提供下载
+    request = (store.version, base_year, compare_year, name, scope, fmt)
+    with col3:
+        if st.button("生成导出文件", key=f'{key}_export'):
+            label = f'{name}_{scope}_{base_year}-{compare_year}'
+            path = export_table(views[scope](), fmt, EXPORT_DIR, label, version=store.version, sheet_name=name)
+            st.session_state[f'{key}_file'] = (request, path, f'{label}.{EXPORT_FORMATS[fmt]}')
+        exported = st.session_state.get(f'{key}_file')
+        # 过期的导出文件会被清理，需要重新生成
+        if exported and exported[0] == request and os.path.exists(exported[1]):
+            # 下载按钮的内容会整体读入内存并注册到媒体管理器：只在点击“准备下载”的那一次重跑中读取，
+            # 其余重跑（包括点击下载本身触发的重跑）不再读取文件
+            if st.button("准备下载", key=f'{key}_prepare'):
+                with open(exported[1], 'rb') as f:
+                    st.download_button("⬇️ 下载", f.read(), file_name=exported[2], key=f'{key}_download')
+
+# 工厂概览及供应商集中度指标：风险预警与页脚共用
+overview = section('overview')
+# 工厂/地区规模说明按所选年度从 factory_data 计算
+factory_lines, region_summary = factory_scale_lines(data)
+top10_share = overview['top10_share']
+top5_concentration = overview['top5_concentration']
+high_dependency = overview['high_dependency']
+
 # 页面标题
 st.title("📊 集团采购战略分析看板")
 st.markdown("### 战略洞察与决策支持系统")
 
+# 全局供应商搜索：输入名称的任意片段，选中后显示该供应商跨品类、跨工厂的画像
+selected_supplier_id = None
+with timed('供应商搜索'):
+    search_query = st.text_input(
+        "🔎 供应商搜索", key='supplier_search', placeholder="输入供应商名称的任意片段，如 铜业、ABB，回车查询"
+    )
+    if search_query.strip():
+        matches = search_suppliers(load_search_index(store, store.version), search_query, limit=SEARCH_LIMIT)
+        if matches.empty:
+            st.info(f"没有找到与「{search_query}」匹配的供应商")
+        else:
+            match_labels = {
+                row['供应商ID']: f"{row['供应商']}（{row['Category']}，{row['金额']:,.0f}，{row['匹配']}）"
+                for _, row in matches.iterrows()
+            }
+            selected_supplier_id = st.selectbox(
+                f"匹配的供应商（{len(matches)}个，按匹配程度与最近年度金额排序）",
+                list(match_labels), format_func=match_labels.get, key='supplier_search_result'
+            )
+
+# 供应商画像：各工厂分年度金额、品类构成、所在各子类别的份额、增长、等级与风险标记
+if selected_supplier_id is not None:
+    with timed('供应商画像'):
+        profile = supplier_profile(
+            load_profile_index(store, data, store.version, base_year, compare_year), selected_supplier_id
+        )
+        summary = profile['summary']
+        with st.expander(f"🧾 供应商画像：{summary['name']}", expanded=True):
+            st.caption(
+                f"供应商ID：{summary['supplier_id']}　名称写法：{'、'.join(summary['names'])}　"
+                f"涉及 {summary['categories']} 个品类、{summary['subcategories']} 个子类别，"
+                f"供货工厂：{'、'.join(summary['factories']) or '无'}"
+            )
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric(f"{data.columns.base_label}金额", f"{summary['base_total']:,.0f}")
+            col2.metric(
+                f"{data.columns.compare_label}金额", f"{summary['compare_total']:,.0f}",
+                delta=f"{summary['growth_rate']:.0f}%" if pd.notna(summary['growth_rate']) else None
+            )
+            col3.metric("供应商等级（最高）", summary['tier'] or '-')
+            risk_flags = [label for label, flagged in (
+                ('集中度风险', summary['concentration_risk']), ('增长风险', summary['growth_risk'])
+            ) if flagged]
+            col4.metric("风险标记", '、'.join(risk_flags) or '无')
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.plotly_chart(supplier_factory_year_figure(profile), use_container_width=True)
+            with col2:
+                st.plotly_chart(supplier_category_figure(profile, compare_total_col), use_container_width=True)
+
+            st.markdown("**各工厂分年度金额**")
+            st.dataframe(
+                profile['factory_years'].style.format(
+                    {**{col: '{:,.0f}' for col in profile['factory_years'].columns[:-1]}, '增长率': '{:.0f}%'},
+                    na_rep=''
+                ),
+                use_container_width=True
+            )
+            st.markdown("**品类构成**")
+            st.dataframe(
+                profile['categories'].style.format({
+                    base_total_col: '{:,.0f}', compare_total_col: '{:,.0f}',
+                    f'{base_year}年占比': '{:.1f}%', f'{compare_year}年占比': '{:.1f}%'
+                }, na_rep=''),
+                use_container_width=True, hide_index=True
+            )
+            st.markdown("**所在各子类别明细**（占比为该供应商在子类别中的份额）")
+            amount_cols = [*base_factory_cols.values(), base_total_col, *compare_factory_cols.values(),
+                           compare_total_col, '增长金额']
+            st.dataframe(
+                profile['subcategories'].style.format({
+                    **{col: '{:,.0f}' for col in amount_cols},
+                    f'{base_year}年占比': '{:.1f}%', f'{compare_year}年占比': '{:.1f}%', '增长率': '{:.1f}%'
+                }, na_rep=''),
+                use_container_width=True, hide_index=True
+            )
+
 # 创建标签页
-tab1, tab_manager, tab2, tab3, tab4, tab5 = st.tabs([
+tab1, tab_manager, tab2, tab3, tab4, tab5, tab_scenario = st.tabs([
     "🏭 工厂业务概览",
     "💡 管理者决策辅助", # 新增标签页
     "📈 品类战略分析",
     "🤝 供应商管理矩阵",
     "⚠️ 风险预警与建议",
-    "📊 数据明细总览"
+    "📊 数据明细总览",
+    "🎲 情景模拟"
 ])
 
-with tab1:
+with tab1, timed('工厂业务概览'):
     st.header("工厂业务概览")
     
     # 创建两列布局
@@ -108,62 +398,21 @@ with tab1:
     
     with col1:
         # 工厂采购规模对比
-        fig = go.Figure()
-        for factory in factory_data['Business Unit']:
-            if factory != '合计':
-                fig.add_trace(go.Bar(
-                    name=factory,
-                    x=['2024年', '2025年'],
-                    y=[
-                        factory_data[factory_data['Business Unit']==factory]['2024年入库金额'].values[0],
-                        factory_data[factory_data['Business Unit']==factory]['2025年预测采购额'].values[0]
-                    ],
-                    text=[
-                        f"{factory_data[factory_data['Business Unit']==factory]['2024年入库金额'].values[0]/10000:.0f}万",
-                        f"{factory_data[factory_data['Business Unit']==factory]['2025年预测采购额'].values[0]/10000:.0f}万"
-                    ]
-                ))
-        
-        fig.update_layout(
-            title="各工厂采购规模对比",
-            barmode='group',
-            height=400
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(overview['scale_figure'], use_container_width=True)
     
     with col2:
         # 增长率分析
-        growth_data = factory_data[factory_data['Business Unit'] != '合计'].copy()
-        fig = px.bar(
-            growth_data,
-            x='Business Unit',
-            y='增长率',
-            text=growth_data['增长率'].apply(lambda x: f'{x}%'),
-            title="各工厂2025年预测增长率",
-            color='增长率',
-            color_continuous_scale='RdYlGn'
-        )
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
-
-    # 计算供应商相关指标
-    top10_share = (supplier_data.nlargest(10, '2024合计入库金额')['2024合计入库金额'].sum() / 
-                  supplier_data['2024合计入库金额'].sum() * 100)
-    top5_concentration = (supplier_data.nlargest(5, '2024合计入库金额')['2024合计入库金额'].sum() / 
-                         supplier_data['2024合计入库金额'].sum() * 100)
-    high_dependency = len(supplier_data[
-        supplier_data['2024合计入库金额'] / supplier_data['2024合计入库金额'].sum() > 0.1
-    ])
+        st.plotly_chart(overview['growth_figure'], use_container_width=True)
 
     st.subheader("📌 战略洞察")
+    tianjin = region_summary[0]
+    factory_text = '\n'.join(f"        - {line}" for line in factory_lines)
     st.markdown(f"""
-    1. **工厂业务规模分析**：
-        - 天津铜盟2024年入库4.61亿，2025年预计5.20亿，增长13%
-        - 天津汇风2024年入库1.14亿，2025年预计1.36亿，增长19%
-        - 苏州铜盟2024年入库2.51亿，2025年预计2.28亿，下降9%
-        - 天津地区（铜盟+汇风）总采购额从5.75亿增长至6.56亿，增长14%
+    1. **工厂业务规模分析**（{base_year}→{compare_year}）：
+{factory_text}
+        - 天津地区总采购额从{tianjin['基准']/1e8:.2f}亿到{tianjin['对比']/1e8:.2f}亿，{tianjin['变化']}
     
-    2. **品类结构分析**：
+    2. **品类结构分析**（2024→2025 分析结论）：
         - 铜材类采购占总采购额的42%，是最大品类
         - 导热脂、接线盒等新品类增长率超过30%
         - 有8个子品类出现负增长，降幅超过15%
@@ -176,7 +425,7 @@ with tab1:
 
 # --- tab_manager 内容开始 ---
 # 将 tab_manager 的代码块移到 tab1 外部，并保持正确的缩进
-with tab_manager:
+with tab_manager, timed('管理者决策辅助'):
     st.header("管理者决策辅助：高增长分析")
     st.markdown("我分析了一下采购数据，虽然只是Overview数据，但结合企业背景与业务特点，我仍能帮助你在新年度的采购战略中提出部分建议及行动指南。")
 
@@ -186,32 +435,16 @@ with tab_manager:
     # --- Top 10 采购额增长供应商分析 (可折叠) ---
 
     # --- Top 10 采购额增长子类别分析 (可折叠) ---
-    with st.expander("📈 Top 10 采购额增长子类别 (绝对金额)", expanded=True): # 默认折叠
+    manager = section('manager')
+    with st.expander("📈 Top 10 采购额增长子类别 (绝对金额)", expanded=True), timed('Top 10 增长子类别'): # 默认折叠
         # 计算Top 10增长子类别 (按绝对增长金额)
-        # 确保 '增长金额' 列是数值类型，如果 load_data 中未处理
-        if not pd.api.types.is_numeric_dtype(category_data['增长金额']):
-            category_data['增长金额'] = pd.to_numeric(category_data['增长金额'], errors='coerce')
-            category_data.dropna(subset=['增长金额'], inplace=True) # 删除无法转换的行
-
-        top_10_growth_subcategories = category_data.nlargest(10, '增长金额').copy()
-        top_10_growth_subcategories.reset_index(drop=True, inplace=True) # 重置索引方便后面使用 index+1
+        # '增长金额' 的数值类型已由 load_data 的结构校验保证
+        top_10_growth_subcategories = manager['top_subcategories'] # 已重置索引，方便后面使用 index+1
 
         # 可视化 Top 10 增长子类别的绝对增长金额
         st.subheader("可视化：增长金额对比")
         if not top_10_growth_subcategories.empty:
-            fig_top10_subcat_bar = px.bar(
-                top_10_growth_subcategories,
-                x='Sub category',
-                y='增长金额',
-                title="Top 10 子类别 - 绝对增长金额 (2025预算 vs 2024实际)",
-                text='增长金额',
-                labels={'Sub category': '子类别名称', '增长金额': '增长金额 (元)'},
-                color='Category', # 按父品类着色
-                hover_data=['Category', '增长率']
-            )
-            fig_top10_subcat_bar.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-            fig_top10_subcat_bar.update_layout(xaxis_tickangle=-45, height=500, yaxis_title="增长金额 (元)")
-            st.plotly_chart(fig_top10_subcat_bar, use_container_width=True)
+            st.plotly_chart(manager['top_subcategories_figure'], use_container_width=True)
         else:
             st.warning("未能计算Top 10增长子类别数据。")
                 # 战略建议 (按 Category 分组显示)
@@ -298,22 +531,21 @@ with tab_manager:
                             growth_rate_sub_str = "停止采购"
                         elif isinstance(growth_rate_sub, (int, float)):
                             growth_rate_sub_str = f"{growth_rate_sub:.1f}%"
-                    elif row['2024年Spend'] == 0 and row['增长金额'] > 0:
+                    elif row[base_spend_col] == 0 and row['增长金额'] > 0:
                         growth_rate_sub_str = "新增采购"
                     st.metric("增长率", growth_rate_sub_str)
                     
-                    st.markdown(f"**2024年采购额:** {row['2024年Spend']:,.0f} 元")
-                    st.markdown(f"**2025年预算额:** {row['2025年Spend']:,.0f} 元")
+                    st.markdown(f"**{base_year}年采购额:** {row[base_spend_col]:,.0f} 元")
+                    st.markdown(f"**{compare_year}年预算额:** {row[compare_spend_col]:,.0f} 元")
                     
                 with col2:
                     # 筛选该子类别的供应商
-                    subcat_suppliers = supplier_data[supplier_data['Sub Category'] == row['Sub category']].copy()
-                    num_suppliers = subcat_suppliers['供应商'].nunique()
+                    num_suppliers = manager['subcategory_supplier_count'][row['Sub category']]
                     st.markdown(f"**供应商数量:** {num_suppliers}")
                     
                     # ---- 添加导热脂专项分析 ----
                     if row['Sub category'] == '导热脂':
-                        st.warning("""**专项分析：导热脂**
+                        st.warning("""**专项分析：导热脂**（2024→2025 分析结论）
                         - **情况:** 2024年采购额较低(约23万)，2025年预算大幅增加，可能反映项目从初期进入量产阶段。
                         - **供应商:** ECS Cleaning Solutions GmbH 是一家德国贸易商。
                         - **推测:** 对于出口型业务，这可能属于客户指定供应商。
@@ -322,17 +554,15 @@ with tab_manager:
                     
                     # ---- 添加银钎焊料专项分析 ----
                     if row['Sub category'] == '银钎焊料':
-                        st.warning("""**专项分析：银钎焊料**
+                        st.warning("""**专项分析：银钎焊料**（2024→2025 分析结论）
                         - **风险:** 2025年预测数据显示供应商可能存在过度集中风险，单一供应商（上海大华）占比过高。
                         - **影响:** 这可能降低议价能力，并增加供应链中断风险，影响整体韧性。
                         - **建议:** **强烈建议** 启动替代供应商寻源和评估工作（参考上述商务降本策略中提到的方向），即使短期内不切换，也要有成熟的备选方案以应对潜在风险，并作为重要的谈判筹码。""")
                     # ---- 结束银钎焊料专项分析 ----
                         
                     if num_suppliers > 0:
-                        st.markdown("**主要供应商列表 (按2024年采购额排序):**")
-                        supplier_display_data = subcat_suppliers[[
-                            '供应商', '2024合计入库金额', '2025合计预算金额', '增长率'
-                        ]].sort_values('2024合计入库金额', ascending=False).reset_index(drop=True)
+                        st.markdown(f"**主要供应商列表 (按{base_year}年采购额排序):**")
+                        supplier_display_data = manager['subcategory_suppliers'][row['Sub category']].copy()
                         
                         # 格式化增长率
                         supplier_display_data['增长率'] = supplier_display_data['增长率'].apply(
@@ -341,8 +571,8 @@ with tab_manager:
                         
                         st.dataframe(
                             supplier_display_data.style.format({
-                                '2024合计入库金额': '{:,.0f}',
-                                '2025合计预算金额': '{:,.0f}'
+                                base_total_col: '{:,.0f}',
+                                compare_total_col: '{:,.0f}'
                             }, na_rep='N/A'),
                             use_container_width=True,
                             height=min(200, 35 + 35 * len(supplier_display_data)), # 限制最大高度
@@ -355,31 +585,15 @@ with tab_manager:
                 st.markdown("---")
         else:
              st.info("没有找到符合条件的子类别数据。")
-    with st.expander("📈 Top 10 采购额增长供应商 (绝对金额)", expanded=True): # 默认展开
+    with st.expander("📈 Top 10 采购额增长供应商 (绝对金额)", expanded=True), timed('Top 10 增长供应商'): # 默认展开
         # 计算Top 10增长供应商 (按绝对增长金额)
-        # 确保 '增长金额' 列是数值类型，如果 load_data 中未处理
-        if not pd.api.types.is_numeric_dtype(supplier_data['增长金额']):
-            supplier_data['增长金额'] = pd.to_numeric(supplier_data['增长金额'], errors='coerce')
-            supplier_data.dropna(subset=['增长金额'], inplace=True) # 删除无法转换的行
-
-        top_10_growth_suppliers = supplier_data.nlargest(10, '增长金额').copy()
+        # '增长金额' 的数值类型已由 load_data 的结构校验保证
+        top_10_growth_suppliers = manager['top_suppliers']
 
         # 可视化 Top 10 增长供应商的绝对增长金额
         st.subheader("可视化：增长金额对比")
         if not top_10_growth_suppliers.empty:
-            fig_top10_bar = px.bar(
-                top_10_growth_suppliers,
-                x='供应商',
-                y='增长金额',
-                title="Top 10 供应商 - 绝对增长金额 (2025预算 vs 2024实际)",
-                text='增长金额',
-                labels={'供应商': '供应商名称', '增长金额': '增长金额 (元)'},
-                color='Category', # 按品类着色
-                hover_data=['Category', 'Sub Category', '增长率']
-            )
-            fig_top10_bar.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-            fig_top10_bar.update_layout(xaxis_tickangle=-45, height=500, yaxis_title="增长金额 (元)")
-            st.plotly_chart(fig_top10_bar, use_container_width=True)
+            st.plotly_chart(manager['top_suppliers_figure'], use_container_width=True)
         else:
             st.warning("未能计算Top 10增长供应商数据。")
 
@@ -402,20 +616,15 @@ with tab_manager:
         # 显示 Top 10 供应商详细数据列表
         st.subheader("Top 10 供应商详细数据")
         if not top_10_growth_suppliers.empty:
-            display_suppliers = top_10_growth_suppliers[[
-                '供应商', 'Category', 'Sub Category', 
-                '2024合计入库金额', '2025合计预算金额', '增长金额', '增长率'
-            ]].copy()
+            display_suppliers = manager['top_supplier_table'].copy()
             # 格式化显示
             display_suppliers['增长率'] = display_suppliers['增长率'].apply(
                 lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A"
             )
-            # 添加序号列
-            display_suppliers.insert(0, '排名', range(1, 1 + len(display_suppliers)))
             st.dataframe(
                 display_suppliers.style.format({
-                    '2024合计入库金额': '{:,.0f}',
-                    '2025合计预算金额': '{:,.0f}',
+                    base_total_col: '{:,.0f}',
+                    compare_total_col: '{:,.0f}',
                     '增长金额': '{:,.0f}'
                 }), 
                 use_container_width=True,
@@ -424,48 +633,31 @@ with tab_manager:
         else:
             st.info("没有找到符合条件的供应商数据。")
 
-    # --- 2025年关键子类别降本指南 (环形图 + 交互式表格) ---
-    with st.expander("🎯 2025年关键子类别降本指南 (预算占比与供应商明细)", expanded=True): # 将 expanded 改为 True
+    # --- 对比年度关键子类别降本指南 (环形图 + 交互式表格) ---
+    with st.expander(f"🎯 {compare_year}年关键子类别降本指南 (预算占比与供应商明细)", expanded=True), timed('关键子类别降本指南'): # 将 expanded 改为 True
         st.markdown("通过环形图查看各品类下子类别的预算占比，并选择子类别查看详细的供应商预算明细。")
 
-        # 准备数据：按Category和Sub Category聚合2025年预算
-        subcat_spend_2025 = supplier_data.groupby(['Category', 'Sub Category'], observed=True)['2025合计预算金额'].sum().reset_index()
+        # 准备数据：按Category和Sub Category聚合对比年度预算
         # 过滤掉预算为0或负数的子类别，避免影响可视化和选择
-        subcat_spend_2025 = subcat_spend_2025[subcat_spend_2025['2025合计预算金额'] > 0]
-        
         # 获取所有Category
-        all_categories = subcat_spend_2025['Category'].unique()
+        all_categories = manager['budget']['Category'].unique()
 
         # 遍历每个Category进行分析
         for category in all_categories:
             st.markdown(f"### {category}")
             
             # 筛选当前Category的数据
-            category_subcats_data = subcat_spend_2025[subcat_spend_2025['Category'] == category].copy()
-            category_subcats_data = category_subcats_data.sort_values('2025合计预算金额', ascending=False)
+            budget_detail = section('category_detail', category)
+            category_subcats_data = budget_detail['budget']
 
             col1, col2 = st.columns([1, 1]) # 左右布局：左图右选择+表格
 
             with col1:
                 # 创建环形图
                 if not category_subcats_data.empty:
-                    fig_donut = go.Figure(data=[go.Pie(
-                        labels=category_subcats_data['Sub Category'],
-                        values=category_subcats_data['2025合计预算金额'],
-                        hole=.4, # 设置空心比例
-                        textinfo='percent', # 显示百分比
-                        hoverinfo='label+value+percent', # 鼠标悬停信息
-                        insidetextorientation='radial' # 文本方向
-                    )])
-                    fig_donut.update_layout(
-                        title_text=f"{category} - 子类别预算占比",
-                        height=400,
-                        showlegend=False, # 通常子类别过多时图例意义不大
-                        margin=dict(t=50, l=0, r=0, b=0)
-                    )
-                    st.plotly_chart(fig_donut, use_container_width=True)
+                    st.plotly_chart(budget_detail['budget_donut'], use_container_width=True)
                 else:
-                    st.info(f"{category} 品类下无2025年预算数据。")
+                    st.info(f"{category} 品类下无{compare_year}年预算数据。")
 
             with col2:
                 if not category_subcats_data.empty:
@@ -483,27 +675,19 @@ with tab_manager:
                     
                     # 根据选择显示供应商明细
                     if selected_subcat:
-                        st.markdown(f"**{selected_subcat} - 供应商2025年预算明细:**")
-                        # 筛选供应商数据
-                        subcat_suppliers_detail = supplier_data[
-                            (supplier_data['Category'] == category) & 
-                            (supplier_data['Sub Category'] == selected_subcat) & 
-                            (supplier_data['2025合计预算金额'] > 0) # 只显示有预算的
-                        ].copy()
+                        st.markdown(f"**{selected_subcat} - 供应商{compare_year}年预算明细:**")
+                        # 筛选供应商数据（只显示有预算的）
+                        supplier_budget_list = budget_detail['budget_suppliers'][selected_subcat]
                         
-                        if not subcat_suppliers_detail.empty:
-                            supplier_budget_list = subcat_suppliers_detail[[
-                                '供应商', '2025合计预算金额'
-                            ]].sort_values('2025合计预算金额', ascending=False).reset_index(drop=True)
-                            
+                        if not supplier_budget_list.empty:
                             st.dataframe(
-                                supplier_budget_list.style.format({'2025合计预算金额': '{:,.0f}'}),
+                                supplier_budget_list.style.format({compare_total_col: '{:,.0f}'}),
                                 use_container_width=True,
                                 height=min(300, 35 + 35 * len(supplier_budget_list)), # 调整高度
                                 hide_index=True
                             )
                         else:
-                            st.info(f"在 {selected_subcat} 子类别下未找到2025年有预算的供应商。")
+                            st.info(f"在 {selected_subcat} 子类别下未找到{compare_year}年有预算的供应商。")
                 else:
                     st.info("无子类别可供选择。")
             
@@ -512,102 +696,31 @@ with tab_manager:
 
 # --- tab_manager 内容结束 ---
 
-with tab2:
+with tab2, timed('品类战略分析'):
     st.header("品类战略分析")
     
-    # 计算每个Category的总采购额和增长率
-    category_summary = category_data.groupby('Category').agg({
-        '2024年Spend': 'sum',
-        '2025年Spend': 'sum',
-        '增长金额': 'sum'
-    }).reset_index()
-    
-    category_summary['增长率'] = (category_summary['增长金额'] / category_summary['2024年Spend'] * 100).round(1)
+    # 每个Category的总采购额和增长率、品类趋势与结构变化
+    category_outputs = section('category')
     
     # 创建气泡图
-    fig = px.scatter(
-        category_summary,
-        x='2024年Spend',
-        y='增长率',
-        size='2025年Spend',
-        color='Category',
-        text='Category',
-        title="品类战略矩阵分析",
-        labels={
-            '2024年Spend': '2024年采购规模',
-            '增长率': '增长率(%)',
-            '2025年Spend': '2025年预测规模'
-        }
-    )
-    
-    fig.update_traces(textposition='top center')
-    fig.update_layout(height=600)
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(category_outputs['matrix_figure'], use_container_width=True)
     
     # Top 10 增长和下降的子品类
     col1, col2 = st.columns(2)
     
     with col1:
-        # 过滤掉无效的增长率数据（inf和-100）
-        valid_growth_data = category_data[
-            (category_data['增长率'] != float('inf')) & 
-            (category_data['增长率'] != -100) &
-            (category_data['2024年Spend'] > 100000)  # 添加最小基数过滤
-        ].copy()
-        
-        # 获取Top 10高增长子品类
-        top_growth = valid_growth_data.nlargest(10, '增长率')
-        
-        # 创建柱状图
-        fig = px.bar(
-            top_growth,
-            x='Sub category',
-            y='增长率',
-            title="Top 10 高增长子品类",
-            color='Category',
-            text=top_growth['增长率'].apply(lambda x: f'{x:.1f}%')
-        )
-        
-        # 更新布局
-        fig.update_layout(
-            height=400,
-            xaxis_title="子品类",
-            yaxis_title="增长率(%)",
-            xaxis_tickangle=-45,
-            showlegend=True
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        # 过滤掉无效的增长率数据（inf和-100）及基数不足10万的子品类，取Top 10高增长/负增长子品类
+        st.plotly_chart(category_outputs['top_growth_figure'], use_container_width=True)
     
     with col2:
-        # 获取Top 10负增长子品类
-        top_decline = valid_growth_data.nsmallest(10, '增长率')
-        
-        # 创建柱状图
-        fig = px.bar(
-            top_decline,
-            x='Sub category',
-            y='增长率',
-            title="Top 10 负增长子品类",
-            color='Category',
-            text=top_decline['增长率'].apply(lambda x: f'{x:.1f}%')
-        )
-        
-        # 更新布局
-        fig.update_layout(
-            height=400,
-            xaxis_title="子品类",
-            yaxis_title="增长率(%)",
-            xaxis_tickangle=-45,
-            showlegend=True
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(category_outputs['top_decline_figure'], use_container_width=True)
         
     # 添加数据说明
-    st.markdown("""
+    st.markdown(f"""
     #### 📊 增长率说明
-    - 高增长子品类：显示增长率最高的10个子品类（不含新增品类，且2024年基数>10万元）
-    - 负增长子品类：显示增长率最低的10个子品类（不含停止采购品类，且2024年基数>10万元）
-    - 增长率计算：(2025年预测 - 2024年实际) / 2024年实际 × 100%
+    - 高增长子品类：显示增长率最高的10个子品类（不含新增品类，且{base_year}年基数>10万元）
+    - 负增长子品类：显示增长率最低的10个子品类（不含停止采购品类，且{base_year}年基数>10万元）
+    - 增长率计算：({compare_year}年 - {base_year}年) / {base_year}年 × 100%
     """)
 
     # 品类战略建议
@@ -631,88 +744,40 @@ with tab2:
     # 在tab2中替换BCG矩阵，改用品类趋势分析
     st.subheader("📊 品类趋势矩阵对比分析")
     
-    # 计算2024年品类的关键指标
-    category_analysis_2024 = category_summary.copy()
-    category_analysis_2024['采购占比'] = category_analysis_2024['2024年Spend'] / category_analysis_2024['2024年Spend'].sum() * 100
-    category_analysis_2024['年度变化额'] = category_analysis_2024['2025年Spend'] - category_analysis_2024['2024年Spend']
-
-    # 计算2025年品类的关键指标
-    category_analysis_2025 = category_summary.copy()
-    category_analysis_2025['采购占比'] = category_analysis_2025['2025年Spend'] / category_analysis_2025['2025年Spend'].sum() * 100
-    category_analysis_2025['年度变化额'] = category_analysis_2025['2025年Spend'] - category_analysis_2025['2024年Spend']
+    # 两个年度品类的采购占比与年度变化额
+    category_analysis_base = category_outputs['analysis_base']
 
     # 创建两列布局
     col1, col2 = st.columns(2)
 
     with col1:
-        st.markdown("### 2024年品类趋势矩阵")
-        # 创建2024年趋势矩阵
-        fig1 = px.scatter(
-            category_analysis_2024,
-            x='采购占比',
-            y='增长率',
-            size='2024年Spend',
-            color='年度变化额',
-            text='Category',
-            labels={
-                '采购占比': '2024年采购占比 (%)',
-                '增长率': '增长率 (%)',
-                '年度变化额': '年度变化金额'
-            }
-        )
-        fig1.add_hline(y=0, line_dash="dash", line_color="gray")
-        fig1.add_vline(x=category_analysis_2024['采购占比'].mean(), line_dash="dash", line_color="gray")
-        fig1.update_layout(height=500)
-        st.plotly_chart(fig1, use_container_width=True)
+        st.markdown(f"### {base_year}年品类趋势矩阵")
+        # 创建基准年度趋势矩阵
+        st.plotly_chart(category_outputs['base_trend_figure'], use_container_width=True)
 
     with col2:
-        st.markdown("### 2025年品类趋势矩阵")
-        # 创建2025年趋势矩阵
-        fig2 = px.scatter(
-            category_analysis_2025,
-            x='采购占比',
-            y='增长率',
-            size='2025年Spend',
-            color='年度变化额',
-            text='Category',
-            labels={
-                '采购占比': '2025年采购占比 (%)',
-                '增长率': '增长率 (%)',
-                '年度变化额': '年度变化金额'
-            }
-        )
-        fig2.add_hline(y=0, line_dash="dash", line_color="gray")
-        fig2.add_vline(x=category_analysis_2025['采购占比'].mean(), line_dash="dash", line_color="gray")
-        fig2.update_layout(height=500)
-        st.plotly_chart(fig2, use_container_width=True)
+        st.markdown(f"### {compare_year}年品类趋势矩阵")
+        # 创建对比年度趋势矩阵
+        st.plotly_chart(category_outputs['compare_trend_figure'], use_container_width=True)
 
     # 添加矩阵对比分析
     st.markdown("### 📊 品类趋势矩阵对比分析")
     
     # 计算关键变化指标
-    category_changes = pd.DataFrame({
-        'Category': category_analysis_2024['Category'],
-        '2024采购占比': category_analysis_2024['采购占比'],
-        '2025采购占比': category_analysis_2025['采购占比'],
-        '占比变化': category_analysis_2025['采购占比'] - category_analysis_2024['采购占比'],
-        '2024年Spend': category_analysis_2024['2024年Spend'],
-        '2025年Spend': category_analysis_2024['2025年Spend'],
-        '增长率': category_analysis_2024['增长率']
-    }).sort_values('占比变化', ascending=False)
 
     # 显示品类变化分析表
     st.markdown("#### 品类结构变化分析")
     
     # 创建格式化版本的数据用于显示
-    display_category_changes = category_changes.copy()
+    display_category_changes = category_outputs['changes'].copy()
     
     # 格式化各列
-    for col in ['2024采购占比', '2025采购占比', '占比变化']:
+    for col in [f'{base_year}采购占比', f'{compare_year}采购占比', '占比变化']:
         display_category_changes[col] = display_category_changes[col].apply(
             lambda x: f"{x:.1f}%" if col != '占比变化' else f"{x:+.1f}%"
         )
     
-    for col in ['2024年Spend', '2025年Spend']:
+    for col in [base_spend_col, compare_spend_col]:
         display_category_changes[col] = display_category_changes[col].apply(lambda x: f"{x:,.0f}")
     
     display_category_changes['增长率'] = display_category_changes['增长率'].apply(lambda x: f"{x:.1f}%")
@@ -736,63 +801,43 @@ with tab2:
        - 对于占比下降的品类：评估下降原因，优化采购策略
        - 对于新晋重要品类：提前布局供应商资源，建立战略合作关系
        - 对于地位下降品类：分析市场需求变化，调整采购策略
-    """.format(
-        up_cat=category_changes.iloc[0]['Category'],
-        up_pct=category_changes.iloc[0]['占比变化'],
-        down_cat=category_changes.iloc[-1]['Category'],
-        down_pct=category_changes.iloc[-1]['占比变化'],
-        new_important=', '.join(category_changes[
-            (category_changes['2024采购占比'] < category_changes['2024采购占比'].mean()) & 
-            (category_changes['2025采购占比'] > category_changes['2025采购占比'].mean())
-        ]['Category'].tolist()),
-        declining=', '.join(category_changes[
-            (category_changes['2024采购占比'] > category_changes['2024采购占比'].mean()) & 
-            (category_changes['2025采购占比'] < category_changes['2025采购占比'].mean())
-        ]['Category'].tolist())
-    ))
+    """.format(**category_outputs['conclusions']))
 
     # 添加品类详细信息的交互部分
     st.subheader("📊 品类详细信息查看")
     selected_category = st.selectbox(
         "选择品类查看详细信息：",
-        category_analysis_2024['Category'].unique()
+        category_analysis_base['Category'].unique()
     )
 
     # 显示所选品类的供应商信息
-    category_suppliers = supplier_data[supplier_data['Category'] == selected_category].copy()
-    category_suppliers['采购占比'] = category_suppliers['2024合计入库金额'] / category_suppliers['2024合计入库金额'].sum() * 100
+    selected_category_detail = section('category_detail', selected_category)
+    selected_category_suppliers = selected_category_detail['suppliers']
 
     col1, col2 = st.columns(2)
     with col1:
         st.markdown(f"### {selected_category}品类概况")
-        category_info = category_analysis_2024[category_analysis_2024['Category'] == selected_category].iloc[0]
+        category_info = category_analysis_base[category_analysis_base['Category'] == selected_category].iloc[0]
         st.markdown(f"""
-        - 2024年采购额：{category_info['2024年Spend']:,.0f}元
-        - 2025年预测：{category_info['2025年Spend']:,.0f}元
+        - {base_year}年采购额：{category_info[base_spend_col]:,.0f}元
+        - {compare_year}年预测：{category_info[compare_spend_col]:,.0f}元
         - 增长率：{category_info['增长率']:.1f}%
         - 采购占比：{category_info['采购占比']:.1f}%
         """)
 
     with col2:
         st.markdown("### 供应商分布")
-        fig = px.pie(
-            category_suppliers,
-            values='2024合计入库金额',
-            names='供应商',
-            title=f"{selected_category}供应商采购金额分布"
-        )
-        fig.update_layout(height=300)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(selected_category_detail['supplier_pie'], use_container_width=True)
 
     # 显示供应商详细数据
     st.markdown("### 供应商明细数据")
     st.dataframe(
-        category_suppliers[[
-            '供应商', '2024合计入库金额', '2025合计预算金额', 
+        selected_category_suppliers[[
+            '供应商', base_total_col, compare_total_col, 
             '增长率', '采购占比'
-        ]].sort_values('2024合计入库金额', ascending=False).style.format({
-            '2024合计入库金额': '{:,.0f}',
-            '2025合计预算金额': '{:,.0f}',
+        ]].sort_values(base_total_col, ascending=False).style.format({
+            base_total_col: '{:,.0f}',
+            compare_total_col: '{:,.0f}',
             '增长率': '{:.1f}%',
             '采购占比': '{:.1f}%'
         }),
@@ -826,122 +871,43 @@ with tab2:
     # Sub Category数据变化分析
     st.subheader("Sub Category数据变化分析")
     
-    # 读取并处理Sub Category数据
-    subcategory_data = category_data.copy()  # 使用已加载的数据而不是重新读取
-    
-    # 计算增长率和增长金额
-    subcategory_data['增长金额'] = subcategory_data['2025年Spend'] - subcategory_data['2024年Spend']
-    # 修改增长率计算逻辑，处理2024年为0的特殊情况
-    subcategory_data['增长率'] = subcategory_data.apply(
-        lambda row: (
-            0 if row['2024年Spend'] == 0 and row['2025年Spend'] == 0
-            else float('inf') if row['2024年Spend'] == 0 and row['2025年Spend'] > 0
-            else -100 if row['2025年Spend'] == 0
-            else (row['增长金额'] / row['2024年Spend'] * 100)
-        ),
-        axis=1
-    )
-    
     # 创建选择器让用户选择Category
     selected_category = st.selectbox(
         "选择Category查看Sub Category详情：",
-        sorted(subcategory_data['Category'].unique())
+        category_outputs['subcategory_categories']
     )
     
-    # 筛选选中Category的数据
-    category_detail = subcategory_data[subcategory_data['Category'] == selected_category].copy()
+    # 选中Category的子类别增长金额和增长率：基准年度为0时记为新增，对比年度为0时记为停止采购
+    subcategory_detail = section('category_detail', selected_category)
+    category_detail = subcategory_detail['detail']
     
     # 创建两列布局
     col1, col2 = st.columns(2)
     
     with col1:
         # 创建Sub Category的采购金额对比图
-        fig = go.Figure()
-        
-        # 添加2024年数据
-        fig.add_trace(go.Bar(
-            name='2024年',
-            x=category_detail['Sub category'],
-            y=category_detail['2024年Spend'],
-            text=category_detail['2024年Spend'].apply(lambda x: f'{x:,.0f}'),
-            textposition='auto',
-        ))
-        
-        # 添加2025年数据
-        fig.add_trace(go.Bar(
-            name='2025年',
-            x=category_detail['Sub category'],
-            y=category_detail['2025年Spend'],
-            text=category_detail['2025年Spend'].apply(lambda x: f'{x:,.0f}'),
-            textposition='auto',
-        ))
-        
-        # 更新布局
-        fig.update_layout(
-            title=f"{selected_category} - Sub Category采购金额对比",
-            barmode='group',
-            height=400,
-            yaxis_title="采购金额",
-            xaxis_title="Sub Category"
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(subcategory_detail['amount_figure'], use_container_width=True)
     
     with col2:
-        # 创建增长率图表
-        fig = go.Figure()
-        
-        # 添加增长率数据，处理特殊值的显示
-        growth_text = category_detail['增长率'].apply(
-            lambda x: '新增' if x == float('inf') else (
-                '停止' if x == -100 else f'{x:.1f}%'
-            )
-        )
-        
-        fig.add_trace(go.Bar(
-            x=category_detail['Sub category'],
-            y=category_detail['增长率'].apply(
-                lambda x: 100 if x == float('inf') else (
-                    -100 if x == -100 else x
-                )
-            ),
-            text=growth_text,
-            textposition='auto',
-            marker_color=category_detail['增长率'].apply(
-                lambda x: 'red' if x < -30 else ('green' if x > 30 or x == float('inf') else 'orange')
-            )
-        ))
-        
-        # 更新布局
-        fig.update_layout(
-            title=f"{selected_category} - Sub Category增长率分析",
-            height=400,
-            yaxis_title="增长率 (%)",
-            xaxis_title="Sub Category"
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        # 创建增长率图表，新增按100%显示
+        st.plotly_chart(subcategory_detail['growth_figure'], use_container_width=True)
     
     # 显示详细数据表格
     st.markdown("#### 详细数据")
     
     # 格式化数据显示
     formatted_data = category_detail.copy()
-    formatted_data['2024年Spend'] = formatted_data['2024年Spend'].apply(lambda x: f'{x:,.0f}')
-    formatted_data['2025年Spend'] = formatted_data['2025年Spend'].apply(lambda x: f'{x:,.0f}')
+    formatted_data[base_spend_col] = formatted_data[base_spend_col].apply(lambda x: f'{x:,.0f}')
+    formatted_data[compare_spend_col] = formatted_data[compare_spend_col].apply(lambda x: f'{x:,.0f}')
     formatted_data['增长金额'] = formatted_data['增长金额'].apply(lambda x: f'{x:,.0f}')
-    formatted_data['增长率'] = formatted_data['增长率'].apply(
-        lambda x: '新增' if x == float('inf') else (
-            '停止' if x == -100 else f'{x:.1f}%'
-        )
-    )
+    formatted_data['增长率'] = formatted_data['增长率'].apply(growth_label)
     
     # 显示数据表格
     # 创建一个新的DataFrame，因为formatted_data中的增长率已经是字符串格式
     display_data = pd.DataFrame({
         'Sub category': formatted_data['Sub category'],
-        '2024年Spend': formatted_data['2024年Spend'],
-        '2025年Spend': formatted_data['2025年Spend'],
+        base_spend_col: formatted_data[base_spend_col],
+        compare_spend_col: formatted_data[compare_spend_col],
         '增长金额': formatted_data['增长金额'],
         '增长率': formatted_data['增长率']
     })
@@ -951,33 +917,18 @@ with tab2:
     # 添加分析总结
     st.markdown("#### 分析总结")
     
-    # 计算关键指标（排除特殊值）
-    valid_growth = category_detail[
-        (category_detail['增长率'] != float('inf')) & 
-        (category_detail['增长率'] != -100)
-    ]['增长率']
-    
-    avg_growth = valid_growth.mean() if not valid_growth.empty else 0
-    max_growth = valid_growth.max() if not valid_growth.empty else 0
-    min_growth = valid_growth.min() if not valid_growth.empty else 0
-    
-    # 计算特殊情况的数量并获取具体项目
-    new_items = category_detail[category_detail['增长率'] == float('inf')]
-    stopped_items = category_detail[category_detail['增长率'] == -100]
-    high_growth_items = category_detail[
-        (category_detail['增长率'] > 30) & 
-        (category_detail['增长率'] != float('inf'))
-    ].sort_values('增长率', ascending=False)
-    low_growth_items = category_detail[
-        (category_detail['增长率'] < -30) & 
-        (category_detail['增长率'] != -100)
-    ].sort_values('增长率')
+    # 计算关键指标（排除特殊值），以及特殊情况的具体项目
+    growth_summary = subcategory_detail['growth_summary']
+    new_items = growth_summary['new_items']
+    stopped_items = growth_summary['stopped_items']
+    high_growth_items = growth_summary['high_growth_items']
+    low_growth_items = growth_summary['low_growth_items']
     
     st.markdown(f"""
     **{selected_category}类别分析：**
-    - 平均增长率：{avg_growth:.1f}%（不含新增和停止项）
-    - 最高增长率：{max_growth:.1f}%（不含新增项）
-    - 最低增长率：{min_growth:.1f}%（不含停止项）
+    - 平均增长率：{growth_summary['avg_growth']:.1f}%（不含新增和停止项）
+    - 最高增长率：{growth_summary['max_growth']:.1f}%（不含新增项）
+    - 最低增长率：{growth_summary['min_growth']:.1f}%（不含停止项）
     
     **新增Sub Category（{len(new_items)}个）：**
     {new_items['Sub category'].to_list() if not new_items.empty else '无'}
@@ -992,27 +943,13 @@ with tab2:
     {low_growth_items.apply(lambda x: f"- {x['Sub category']}（{x['增长率']:.1f}%）", axis=1).to_list() if not low_growth_items.empty else '无'}
     """)
 
-with tab3:
+with tab3, timed('供应商管理矩阵'):
     st.header("供应商管理矩阵")
     
-    # 创建供应商矩阵图
-    fig = px.scatter(
-        supplier_data.head(50),  # 取前50大供应商
-        x='2024合计入库金额',
-        y='增长率',
-        size='2025合计预算金额',
-        color='Category',
-        hover_name='供应商',
-        title="供应商战略矩阵（Top 50）",
-        labels={
-            '2024合计入库金额': '2024年采购规模',
-            '增长率': '增长率(%)',
-            '2025合计预算金额': '2025年预测规模'
-        }
-    )
+    supplier_outputs = section('supplier')
     
-    fig.update_layout(height=600)
-    st.plotly_chart(fig, use_container_width=True)
+    # 创建供应商矩阵图（取前50大供应商）
+    st.plotly_chart(supplier_outputs['matrix_figure'], use_container_width=True)
     
     # 供应商集中度分析
     st.subheader("供应商集中度分析")
@@ -1020,45 +957,41 @@ with tab3:
     
     with col1:
         # 添加Top10供应商详细信息
-        st.markdown("### 2024年 Top 10供应商")
+        st.markdown(f"### {base_year}年 Top 10供应商")
         
-        # 计算2024年Top10供应商
-        top10_2024 = supplier_data.nlargest(10, '2024合计入库金额').copy()
-        total_2024 = supplier_data['2024合计入库金额'].sum()
-        top10_2024['2024占比'] = top10_2024['2024合计入库金额'] / total_2024 * 100
+        # 计算基准年度Top10供应商
+        top10_base = supplier_outputs['top_base']
         
-        # 显示2024年Top10供应商表格
+        # 显示基准年度Top10供应商表格
         st.dataframe(
-            top10_2024[[
+            top10_base[[
                 '供应商', 'Category', 'Sub Category',
-                '2024合计入库金额', '2024占比'
+                base_total_col, f'{base_year}占比'
             ]].style.format({
-                '2024合计入库金额': '{:,.0f}',
-                '2024占比': '{:.1f}%'
+                base_total_col: '{:,.0f}',
+                f'{base_year}占比': '{:.1f}%'
             }).background_gradient(
-                subset=['2024占比'],
+                subset=[f'{base_year}占比'],
                 cmap='YlOrRd'
             ),
             use_container_width=True
         )
 
-        st.markdown("### 2025年 Top 10供应商")
+        st.markdown(f"### {compare_year}年 Top 10供应商")
         
-        # 计算2025年Top10供应商
-        top10_2025 = supplier_data.nlargest(10, '2025合计预算金额').copy()
-        total_2025 = supplier_data['2025合计预算金额'].sum()
-        top10_2025['2025占比'] = top10_2025['2025合计预算金额'] / total_2025 * 100
+        # 计算对比年度Top10供应商
+        top10_compare = supplier_outputs['top_compare']
         
-        # 显示2025年Top10供应商表格
+        # 显示对比年度Top10供应商表格
         st.dataframe(
-            top10_2025[[
+            top10_compare[[
                 '供应商', 'Category', 'Sub Category',
-                '2025合计预算金额', '2025占比'
+                compare_total_col, f'{compare_year}占比'
             ]].style.format({
-                '2025合计预算金额': '{:,.0f}',
-                '2025占比': '{:.1f}%'
+                compare_total_col: '{:,.0f}',
+                f'{compare_year}占比': '{:.1f}%'
             }).background_gradient(
-                subset=['2025占比'],
+                subset=[f'{compare_year}占比'],
                 cmap='YlOrRd'
             ),
             use_container_width=True
@@ -1068,8 +1001,7 @@ with tab3:
         st.markdown("### Top 10供应商变化分析")
         
         # 找出进入/退出Top10的供应商
-        new_top10 = set(top10_2025['供应商']) - set(top10_2024['供应商'])
-        exit_top10 = set(top10_2024['供应商']) - set(top10_2025['供应商'])
+        new_top10, exit_top10 = supplier_outputs['new_top'], supplier_outputs['exit_top']
         
         st.markdown(f"""
         #### 📊 Top 10变化情况：
@@ -1081,57 +1013,16 @@ with tab3:
         st.markdown("### 各品类供应商分布")
         
         # 计算各品类的供应商数量和占比
-        category_supplier_stats = pd.DataFrame({
-            '供应商数量': supplier_data.groupby('Category', observed=True)['供应商'].nunique(),
-            '采购金额': supplier_data.groupby('Category', observed=True)['2024合计入库金额'].sum()
-        }).reset_index()
-        
-        # 计算供应商数量占比
-        total_suppliers = category_supplier_stats['供应商数量'].sum()
-        category_supplier_stats['供应商占比'] = (category_supplier_stats['供应商数量'] / total_suppliers * 100)
+        supplier_stats = supplier_outputs['category_stats'].copy()
         
-        # 创建饼图
-        fig = go.Figure()
-        
-        # 添加环形图
-        fig.add_trace(go.Pie(
-            labels=category_supplier_stats['Category'],
-            values=category_supplier_stats['供应商占比'],  # 使用供应商占比
-            hole=0.6,
-            textinfo='label+percent',
-            textposition='outside',
-            texttemplate='%{label}<br>%{value:.1f}%',  # 显示精确的占比值
-            showlegend=False,
-            marker=dict(colors=px.colors.qualitative.Set3)
-        ))
-        
-        # 在中心添加总计信息
-        fig.add_annotation(
-            text=f"总供应商数量<br>{total_suppliers}家",
-            x=0.5, y=0.5,
-            font=dict(size=14, color='black'),
-            showarrow=False
-        )
-        
-        # 更新布局
-        fig.update_layout(
-            height=400,
-            title={
-                'text': "供应商数量分布",
-                'y': 0.95,
-                'x': 0.5,
-                'xanchor': 'center',
-                'yanchor': 'top'
-            },
-            margin=dict(t=60, l=20, r=20, b=20)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        # 创建环形图，中心显示供应商总数
+        st.plotly_chart(supplier_outputs['category_donut'], use_container_width=True)
         
         # 添加详细数据表格
         st.markdown("#### 品类供应商详细分布")
-        category_supplier_stats['采购金额'] = category_supplier_stats['采购金额'] / 10000  # 转换为万元
+        supplier_stats['采购金额'] = supplier_stats['采购金额'] / 10000  # 转换为万元
         st.dataframe(
-            category_supplier_stats.style.format({
+            supplier_stats.style.format({
                 '供应商数量': '{:,.0f}',
                 '采购金额': '{:,.0f}万',
                 '供应商占比': '{:.1f}%'
@@ -1165,81 +1056,58 @@ with tab3:
     # 在tab3中替换Kraljic矩阵，改用供应商结构分析
     st.subheader("📊 供应商结构分析")
     
-    # 计算供应商的关键指标
-    supplier_analysis = supplier_data.copy()
-    supplier_analysis['采购占比'] = supplier_analysis['2024合计入库金额'] / supplier_analysis['2024合计入库金额'].sum() * 100
-    supplier_analysis['供应商等级'] = pd.qcut(supplier_analysis['2024合计入库金额'], q=4, labels=['D级', 'C级', 'B级', 'A级'])
-    
+    # 按基准年度采购额四分位分级
     col1, col2 = st.columns(2)
     with col1:
-        supplier_level_dist = supplier_analysis.groupby('供应商等级').size()
-        fig = px.pie(
-            values=supplier_level_dist.values,
-            names=supplier_level_dist.index,
-            title="供应商等级分布",
-            hole=0.4
-        )
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(supplier_outputs['tier_count_figure'], use_container_width=True)
     
     with col2:
-        supplier_level_amount = supplier_analysis.groupby('供应商等级')['2024合计入库金额'].sum()
-        supplier_level_amount_pct = supplier_level_amount / supplier_level_amount.sum() * 100
-        fig = px.bar(
-            x=supplier_level_amount_pct.index,
-            y=supplier_level_amount_pct.values,
-            title="各等级供应商采购金额占比",
-            labels={'x': '供应商等级', 'y': '采购金额占比 (%)'},
-            text=supplier_level_amount_pct.round(1).astype(str) + '%'
-        )
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(supplier_outputs['tier_amount_figure'], use_container_width=True)
 
     # 添加供应商等级详细信息的交互部分
     st.subheader("📊 供应商等级详细信息")
     selected_level = st.selectbox(
         "选择供应商等级查看详细信息：",
-        ['A级', 'B级', 'C级', 'D级']
+        TIERS[::-1]
     )
 
     # 显示所选等级的供应商信息
-    level_suppliers = supplier_analysis[supplier_analysis['供应商等级'] == selected_level].copy()
+    tier_outputs = section('tier', selected_level)
+    level_suppliers = tier_outputs['suppliers']
+    level_summary = tier_outputs['summary']
     
     col1, col2 = st.columns(2)
     with col1:
         st.markdown(f"### {selected_level}供应商概况")
         st.markdown(f"""
-        - 供应商数量：{len(level_suppliers)}家
-        - 采购总额：{level_suppliers['2024合计入库金额'].sum():,.0f}元
-        - 平均采购额：{level_suppliers['2024合计入库金额'].mean():,.0f}元
-        - 平均增长率：{level_suppliers['增长率'].mean():.1f}%
+        - 供应商数量：{level_summary['count']}家
+        - 采购总额：{level_summary['total']:,.0f}元
+        - 平均采购额：{level_summary['mean']:,.0f}元
+        - 平均增长率：{level_summary['mean_growth']:.1f}%
         """)
 
     with col2:
         st.markdown("### 品类分布")
-        fig = px.pie(
-            level_suppliers,
-            values='2024合计入库金额',
-            names='Category',
-            title=f"{selected_level}供应商品类分布"
-        )
-        fig.update_layout(height=300)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(tier_outputs['category_figure'], use_container_width=True)
 
     # 显示供应商详细数据
     st.markdown("### 供应商明细数据")
+    level_supplier_columns = ['供应商', 'Category', base_total_col, compare_total_col, '增长率', '采购占比']
+    level_suppliers_view = level_suppliers[level_supplier_columns].sort_values(base_total_col, ascending=False)
     st.dataframe(
-        level_suppliers[[
-            '供应商', 'Category', '2024合计入库金额', '2025合计预算金额',
-            '增长率', '采购占比'
-        ]].sort_values('2024合计入库金额', ascending=False).style.format({
-            '2024合计入库金额': '{:,.0f}',
-            '2025合计预算金额': '{:,.0f}',
+        level_suppliers_view.style.format({
+            base_total_col: '{:,.0f}',
+            compare_total_col: '{:,.0f}',
             '增长率': '{:.1f}%',
             '采购占比': '{:.1f}%'
         }),
         use_container_width=True
     )
+    export_controls('level_suppliers', {
+        f'{selected_level}供应商': lambda: level_suppliers_view,
+        '全部供应商': lambda: supplier_tiers(data)[level_supplier_columns + ['供应商等级']]
+        .sort_values(base_total_col, ascending=False),
+    }, '供应商等级明细')
 
     # 供应商集中度分析
     st.markdown("""
@@ -1263,9 +1131,19 @@ with tab3:
        - D级供应商：常规管理，优化结构
     """)
 
-with tab4:
+# 预算再分配方案：按目标参数缓存优化结果
+@track_cache('optimize_supplier_budget', compute_cache.memoize())
+def optimize_supplier_budget(_supplier_data, version, base_year, compare_year, max_share, max_hhi, capacity_factor,
+                             budget_col, volume_col):
+    return optimize_reallocation(
+        _supplier_data, budget_col, volume_col, max_share=max_share, max_hhi=max_hhi, capacity_factor=capacity_factor
+    )
+
+with tab4, timed('风险预警与建议'):
     st.header("风险预警与建议")
     
+    risk_outputs = section('risk')
+    
     # 风险预警指标
     st.subheader("🚨 主要风险指标")
     
@@ -1273,11 +1151,7 @@ with tab4:
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        # 计算高依赖供应商数量（采购额占比>10%的供应商）
-        total_spend_2024 = supplier_data['2024合计入库金额'].sum()
-        high_dependency = len(supplier_data[
-            supplier_data['2024合计入库金额'] / total_spend_2024 > 0.1
-        ])
+        # 高依赖供应商数量（采购额占比>10%的供应商）
         st.metric(
             label="高依赖供应商数量",
             value=f"{high_dependency}个",
@@ -1286,36 +1160,33 @@ with tab4:
     
     with col2:
         # 计算大幅下滑品类数量和详细信息
-        # 只考虑2024年基数大于100万的品类
-        significant_decline = category_data[
-            (category_data['增长率'] < -30) & 
-            (category_data['2024年Spend'] > 1000000)
-        ].sort_values('增长率')
+        # 只考虑基准年度基数大于100万的品类
+        decline_categories = risk_outputs['decline']
         
         # 显示数量指标
         st.metric(
             label="大幅下滑品类数量",
-            value=f"{len(significant_decline)}个",
-            delta="需要分析" if len(significant_decline) > 5 else "正常",
+            value=f"{len(decline_categories)}个",
+            delta="需要分析" if len(decline_categories) > 5 else "正常",
             delta_color="inverse"
         )
         
         # 显示详细信息
-        if len(significant_decline) > 0:
+        if len(decline_categories) > 0:
             st.markdown("##### 大幅下滑品类明细")
-            st.markdown("""
+            st.markdown(f"""
             > 筛选条件：
-            > 1. 2024年基数 > 100万元
+            > 1. {base_year}年基数 > 100万元
             > 2. 增长率 < -30%
             """)
-            decline_details = significant_decline[[
-                'Category', 'Sub category', '2024年Spend', '增长率'
+            decline_details = decline_categories[[
+                'Category', 'Sub category', base_spend_col, '增长率'
             ]].sort_values('增长率')
             
             # 使用st.dataframe显示带格式的表格
             st.dataframe(
                 decline_details.style.format({
-                    '2024年Spend': '{:,.0f}',
+                    base_spend_col: '{:,.0f}',
                     '增长率': '{:.1f}%'
                 }).background_gradient(
                     subset=['增长率'],
@@ -1328,9 +1199,7 @@ with tab4:
             )
     
     with col3:
-        # 计算供应商集中度
-        top5_concentration = (supplier_data.nlargest(5, '2024合计入库金额')['2024合计入库金额'].sum() / 
-                            total_spend_2024 * 100)
+        # 供应商集中度
         st.metric(
             label="Top5供应商集中度",
             value=f"{top5_concentration:.1f}%",
@@ -1340,43 +1209,11 @@ with tab4:
     # 风险地图
     st.subheader("风险地图")
     
-    # 创建更详细的风险数据
-    risk_data = pd.DataFrame({
-        '风险项': [
-            '供应商过度集中',
-            '原材料价格波动',
-            '品质一致性',
-            '交付及时性',
-            '技术迭代风险',
-            '供应商财务风险'
-        ],
-        '影响程度': [5, 4, 3, 3, 4, 3],
-        '发生概率': [4, 5, 2, 2, 3, 2],
-        '风险等级': ['高', '高', '中', '中', '高', '中']
-    })
-    
     # 创建风险评估矩阵
     col1, col2 = st.columns([3, 2])
     
     with col1:
-        fig = px.scatter(
-            risk_data,
-            x='发生概率',
-            y='影响程度',
-            size=[20]*len(risk_data),
-            text='风险项',
-            color='风险等级',
-            title="风险评估矩阵"
-        )
-        
-        fig.update_traces(textposition='top center')
-        fig.update_layout(
-            xaxis=dict(range=[0, 6], title="发生概率"),
-            yaxis=dict(range=[0, 6], title="影响程度"),
-            height=400
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(risk_outputs['matrix_figure'], use_container_width=True)
     
     with col2:
         st.markdown("### 风险等级说明")
@@ -1389,32 +1226,18 @@ with tab4:
     # 风险详情查看
     st.subheader("风险详情查看")
     
-    # 创建风险供应商详细信息
-    risk_suppliers = pd.DataFrame({
-        '供应商': supplier_data['供应商'],
-        'Category': supplier_data['Category'],
-        'Sub Category': supplier_data['Sub Category'],
-        '2024采购额': supplier_data['2024合计入库金额'],
-        '增长率': supplier_data['增长率']
-    })
-    
-    # 添加风险类型判断
-    risk_suppliers['集中度风险'] = risk_suppliers['2024采购额'] > risk_suppliers['2024采购额'].quantile(0.9)
-    risk_suppliers['增长风险'] = risk_suppliers['增长率'] < -30
-    
     # 风险筛选选项
     risk_type = st.selectbox(
         "选择风险类型查看详情：",
-        ['供应商过度集中风险', '原材料价格波动风险', '品质一致性风险', 
-         '交付及时性风险', '技术迭代风险', '供应商财务风险']
+        RISK_TYPES
     )
+    # 按集中度风险（采购额高于90%分位数）、增长率或品类筛选的供应商
+    risk_type_data = risk_outputs['by_type'][risk_type]
     
     # 根据不同风险类型显示对应的供应商信息
     st.markdown(f"### {risk_type}详情")
     
     if risk_type == '供应商过度集中风险':
-        high_concentration = risk_suppliers[risk_suppliers['集中度风险']].copy()
-        high_concentration['采购占比'] = high_concentration['2024采购额'] / high_concentration['2024采购额'].sum() * 100
         st.markdown("""
         #### 风险原因：
         - 单个供应商采购额占比过高
@@ -1422,8 +1245,8 @@ with tab4:
         - 议价能力受限
         """)
         st.dataframe(
-            high_concentration.style.format({
-                '2024采购额': '{:,.0f}',
+            risk_type_data.style.format({
+                f'{base_year}采购额': '{:,.0f}',
                 '增长率': '{:.1f}%',
                 '采购占比': '{:.1f}%'
             }).background_gradient(
@@ -1434,11 +1257,6 @@ with tab4:
         )
     
     elif risk_type == '原材料价格波动风险':
-        # 筛选铜铝等大宗商品相关供应商
-        commodity_suppliers = risk_suppliers[
-            risk_suppliers['Category'].isin(['Copper &Aluminum', 'Steel'])
-        ].copy()
-        commodity_suppliers['采购占比'] = commodity_suppliers['2024采购额'] / commodity_suppliers['2024采购额'].sum() * 100
         st.markdown("""
         #### 风险原因：
         - 大宗商品价格波动
@@ -1446,8 +1264,8 @@ with tab4:
         - 市场供需变化
         """)
         st.dataframe(
-            commodity_suppliers.style.format({
-                '2024采购额': '{:,.0f}',
+            risk_type_data.style.format({
+                f'{base_year}采购额': '{:,.0f}',
                 '增长率': '{:.1f}%',
                 '采购占比': '{:.1f}%'
             }).background_gradient(
@@ -1458,11 +1276,6 @@ with tab4:
         )
     
     elif risk_type == '品质一致性风险':
-        # 假设关键零部件供应商更容易出现品质风险
-        quality_risk_categories = ['Assembly &Mechanical Parts', 'Electrical &Electronic']
-        quality_risk_suppliers = risk_suppliers[
-            risk_suppliers['Category'].isin(quality_risk_categories)
-        ].copy()
         st.markdown("""
         #### 风险原因：
         - 工艺稳定性不足
@@ -1470,18 +1283,14 @@ with tab4:
         - 质量管控体系不完善
         """)
         st.dataframe(
-            quality_risk_suppliers.style.format({
-                '2024采购额': '{:,.0f}',
+            risk_type_data.style.format({
+                f'{base_year}采购额': '{:,.0f}',
                 '增长率': '{:.1f}%'
             }),
             use_container_width=True
         )
     
     elif risk_type == '交付及时性风险':
-        # 筛选增长率较高的供应商，可能面临产能压力
-        delivery_risk_suppliers = risk_suppliers[
-            risk_suppliers['增长率'] > 50
-        ].copy()
         st.markdown("""
         #### 风险原因：
         - 供应商产能不足
@@ -1489,8 +1298,8 @@ with tab4:
         - 原材料供应紧张
         """)
         st.dataframe(
-            delivery_risk_suppliers.style.format({
-                '2024采购额': '{:,.0f}',
+            risk_type_data.style.format({
+                f'{base_year}采购额': '{:,.0f}',
                 '增长率': '{:.1f}%'
             }).background_gradient(
                 subset=['增长率'],
@@ -1500,10 +1309,6 @@ with tab4:
         )
     
     elif risk_type == '技术迭代风险':
-        # 筛选电子电气类供应商
-        tech_risk_suppliers = risk_suppliers[
-            risk_suppliers['Category'].isin(['Electrical &Electronic'])
-        ].copy()
         st.markdown("""
         #### 风险原因：
         - 技术更新速度快
@@ -1511,18 +1316,14 @@ with tab4:
         - 研发投入需求大
         """)
         st.dataframe(
-            tech_risk_suppliers.style.format({
-                '2024采购额': '{:,.0f}',
+            risk_type_data.style.format({
+                f'{base_year}采购额': '{:,.0f}',
                 '增长率': '{:.1f}%'
             }),
             use_container_width=True
         )
     
     elif risk_type == '供应商财务风险':
-        # 筛选增长率为负的供应商
-        financial_risk_suppliers = risk_suppliers[
-            risk_suppliers['增长率'] < 0
-        ].copy()
         st.markdown("""
         #### 风险原因：
         - 营收持续下滑
@@ -1530,8 +1331,8 @@ with tab4:
         - 经营状况不佳
         """)
         st.dataframe(
-            financial_risk_suppliers.style.format({
-                '2024采购额': '{:,.0f}',
+            risk_type_data.style.format({
+                f'{base_year}采购额': '{:,.0f}',
                 '增长率': '{:.1f}%'
             }).background_gradient(
                 subset=['增长率'],
@@ -1652,6 +1453,78 @@ with tab4:
     }
     """)
     
+    # 分散采购方案：在子类别现有供应商之间重新分配对比年度预算
+    st.subheader("📌 分散采购方案（预算再分配）")
+    st.markdown(f"在每个子类别现有供应商之间重新分配{compare_year}年预算，使单一供应商份额和HHI不超过目标值；各供应商预算上限按{base_year}年入库金额×产能系数估算。")
+
+    opt_col1, opt_col2, opt_col3 = st.columns(3)
+    with opt_col1:
+        target_max_share = st.slider("单一供应商份额上限 (%)", 20, 100, 60, step=5, key="opt_max_share")
+    with opt_col2:
+        target_max_hhi = st.slider("HHI上限", 1000, 10000, 5000, step=250, key="opt_max_hhi")
+    with opt_col3:
+        capacity_factor = st.slider(f"产能系数（相对{base_year}年入库金额）", 1.0, 3.0, 1.5, step=0.1, key="opt_capacity")
+
+    realloc_shifts, realloc_summary = optimize_supplier_budget(
+        supplier_data, store.version, base_year, compare_year,
+        max_share=None if target_max_share >= 100 else target_max_share,
+        max_hhi=None if target_max_hhi >= 10000 else target_max_hhi,
+        capacity_factor=capacity_factor,
+        budget_col=compare_total_col,
+        volume_col=base_total_col
+    )
+
+    status_counts = realloc_summary['状态'].value_counts()
+    metric_col1, metric_col2, metric_col3 = st.columns(3)
+    metric_col1.metric("需调整子类别", f"{status_counts.get('已优化', 0)}个")
+    metric_col2.metric("已达标子类别", f"{status_counts.get('已达标', 0)}个")
+    metric_col3.metric("无法达标子类别", f"{status_counts.get('不可行', 0)}个",
+                       help="供应商数量或产能不足，需要引入新供应商")
+
+    optimized_summary = realloc_summary[realloc_summary['状态'] == '已优化']
+    if not optimized_summary.empty:
+        st.markdown("#### 子类别调整汇总")
+        st.dataframe(
+            optimized_summary.style.format({
+                compare_total_col: '{:,.0f}',
+                '当前最大份额': '{:.1f}%',
+                '建议最大份额': '{:.1f}%',
+                '当前HHI': '{:,.0f}',
+                '建议HHI': '{:,.0f}',
+                '调整金额合计': '{:,.0f}'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.markdown("#### 供应商预算调整明细")
+        st.dataframe(
+            realloc_shifts.style.format({
+                compare_total_col: '{:,.0f}',
+                '产能上限': '{:,.0f}',
+                '建议预算金额': '{:,.0f}',
+                '调整金额': '{:+,.0f}',
+                '当前份额': '{:.1f}%',
+                '建议份额': '{:.1f}%'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.info("当前目标下没有可在现有供应商之间完成的预算调整。")
+
+    infeasible_summary = realloc_summary[realloc_summary['状态'] == '不可行']
+    if not infeasible_summary.empty:
+        with st.expander(f"无法在现有供应商内达标的子类别（{len(infeasible_summary)}个）"):
+            st.dataframe(
+                infeasible_summary[['Category', 'Sub Category', '供应商数量', compare_total_col, '当前最大份额', '当前HHI']].style.format({
+                    compare_total_col: '{:,.0f}',
+                    '当前最大份额': '{:.1f}%',
+                    '当前HHI': '{:,.0f}'
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
+
     # 添加风险跟踪记录功能
     st.subheader("风险跟踪记录")
     
@@ -1670,23 +1543,18 @@ with tab4:
         st.markdown("### 新增风险")
         st.metric(label="新增数量", value="3", delta="+1")
 
-with tab5:
+with tab5, timed('数据明细总览'):
     st.header("数据明细总览")
     
-    # 创建Category级别的汇总数据
-    category_summary = category_data.groupby('Category').agg({
-        '2024年Spend': 'sum',
-        '2025年Spend': 'sum',
-        '增长金额': 'sum'
-    }).reset_index()
-    category_summary['增长率'] = (category_summary['增长金额'] / category_summary['2024年Spend'] * 100).round(1)
+    # Category级别的汇总数据
+    category_summary_data = section('category')['summary']
     
     # 显示Category级别汇总
     st.subheader("📌 Category级别汇总")
     st.dataframe(
-        category_summary.style.format({
-            '2024年Spend': '{:,.0f}',
-            '2025年Spend': '{:,.0f}',
+        category_summary_data.style.format({
+            base_spend_col: '{:,.0f}',
+            compare_spend_col: '{:,.0f}',
             '增长金额': '{:,.0f}',
             '增长率': '{:.1f}%'
         }),
@@ -1697,17 +1565,15 @@ with tab5:
     st.subheader("📌 Sub Category明细")
     selected_category = st.selectbox(
         "选择Category查看子类别明细：",
-        category_summary['Category'].unique()
+        category_summary_data['Category'].unique()
     )
     
     # 显示选中Category的Sub Category数据
-    subcategory_data = category_data[category_data['Category'] == selected_category]
-    
-    # 创建一个清理过的数据副本用于显示
-    display_subcategory = subcategory_data[['Sub category', '2024年Spend', '2025年Spend', '增长金额', '增长率']].copy()
+    detail_outputs = section('category_detail', selected_category)
+    display_subcategory = detail_outputs['subcategories'].copy()
     
     # 单独处理数值列，确保非数值列不会被格式化
-    for col in ['2024年Spend', '2025年Spend', '增长金额']:
+    for col in [base_spend_col, compare_spend_col, '增长金额']:
         if pd.api.types.is_numeric_dtype(display_subcategory[col]):
             display_subcategory[col] = display_subcategory[col].apply(lambda x: f"{x:,.0f}" if pd.notnull(x) else "")
     
@@ -1721,38 +1587,34 @@ with tab5:
     st.subheader("📌 供应商明细")
     selected_subcategory = st.selectbox(
         "选择Sub Category查看供应商明细：",
-        subcategory_data['Sub category'].unique()
+        display_subcategory['Sub category'].unique()
     )
     
     # 显示选中Sub Category的供应商数据
-    supplier_detail = supplier_data[supplier_data['Sub Category'] == selected_subcategory].copy()
-    
-    # 计算各供应商在不同工厂的采购金额
-    supplier_detail['2024年占比'] = supplier_detail['2024合计入库金额'] / supplier_detail['2024合计入库金额'].sum() * 100
-    supplier_detail['2025年占比'] = supplier_detail['2025合计预算金额'] / supplier_detail['2025合计预算金额'].sum() * 100
+    # 各供应商在不同工厂的采购金额及两个年度的份额
+    supplier_detail_data = detail_outputs['supplier_detail'][selected_subcategory]
     
     st.dataframe(
-        supplier_detail[[
-            '供应商', 
-            '2024汇风入库金额', '2024铜盟入库金额', '2024苏州入库金额', '2024合计入库金额', '2024年占比',
-            '2025汇风预算金额', '2025铜盟预算金额', '2025苏州预算金额', '2025合计预算金额', '2025年占比',
-            '增长金额', '增长率'
-        ]].style.format({
-            '2024汇风入库金额': '{:,.0f}',
-            '2024铜盟入库金额': '{:,.0f}',
-            '2024苏州入库金额': '{:,.0f}',
-            '2024合计入库金额': '{:,.0f}',
-            '2024年占比': '{:.1f}%',
-            '2025汇风预算金额': '{:,.0f}',
-            '2025铜盟预算金额': '{:,.0f}',
-            '2025苏州预算金额': '{:,.0f}',
-            '2025合计预算金额': '{:,.0f}',
-            '2025年占比': '{:.1f}%',
+        supplier_detail_data.style.format({
+            base_factory_cols['汇风']: '{:,.0f}',
+            base_factory_cols['铜盟']: '{:,.0f}',
+            base_factory_cols['苏州']: '{:,.0f}',
+            base_total_col: '{:,.0f}',
+            f'{base_year}年占比': '{:.1f}%',
+            compare_factory_cols['汇风']: '{:,.0f}',
+            compare_factory_cols['铜盟']: '{:,.0f}',
+            compare_factory_cols['苏州']: '{:,.0f}',
+            compare_total_col: '{:,.0f}',
+            f'{compare_year}年占比': '{:.1f}%',
             '增长金额': '{:,.0f}',
             '增长率': '{:.1f}%'
         }),
         use_container_width=True
     )
+    export_controls('supplier_detail', {
+        f'{selected_subcategory}供应商': lambda: supplier_detail_data,
+        '全部供应商': lambda: all_supplier_detail(data),
+    }, '供应商明细')
     
     # 添加数据说明
     st.markdown("""
@@ -1774,29 +1636,110 @@ with tab5:
     > 注：所有金额单位为元，增长率和占比均以百分比显示
     """)
 
+# 情景模拟：缓存相同参数下的模拟结果，避免每次重跑都重新抽样
+@track_cache('run_scenario_simulation', compute_cache.memoize())
+def run_scenario_simulation(_supplier_data, version, base_year, compare_year, level, factory_columns, total_column,
+                            shocked_groups, annual_vol, drift, volume_mult, factory_mult, n_scenarios, correlation, seed):
+    base = build_scenario_base(_supplier_data, level=level, factory_columns=factory_columns, total_column=total_column)
+    shocked = np.isin(base.groups, shocked_groups)
+    volume = np.where(shocked, volume_mult, 1.0)
+    results = run_monte_carlo(
+        base, shocked_groups, annual_vol, drift=drift, volume=volume,
+        factory=np.asarray(factory_mult), n_scenarios=n_scenarios,
+        correlation=correlation, seed=seed
+    )
+    frame = results_frame(base, results)
+    baseline = results_frame(base, simulate(base)).iloc[0]
+    return frame, summarize(frame, baseline)
+
+with tab_scenario, timed('情景模拟'):
+    st.header("情景模拟：大宗商品价格与采购量冲击")
+    st.markdown(f"对选定品类施加价格（蒙特卡洛模拟月度价格路径）与采购量冲击，并按工厂调整采购量，一次性重算所有情景下的{compare_year}年预算、工厂合计与供应商集中度（HHI）。")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        scenario_level = st.radio("冲击维度：", ['Category', 'Sub Category'], horizontal=True, key="scenario_level")
+        level_options = sorted(supplier_data[scenario_level].dropna().unique())
+        default_groups = [g for g in ['Copper &Aluminum'] if g in level_options]
+        shocked_groups = st.multiselect(
+            "受价格波动影响的分组：",
+            level_options,
+            default=default_groups,
+            key="scenario_groups"
+        )
+        annual_vol = st.slider("年化价格波动率 (%)", 0, 80, 25, step=5, key="scenario_vol") / 100
+        drift = st.slider("年化价格趋势 (%)", -30, 30, 0, step=1, key="scenario_drift") / 100
+        correlation = st.slider("分组间价格相关系数", 0.0, 1.0, 0.7, step=0.1, key="scenario_corr")
+    with col2:
+        volume_mult = st.slider("受冲击分组采购量乘数", 0.5, 1.5, 1.0, step=0.05, key="scenario_volume")
+        factory_mult = tuple(
+            st.slider(f"{factory}工厂采购量乘数", 0.5, 1.5, 1.0, step=0.05, key=f"scenario_factory_{factory}")
+            for factory in FACTORIES
+        )
+        n_scenarios = st.select_slider("情景数量", options=[1000, 5000, 10000, 20000], value=10000, key="scenario_n")
+        seed = st.number_input("随机种子", min_value=0, value=42, step=1, key="scenario_seed")
+
+    factory_columns = [compare_factory_cols[factory] for factory in FACTORIES]
+    scenario_frame, scenario_summary = run_scenario_simulation(
+        supplier_data, store.version, base_year, compare_year, scenario_level, tuple(factory_columns), compare_total_col, tuple(shocked_groups), annual_vol, drift,
+        volume_mult, factory_mult, n_scenarios, correlation, int(seed)
+    )
+
+    st.subheader("关键指标分布")
+    col1, col2 = st.columns(2)
+    with col1:
+        fig = px.histogram(
+            scenario_frame, x=compare_total_col, nbins=60,
+            title=f"{compare_year}年合计预算分布（{n_scenarios:,}个情景）"
+        )
+        fig.add_vline(x=scenario_summary.loc[compare_total_col, '基准值'], line_dash="dash", line_color="gray")
+        fig.update_layout(height=400, yaxis_title="情景数")
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        fig = px.histogram(scenario_frame, x='HHI', nbins=60, title="供应商集中度（HHI）分布")
+        fig.add_vline(x=scenario_summary.loc['HHI', '基准值'], line_dash="dash", line_color="gray")
+        fig.update_layout(height=400, yaxis_title="情景数")
+        st.plotly_chart(fig, use_container_width=True)
+
+    fig = px.box(
+        scenario_frame[factory_columns].melt(var_name='工厂', value_name='预算金额'),
+        x='工厂', y='预算金额', title=f"各工厂{compare_year}年预算分布"
+    )
+    fig.update_layout(height=400)
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.subheader("情景分位数汇总")
+    st.dataframe(
+        scenario_summary.style.format('{:,.0f}'),
+        use_container_width=True
+    )
+    st.markdown(f"""
+    > 注：价格按几何布朗运动逐月模拟，全年预算按月均匀发生，取路径均值作为全年价格乘数；
+    > HHI 按供应商行的{compare_year}年预算份额计算（0-10000）。
+    """)
+
 # 添加页脚
 st.markdown("---")
 st.markdown("### 💡 决策者参考")
 
 # 计算所需指标
-significant_decline = len(category_data[category_data['增长率'] < -30])
-max_supplier_share = (supplier_data['2024合计入库金额'].max() / supplier_data['2024合计入库金额'].sum() * 100)
-bulk_material_suppliers = supplier_data[supplier_data['Category'].str.contains('Copper|Aluminum', na=False)]
-bulk_material_growth = bulk_material_suppliers['增长率'].mean()
+decline_count = overview['decline_count']
+max_supplier_share = overview['max_supplier_share']
+bulk_growth = overview['bulk_material_growth']
+region_text = '\n\n'.join(
+    f"   - {region['地区']}地区：\n"
+    f"     * 现状：{compare_year}年采购额{region['对比']/1e8:.2f}亿，较{base_year}年{region['变化']}\n"
+    f"     * 占比：占集团总采购额的{region['占比']:.1f}%"
+    for region in region_summary
+)
 
 st.info(f"""
 基于数据分析结果，提出以下关注重点：
 
-1. **区域业务布局**：
-   - 天津地区：
-     * 现状：总采购额6.56亿，同比增长14%
-     * 占比：占集团总采购额的74.2%
-   
-   - 苏州地区：
-     * 现状：采购额2.28亿，同比下降9%
-     * 占比：占集团总采购额的25.8%
+1. **区域业务布局**（{base_year}→{compare_year}）：
+{region_text}
 
-2. **品类管理重点**：
+2. **品类管理重点**（2024→2025 分析结论）：
    - 重点品类：
      * 铜材类占比42%，年采购额3.71亿
      * 新增长品类（导热脂、接线盒）增速>30%
@@ -1812,7 +1755,7 @@ st.info(f"""
    
    - 分布情况：
      * {high_dependency}个供应商采购占比>10%
-     * 大宗原材料供应商平均增长率{bulk_material_growth:.1f}%
+     * 大宗原材料供应商平均增长率{bulk_growth:.1f}%
 
 4. **风险指标**：
    - 供应商依赖：
@@ -1820,9 +1763,99 @@ st.info(f"""
      * 单个最大供应商占比{max_supplier_share:.1f}%
    
    - 品类风险：
-     * {significant_decline}个品类大幅下滑(>30%)
-     * 这些品类2024年总额8,900万
+     * {decline_count}个品类大幅下滑(>30%)
+     * 2024→2025 分析结论：这些品类2024年总额8,900万
 
-> 📊 以上数据基于2024年实际数据和2025年预测数据
+> 📊 以上数据基于{data.columns.base_label}与{data.columns.compare_label}数据；标注“2024→2025 分析结论”的条目为固定分析，不随所选年度变化
 > 📈 所有增长率和占比均为实际计算值
 """) 
+
+# 剖析结果保存在会话中，直到手动清除
+if profiler is not None:
+    st.session_state['profile_result'] = stop_profile(profiler)
+if 'profile_result' in st.session_state:
+    profile_path, profile_seconds, profile_hotspots = st.session_state['profile_result']
+    with st.sidebar.expander(f"🔬 剖析结果（{profile_seconds:.2f} 秒）", expanded=True):
+        st.caption(f"完整结果：{profile_path}")
+        st.dataframe(
+            profile_hotspots.style.format({'自身耗时(秒)': '{:.3f}', '累计耗时(秒)': '{:.3f}'}),
+            use_container_width=True, hide_index=True
+        )
+        st.button("清除剖析结果", key="profile_clear", on_click=lambda: st.session_state.pop('profile_result', None))
+
+# 性能调试面板：显示本次重跑的埋点数据（面板本身不计入）；同时更新监控指标
+run = finish_run()
+publish(run)
+if run is not None and st.sidebar.checkbox("🛠 性能调试面板", key="debug_panel"):
+    with st.sidebar.expander(f"⏱ 本次重跑 {run.seconds:.2f} 秒", expanded=True):
+        st.markdown("**分段耗时**")
+        st.dataframe(
+            pd.DataFrame([
+                {'分段': name, '次数': entry['calls'], '耗时(秒)': entry['seconds']}
+                for name, entry in run.sections.items()
+            ]).style.format({'耗时(秒)': '{:.3f}'}),
+            use_container_width=True, hide_index=True
+        )
+        st.markdown("**缓存命中**")
+        st.dataframe(
+            pd.DataFrame([
+                {'函数': name, '调用': entry['calls'], '命中': entry['calls'] - entry['misses'],
+                 '未命中': entry['misses'], '耗时(秒)': entry['seconds']}
+                for name, entry in run.cache.items()
+            ]).style.format({'耗时(秒)': '{:.3f}'}),
+            use_container_width=True, hide_index=True
+        )
+        st.markdown("**发送的元素**")
+        st.dataframe(
+            pd.DataFrame([
+                {'类型': name, '数量': entry['count'], '大小(KB)': entry['bytes'] / 1024}
+                for name, entry in sorted(run.payload_summary().items(), key=lambda item: -item[1]['bytes'])
+            ]).style.format({'大小(KB)': '{:,.1f}'}),
+            use_container_width=True, hide_index=True
+        )
+        st.markdown("**最大的元素**")
+        largest = pd.DataFrame(sorted(run.elements, key=lambda e: e['bytes'], reverse=True)[:10])
+        if not largest.empty:
+            largest['bytes'] = largest['bytes'] / 1024
+            st.dataframe(
+                largest.rename(columns={'section': '分段', 'type': '类型', 'bytes': '大小(KB)', 'seconds': '耗时(秒)'})
+                .style.format({'大小(KB)': '{:,.1f}', '耗时(秒)': '{:.3f}'}),
+                use_container_width=True, hide_index=True
+            )
+        if warm_up_status['seconds'] is not None:
+            st.caption(
+                f"本进程后台预热耗时 {warm_up_status['seconds']:.2f} 秒"
+                + (f"，出错：{warm_up_status['error']}" if warm_up_status['error'] else '')
+            )
+
+# 内存统计：统计所有会话需要遍历各会话保存的对象，只在勾选时计算
+if st.sidebar.checkbox("🧠 内存统计", key="memory_panel"):
+    session_bytes = session_usage(st.session_state)
+    all_sessions = sessions_usage()
+    cache_usage = streamlit_cache_usage()
+    process_memory = resident_memory()
+    with st.sidebar.expander("🧠 内存统计", expanded=True):
+        st.metric("进程常驻内存", f"{process_memory / 2 ** 20:,.0f} MB" if process_memory else "未知")
+        # 年度数据与各页面结果由计算缓存持有、各会话共用，会话自己只有 session_state 中的状态
+        st.markdown(f"本会话状态：{session_bytes / 2 ** 20:,.2f} MB")
+        st.markdown(f"**所有会话**（{len(all_sessions)}个）")
+        all_sessions['大小(MB)'] = all_sessions.pop('状态字节') / 2 ** 20
+        st.dataframe(all_sessions.style.format({'大小(MB)': '{:,.2f}'}), use_container_width=True, hide_index=True)
+        compute_stats = compute_cache.stats()
+        st.markdown(
+            f"**计算缓存**（{compute_stats['entries']}项，{compute_stats['bytes'] / 2 ** 20:,.1f} / "
+            f"{compute_stats['max_bytes'] / 2 ** 20:,.0f} MB，各会话共享）：命中 {compute_stats['hits']} 次，"
+            f"未命中 {compute_stats['misses']} 次，淘汰 {compute_stats['evictions']} 项，过期 {compute_stats['expirations']} 项"
+        )
+        compute_report = compute_cache.report()
+        compute_report['大小(MB)'] = compute_report.pop('字节') / 2 ** 20
+        st.dataframe(
+            compute_report[['函数', '参数', '大小(MB)']].style.format({'大小(MB)': '{:,.2f}'}),
+            use_container_width=True, hide_index=True
+        )
+        st.markdown(f"**st.cache_data**（合计 {cache_usage['字节'].sum() / 2 ** 20:,.1f} MB，各会话共享）")
+        cache_usage['大小(MB)'] = cache_usage.pop('字节') / 2 ** 20
+        st.dataframe(
+            cache_usage[['函数', '大小(MB)']].style.format({'大小(MB)': '{:,.2f}'}),
+            use_container_width=True, hide_index=True
+        )
@@ -0,0 +1,104 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.basedatatypes import BaseFigure
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def artifact_path(directory, version, base_year, compare_year):
+    """某数据版本、某对年度的预计算产物目录，如 cache/artifacts/<版本>/2024-2025。"""
+    return os.path.join(directory, version, f'{base_year}-{compare_year}')
+
+
+def section_id(name, key=None):
+    return name if key is None else f'{name}|{key}'
+
+
+def encode_section(value, directory, prefix):
+    """将 section 结果写入 directory：数据表存为 Parquet，图表存为 plotly JSON，其余为清单中的数值。
+
+    返回可写入清单的结构；prefix 用于区分不同进程写入的文件。
+    """
+    counter = [0]
+
+    def encode(item):
+        if isinstance(item, pd.DataFrame):
+            counter[0] += 1
+            name = f'{prefix}_{counter[0]:04d}.parquet'
+            item.to_parquet(os.path.join(directory, name))
+            return {'table': name}
+        if isinstance(item, BaseFigure):
+            counter[0] += 1
+            name = f'{prefix}_{counter[0]:04d}.json'
+            with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+                f.write(item.to_json())
+            return {'figure': name}
+        if isinstance(item, dict):
+            return {'dict': {str(key): encode(sub) for key, sub in item.items()}}
+        if isinstance(item, (list, tuple, set)):
+            return {'list': [sub.item() if isinstance(sub, np.generic) else sub for sub in item]}
+        if isinstance(item, np.generic):
+            return {'value': item.item()}
+        return {'value': item}
+
+    return encode(value)
+
+
+def _load_figure(path):
+    with open(path, encoding='utf-8') as f:
+        spec = json.load(f)
+    # 从列表构造时 plotly 会把数值 text 转为字符串，texttemplate 的数字格式随之失效，这里还原为数组
+    for trace in spec.get('data', []):
+        text = trace.get('text')
+        if isinstance(text, list) and text and all(isinstance(v, (int, float)) for v in text):
+            trace['text'] = np.array(text)
+    return go.Figure(spec)
+
+
+def decode_section(entry, directory):
+    if 'table' in entry:
+        return pd.read_parquet(os.path.join(directory, entry['table']))
+    if 'figure' in entry:
+        return _load_figure(os.path.join(directory, entry['figure']))
+    if 'dict' in entry:
+        return {key: decode_section(sub, directory) for key, sub in entry['dict'].items()}
+    if 'list' in entry:
+        return entry['list']
+    return entry['value']
+
+
+def write_manifest(directory, manifest):
+    with open(os.path.join(directory, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+
+def publish(tmp_path, path, force=False):
+    """将写好的临时目录整体换为正式目录；已存在且未指定 force 时保留原目录。"""
+    if os.path.exists(path):
+        if not force:
+            shutil.rmtree(tmp_path)
+            return path
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_manifest(path):
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_section(path, section, manifest=None):
+    """读取一个预计算的 section；产物目录或该 section 不存在时返回 None。"""
+    manifest = manifest if manifest is not None else load_manifest(path)
+    if manifest is None or section not in manifest['sections']:
+        return None
+    return decode_section(manifest['sections'][section], path)
@@ -0,0 +1,213 @@
+"""数据加载与各页面计算的基准测试：在多个数据规模下记录耗时与内存峰值，并与保存的基线对比。
+
+用法：python benchmark.py [--rows 10000 100000] [--repeat 3] [--baseline FILE] [--save-baseline] [--threshold 20]
+
+数据由 synthetic.py 按固定 seed 生成并缓存，同一规模每次测试使用完全相同的文件。
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config import BENCHMARK_DIR, DATA_FILES
+from analytics import (
+    load_dataset, year_data, category_summary, category_matrix_figure, top_growth_subcategories,
+    top_growth_suppliers, supplier_tiers, supplier_matrix_figure, supplier_detail, subcategory_growth,
+    factory_scale_figure, factory_growth_figure, TIERS
+)
+from analytics.sections import compute_section
+from synthetic import SyntheticConfig, generate
+
+DEFAULT_ROWS = [10000, 100000]
+# 耗时低于该值（秒）的项目只比较内存，避免计时噪声被误报为退化
+MIN_SECONDS = 0.01
+
+
+def _largest_category(data):
+    return data.supplier_data['Category'].value_counts().index[0]
+
+
+def _detail_filtering(data):
+    # 数据明细总览：逐个子类别筛选供应商明细
+    names = subcategory_growth(data)['Sub category'].head(20)
+    return [supplier_detail(data, name) for name in names]
+
+
+def _figures(data):
+    summary = category_summary(data)
+    return [
+        factory_scale_figure(data), factory_growth_figure(data),
+        category_matrix_figure(data, summary), supplier_matrix_figure(data, 50),
+    ]
+
+
+# 基准项：名称 -> 以 YearData 为输入的计算；除各页面 section 外，单独列出开销较大的步骤
+BENCHMARKS = {
+    'top10_growth': lambda data: (top_growth_subcategories(data, 10), top_growth_suppliers(data, 10)),
+    'supplier_tiers': supplier_tiers,
+    'detail_filtering': _detail_filtering,
+    'figures': _figures,
+    'overview_section': lambda data: compute_section(data, 'overview'),
+    'manager_section': lambda data: compute_section(data, 'manager'),
+    'category_section': lambda data: compute_section(data, 'category'),
+    'category_detail_section': lambda data: compute_section(data, 'category_detail', _largest_category(data)),
+    'supplier_section': lambda data: compute_section(data, 'supplier'),
+    'tier_section': lambda data: compute_section(data, 'tier', TIERS[-1]),
+    'risk_section': lambda data: compute_section(data, 'risk'),
+}
+
+
+def measure(function, repeat=3):
+    """取 repeat 次中最短的耗时；内存峰值另外单独运行一次，避免 tracemalloc 的开销计入耗时。"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': min(times), 'peak_mb': peak / 2 ** 20}
+
+
+def dataset_paths(rows, seed=0, directory=BENCHMARK_DIR):
+    """某一规模的合成数据，不存在时生成。"""
+    output = os.path.join(directory, 'data', f'{rows}-{seed}')
+    # 全部文件写完后才创建标记文件，中途中断的目录会重新生成
+    marker = os.path.join(output, '.complete')
+    if not os.path.exists(marker):
+        generate(SyntheticConfig(rows=rows, seed=seed), output)
+        open(marker, 'w').close()
+    return {key: os.path.join(output, os.path.basename(path)) for key, path in DATA_FILES.items()}
+
+
+def run_scale(rows, repeat=3, names=None, seed=0):
+    """在一个数据规模下运行全部基准项，返回 {项目: {'seconds', 'peak_mb'}}。"""
+    paths = dataset_paths(rows, seed)
+    map_path = os.path.join(os.path.dirname(paths['supplier_data']), 'supplier_id_map.csv')
+
+    def load():
+        # 每次从空的供应商ID映射开始，测量完整的冷加载
+        if os.path.exists(map_path):
+            os.remove(map_path)
+        return load_dataset(paths, map_path=map_path, delta_dir=None)
+
+    results = {'load_data': measure(load, repeat=1)}
+    store, _ = load()
+    base_year, compare_year = store.years[-2], store.years[-1]
+    results['year_data'] = measure(lambda: year_data(store, base_year, compare_year), repeat)
+    data = year_data(store, base_year, compare_year)
+    for name, function in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        results[name] = measure(lambda: function(data), repeat)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """返回相对基线增长超过 threshold% 的项目列表。"""
+    regressions = []
+    for scale, items in results.items():
+        for name, current in items.items():
+            previous = baseline.get(scale, {}).get(name)
+            if previous is None:
+                continue
+            for metric in ('seconds', 'peak_mb'):
+                if metric == 'seconds' and max(previous[metric], current[metric]) < MIN_SECONDS:
+                    continue
+                if previous[metric] <= 0:
+                    continue
+                change = (current[metric] - previous[metric]) / previous[metric] * 100
+                if change > threshold:
+                    regressions.append({
+                        'rows': scale, 'name': name, 'metric': metric,
+                        'baseline': previous[metric], 'current': current[metric], 'change': change,
+                    })
+    return regressions
+
+
+def _metadata():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+    }
+
+
+def _print_scale(rows, items, baseline):
+    print(f'\n== {rows} 行')
+    print(f"{'项目':<26}{'耗时(秒)':>12}{'内存峰值(MB)':>14}{'耗时变化':>10}")
+    for name, current in items.items():
+        previous = baseline.get(str(rows), {}).get(name)
+        change = ''
+        if previous and previous['seconds'] > 0:
+            change = f"{(current['seconds'] - previous['seconds']) / previous['seconds'] * 100:+.0f}%"
+        print(f"{name:<26}{current['seconds']:>12.4f}{current['peak_mb']:>14.1f}{change:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='数据加载与各页面计算的基准测试。')
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS, help='供应商数据行数，可指定多个规模')
+    parser.add_argument('--repeat', type=int, default=3, help='每个项目重复次数，取最短耗时')
+    parser.add_argument('--only', nargs='+', help='只运行指定的基准项（load_data 与 year_data 总会运行）')
+    parser.add_argument('--output', default=os.path.join(BENCHMARK_DIR, 'latest.json'), help='本次结果的保存路径')
+    parser.add_argument('--baseline', default=os.path.join(BENCHMARK_DIR, 'baseline.json'), help='基线文件')
+    parser.add_argument('--save-baseline', action='store_true', help='将本次结果保存为新的基线')
+    parser.add_argument('--threshold', type=float, default=20.0, help='超过该百分比的耗时或内存增长视为退化')
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    for rows in args.rows:
+        results[str(rows)] = run_scale(rows, args.repeat, args.only)
+        _print_scale(rows, results[str(rows)], baseline)
+
+    report = {'meta': _metadata(), 'results': results}
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'\n结果已保存：{args.output}')
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'已保存为基线：{args.baseline}')
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for item in regressions:
+        print(f"退化：{item['rows']} 行 {item['name']} {item['metric']} "
+              f"{item['baseline']:.4f} → {item['current']:.4f}（{item['change']:+.0f}%）")
+    if baseline and not regressions:
+        print(f'与基线相比没有超过 {args.threshold:.0f}% 的退化')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,93 @@
+import hashlib
 import os
 
 # 获取当前文件所在目录
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# 数据文件目录：默认为项目目录，可用环境变量 CAIGOU_DATA_DIR 指向其他目录（如 synthetic.py 生成的合成数据）
+DATA_DIR = os.environ.get('CAIGOU_DATA_DIR', BASE_DIR)
+
 # 数据文件路径
 DATA_FILES = {
-    'factory_data': os.path.join(BASE_DIR, '苏州、天津工厂数据总览.csv'),
-    'supplier_data': os.path.join(BASE_DIR, '供应商2024-2025采购数据汇总.csv'),
-    'category_data': os.path.join(BASE_DIR, '各Subcategory-Spend汇总.csv')
+    'factory_data': os.path.join(DATA_DIR, '苏州、天津工厂数据总览.csv'),
+    'supplier_data': os.path.join(DATA_DIR, '供应商2024-2025采购数据汇总.csv'),
+    'category_data': os.path.join(DATA_DIR, '各Subcategory-Spend汇总.csv')
 }
 
+# 工厂维度：供应商数据中的分厂列（如 2024汇风入库金额），以及工厂总览中 Business Unit 的识别关键字
+FACTORIES = ['汇风', '铜盟', '苏州']
+FACTORY_UNIT_KEYWORDS = [('合计', '合计'), ('苏州', '苏州'), ('汇风', '汇风'), ('铜盟', '铜盟')]
+
 # 文件编码设置
-FILE_ENCODING = 'utf-8' 
\ No newline at end of file
+FILE_ENCODING = 'utf-8'
+
+# 供应商实体识别：持久化的名称->供应商ID映射，以及人工维护的别名表（别名, 标准名称）
+# 缓存目录可用环境变量 CAIGOU_CACHE_DIR 指定，使用其他数据目录时避免与正式数据的缓存混在一起
+CACHE_DIR = os.environ.get('CAIGOU_CACHE_DIR', os.path.join(BASE_DIR, 'cache'))
+SUPPLIER_ID_MAP_FILE = os.path.join(CACHE_DIR, 'supplier_id_map.csv')
+SUPPLIER_ALIAS_FILE = os.path.join(BASE_DIR, '供应商别名.csv')
+
+# 数据结构校验：True 时遇到第一个致命错误即停止读取，False 时汇总全部错误后再拒绝加载
+VALIDATION_FAIL_FAST = False
+
+# 月度入库增量：已追加的增量文件保存在此目录，完整重新加载时按顺序重放
+DELTA_DIR = os.path.join(CACHE_DIR, 'deltas')
+
+# 数据快照：每次加载的数据按版本保存为列式文件，用于对比不同版本之间的变化
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, 'snapshots')
+
+# 预计算产物：precompute.py 按数据版本与年度对写入各页面的数据表与图表，看板优先直接读取
+ARTIFACT_DIR = os.path.join(CACHE_DIR, 'artifacts')
+
+# 离线报告：report.py 导出的 HTML/PDF 报告默认保存在此目录
+REPORT_DIR = os.path.join(CACHE_DIR, 'reports')
+
+# 明细表导出：看板生成的 CSV/XLSX 文件保存在此目录，按块写入，每块行数
+EXPORT_DIR = os.path.join(CACHE_DIR, 'exports')
+EXPORT_CHUNK_ROWS = 50000
+# 导出文件名包含数据版本和随机后缀，各会话互不覆盖；每次导出时删除超过 EXPORT_MAX_AGE 秒的文件，
+# 并只保留最新的 EXPORT_KEEP 个
+EXPORT_MAX_AGE = 3600
+EXPORT_KEEP = 200
+
+# 基准测试：benchmark.py 生成的合成数据、测试结果与基线保存在此目录
+BENCHMARK_DIR = os.path.join(CACHE_DIR, 'benchmarks')
+
+# 性能埋点：每次重跑的分段耗时、缓存命中与元素大小追加到 JSON Lines 日志，超过上限时轮转；设置环境变量 CAIGOU_INSTRUMENTATION=0 可关闭
+INSTRUMENTATION_ENABLED = os.environ.get('CAIGOU_INSTRUMENTATION', '1') != '0'
+INSTRUMENTATION_LOG = os.path.join(CACHE_DIR, 'instrumentation.jsonl')
+INSTRUMENTATION_LOG_MAX_BYTES = 50 * 2 ** 20
+
+# 监控指标（Prometheus 文本格式）：CAIGOU_METRICS_PORT 非0时在本机该端口提供 /metrics，多个实例需使用不同端口；CAIGOU_METRICS_FILE 非空时每次重跑后写入该文件
+METRICS_HOST = os.environ.get('CAIGOU_METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.environ.get('CAIGOU_METRICS_PORT', '0'))
+METRICS_FILE = os.environ.get('CAIGOU_METRICS_FILE', '')
+
+# 本地 JSON 接口（api.py）：CAIGOU_API_PORT 非0时看板进程在该端口提供各页面的汇总数据，默认只监听本机
+API_HOST = os.environ.get('CAIGOU_API_HOST', '127.0.0.1')
+API_PORT = int(os.environ.get('CAIGOU_API_PORT', '0'))
+API_MAX_LIMIT = 100  # Top 供应商等列表接口单次返回的最大行数
+
+# 按需剖析：CAIGOU_PROFILE=1 时每次重跑都用 cProfile 剖析（页面地址加 ?profile=1 则只剖析一次），结果保存在此目录，侧边栏显示耗时最多的函数
+PROFILE_ENABLED = os.environ.get('CAIGOU_PROFILE', '0') == '1'
+PROFILE_DIR = os.path.join(CACHE_DIR, 'profiles')
+PROFILE_TOP_N = 25
+
+# 进程级计算缓存（analytics/cache.py）：所有会话共享的内存上限（MB）与结果有效期（秒，0 为不过期）
+COMPUTE_CACHE_MB = float(os.environ.get('CAIGOU_COMPUTE_CACHE_MB', '512'))
+COMPUTE_CACHE_TTL = float(os.environ.get('CAIGOU_COMPUTE_CACHE_TTL', '600'))
+
+# 多进程共享数据集（shared_data.py）：按数据版本发布为内存映射的 Arrow IPC 文件，各 worker 共用数组与数值列的物理内存。
+# 默认放在 /dev/shm 下按数据目录与缓存目录区分的子目录；设置 CAIGOU_SHARED_DATA_DIR 为空字符串则关闭
+SHARED_DATA_DIR = os.environ.get(
+    'CAIGOU_SHARED_DATA_DIR',
+    os.path.join('/dev/shm', 'caigou-' + hashlib.sha1(f'{os.path.abspath(DATA_DIR)}|{os.path.abspath(CACHE_DIR)}'.encode()).hexdigest()[:8])
+    if os.path.isdir('/dev/shm') else ''
+)
+SHARED_DATA_KEEP = 2  # 保留的版本数，正在使用的旧版本文件删除后仍可读取，直到各 worker 切换
+
+# 冷启动预热（warmup.py）：background 在首屏之后后台预先导入页面模块；eager 在首屏之前同步导入（原来的行为）；off 不预热
+WARM_UP = os.environ.get('CAIGOU_WARM_UP', 'background')
+
+# 供应商搜索（analytics/search.py）：每次查询最多返回的供应商数
+SEARCH_LIMIT = 20
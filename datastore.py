@@ -0,0 +1,572 @@
+import hashlib
+import os
+import re
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+import pandas as pd
+
+from config import FACTORIES
+from reconciliation import factory_unit_key
+
+# 工厂维度编码：各分厂 + 合计
+FACTORY_CODES = FACTORIES + ['合计']
+
+# 宽表列名模式：年份 + 工厂 + 度量
+SUPPLIER_COLUMN = re.compile(r'^(\d{4})(' + '|'.join(FACTORY_CODES) + r')(入库|预算)金额$')
+CATEGORY_COLUMN = re.compile(r'^(\d{4})年(Spend)$')
+FACTORY_COLUMN = re.compile(r'^(\d{4})年(入库金额|预测采购额)$')
+
+SUPPLIER_KEYS = ['供应商', 'Category', 'Sub Category']
+CATEGORY_KEYS = ['Category', 'Sub category']
+FACTORY_KEYS = ['Business Unit']
+
+FACT_COLUMNS = ['entity', 'factory', 'year', 'measure', 'value']
+
+# 度量轴：实际入库与预算分开存放，预算年度也可以追加实际入库，两者互不覆盖
+MEASURE_KINDS = ['入库', '预算']
+ACTUAL, BUDGET = 0, 1
+_KIND_OF_MEASURE = {'入库': ACTUAL, '入库金额': ACTUAL, '预算': BUDGET, '预测采购额': BUDGET}
+
+
+@dataclass
+class DataStore:
+    """多年度采购数据的长表存储。
+
+    三个数据文件都被拆成 (entity, factory, year, measure, value) 的事实表，维度均为整数编码；
+    同时按 [实体, 工厂, 年份, 度量] 建立稠密数组，任意两个年度的对比只需在年份轴上切片。
+    度量轴为 MEASURE_KINDS（入库/预算）：每个年度在数据文件中的度量（如 2025 为预算）是该年度的主度量，
+    宽表视图取主度量；追加的月度入库总是记入入库，预算年度的入库与预算并存。
+    事实表是可累加的：同一单元格可以有多条记录（如追加的月度入库），数组中为其合计。
+    """
+    years: list                 # 三个文件都包含的年份，升序
+    measures: list              # 度量编码表，如 ['入库', '预算', 'Spend', ...]
+    column_names: dict          # (table, year, factory) -> 主度量的宽表列名，用于还原宽表视图
+    supplier_dim: pd.DataFrame  # 供应商实体维度（行号即 entity 编码）
+    category_dim: pd.DataFrame
+    factory_dim: pd.DataFrame
+    fact_chunks: dict           # table -> [事实表分块]，追加增量时只追加新分块
+    supplier_cube: np.ndarray   # (供应商实体, 工厂, 年份, 度量)
+    category_cube: np.ndarray   # (子类别, 年份, 度量)
+    factory_cube: np.ndarray    # (Business Unit, 年份, 度量)
+    version: str
+    keys: dict = field(default_factory=dict, repr=False)  # table -> {键: 行号}，追加增量时定位受影响的行
+    base_version: str = ''      # 三个数据文件的版本；追加增量后的 version 由它与已保存的增量内容决定（delta_version）
+
+    def facts(self, table):
+        """某个数据表的完整事实表（'supplier' / 'category' / 'factory'）。"""
+        return pd.concat(self.fact_chunks[table], ignore_index=True)
+
+    def year_index(self, year):
+        return self.years.index(int(year))
+
+    def year_pairs(self):
+        return [(a, b) for i, a in enumerate(self.years) for b in self.years[i + 1:]]
+
+    def year_kind(self, year):
+        """某年度的主度量（ACTUAL / BUDGET），由供应商数据中该年度的列名决定。"""
+        return BUDGET if self.column_names[('supplier', int(year), '合计')].endswith('预算金额') else ACTUAL
+
+    def has_actuals(self, year):
+        """预算年度是否已追加实际入库。"""
+        return self.year_kind(year) == BUDGET and \
+            bool(np.isfinite(self.supplier_cube[:, :, self.year_index(year), ACTUAL]).any())
+
+
+def _wide_columns(frame, pattern):
+    # 解析宽表列名，返回 [(列名, 年份, 工厂或度量, 度量)]
+    parsed = []
+    for column in frame.columns:
+        match = pattern.match(str(column))
+        if match:
+            parsed.append((column, int(match.group(1))) + match.groups()[1:])
+    return parsed
+
+
+def _melt(frame, value_columns, factory_codes, years, measures):
+    # 将宽表的若干列展开为整数编码的长表，实体编码即行号
+    values = frame[value_columns].to_numpy(dtype=float)
+    n_rows, n_cols = values.shape
+    facts = pd.DataFrame({
+        'entity': np.tile(np.arange(n_rows, dtype=np.int32), n_cols),
+        'factory': np.repeat(np.asarray(factory_codes, dtype=np.int8), n_rows),
+        'year': np.repeat(np.asarray(years, dtype=np.int16), n_rows),
+        'measure': np.repeat(np.asarray(measures, dtype=np.int8), n_rows),
+        'value': values.T.reshape(-1),
+    })
+    return facts[FACT_COLUMNS]
+
+
+def _fact_kinds(facts, measures, year_kinds):
+    # 各条事实所属的度量轴位置；Spend 没有区分，随该年度供应商数据的主度量
+    names = np.asarray(measures, dtype=object)[facts['measure'].to_numpy()]
+    years = facts['year'].to_numpy()
+    return np.array([
+        _KIND_OF_MEASURE.get(name, year_kinds.get(int(year), ACTUAL)) for name, year in zip(names, years)
+    ], dtype=np.int64) if len(facts) else np.zeros(0, dtype=np.int64)
+
+
+def _cube(facts, kinds, n_entities, years, n_factories=None):
+    # 由长表按单元格累加为稠密数组；没有任何记录的组合为 NaN
+    year_pos = np.searchsorted(years, facts['year'].to_numpy())
+    keep = (year_pos < len(years)) & (np.asarray(years)[np.minimum(year_pos, len(years) - 1)] == facts['year'].to_numpy())
+    if n_factories is None:
+        index = (facts['entity'].to_numpy()[keep], year_pos[keep], kinds[keep])
+        shape = (n_entities, len(years), len(MEASURE_KINDS))
+    else:
+        index = (facts['entity'].to_numpy()[keep], facts['factory'].to_numpy()[keep], year_pos[keep], kinds[keep])
+        shape = (n_entities, n_factories, len(years), len(MEASURE_KINDS))
+    values = facts['value'].to_numpy()[keep]
+    flat = np.ravel_multi_index(index, shape)
+    size = int(np.prod(shape))
+    cube = np.bincount(flat, weights=np.nan_to_num(values), minlength=size).reshape(shape)
+    counts = np.bincount(flat, weights=~np.isnan(values), minlength=size).reshape(shape)
+    cube[counts == 0] = np.nan
+    return cube
+
+
+def build_store(factory_data, supplier_data, category_data):
+    """将三个宽表数据文件整理为 DataStore。"""
+    measures, column_names = [], {}
+
+    def measure_code(name):
+        if name not in measures:
+            measures.append(name)
+        return measures.index(name)
+
+    # 供应商数据：每个 年份×工厂 一列
+    supplier_cols = _wide_columns(supplier_data, SUPPLIER_COLUMN)
+    for column, year, factory, measure in supplier_cols:
+        column_names[('supplier', year, factory)] = column
+    supplier_facts = _melt(
+        supplier_data, [c[0] for c in supplier_cols],
+        [FACTORY_CODES.index(c[2]) for c in supplier_cols],
+        [c[1] for c in supplier_cols],
+        [measure_code(c[3]) for c in supplier_cols],
+    )
+
+    # 子类别数据：每个年份一列 Spend，工厂维度为合计
+    category_cols = _wide_columns(category_data, CATEGORY_COLUMN)
+    for column, year, measure in category_cols:
+        column_names[('category', year, '合计')] = column
+    category_facts = _melt(
+        category_data, [c[0] for c in category_cols],
+        [FACTORY_CODES.index('合计')] * len(category_cols),
+        [c[1] for c in category_cols],
+        [measure_code(c[2]) for c in category_cols],
+    )
+
+    # 工厂总览：每行一个 Business Unit，工厂维度由名称识别
+    factory_cols = _wide_columns(factory_data, FACTORY_COLUMN)
+    for column, year, measure in factory_cols:
+        column_names[('factory', year, '合计')] = column
+    factory_facts = _melt(
+        factory_data, [c[0] for c in factory_cols],
+        [0] * len(factory_cols),
+        [c[1] for c in factory_cols],
+        [measure_code(c[2]) for c in factory_cols],
+    )
+    unit_codes = factory_data['Business Unit'].map(factory_unit_key) \
+        .map({name: code for code, name in enumerate(FACTORY_CODES)})
+    factory_facts['factory'] = unit_codes.fillna(-1).astype(np.int8).to_numpy()[factory_facts['entity']]
+
+    years = sorted(
+        {c[1] for c in supplier_cols} & {c[1] for c in category_cols} & {c[1] for c in factory_cols}
+    )
+
+    value_columns = {c[0] for c in supplier_cols} | {'增长金额', '增长率'}
+    supplier_dim = supplier_data[[c for c in supplier_data.columns if c not in value_columns]] \
+        .reset_index(drop=True)
+    category_dim = category_data[CATEGORY_KEYS].reset_index(drop=True)
+    factory_dim = factory_data[FACTORY_KEYS].reset_index(drop=True)
+
+    year_kinds = {year: _KIND_OF_MEASURE[measure] for _, year, factory, measure in supplier_cols if factory == '合计'}
+    supplier_cube = _cube(
+        supplier_facts, _fact_kinds(supplier_facts, measures, year_kinds), len(supplier_dim), years, len(FACTORY_CODES)
+    )
+    category_cube = _cube(category_facts, _fact_kinds(category_facts, measures, year_kinds), len(category_dim), years)
+    factory_cube = _cube(factory_facts, _fact_kinds(factory_facts, measures, year_kinds), len(factory_dim), years)
+
+    digest = hashlib.sha1()
+    for array in (supplier_cube, category_cube, factory_cube):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    for dim in (supplier_dim, category_dim, factory_dim):
+        _update_digest(digest, dim)
+
+    version = digest.hexdigest()[:12]
+    return DataStore(
+        years=years,
+        measures=measures,
+        column_names=column_names,
+        supplier_dim=supplier_dim,
+        category_dim=category_dim,
+        factory_dim=factory_dim,
+        fact_chunks={'supplier': [supplier_facts], 'category': [category_facts], 'factory': [factory_facts]},
+        supplier_cube=supplier_cube,
+        category_cube=category_cube,
+        factory_cube=factory_cube,
+        version=version,
+        base_version=version,
+        keys={
+            # 工厂编码 -> 工厂总览中的行（合计行编码为 合计）；供应商与子类别的键在第一次追加增量时建立
+            'factory': {code: np.flatnonzero(unit_codes.to_numpy() == code) for code in range(len(FACTORY_CODES))},
+        },
+    )
+
+
+def _update_digest(digest, frame):
+    # 文本列拼接后整体计算摘要，比逐行哈希快得多
+    for column in frame.columns:
+        values = frame[column]
+        if pd.api.types.is_numeric_dtype(values):
+            digest.update(np.ascontiguousarray(values.to_numpy(dtype=float)).tobytes())
+        else:
+            digest.update('\x00'.join(values.astype(str)).encode('utf-8'))
+
+
+def _key_lookup(dim, key_columns):
+    return {key: row for row, key in enumerate(zip(*[dim[column].astype(str) for column in key_columns]))}
+
+
+def supplier_column(store, year, factory='合计'):
+    """某年度某工厂在供应商宽表中的列名，如 2024合计入库金额、2025汇风预算金额。"""
+    return store.column_names[('supplier', int(year), factory)]
+
+
+def category_column(store, year):
+    return store.column_names[('category', int(year), '合计')]
+
+
+def factory_column(store, year):
+    return store.column_names[('factory', int(year), '合计')]
+
+
+def actual_column(table, year, factory='合计'):
+    """预算年度追加的实际入库在宽表视图中的列名，如 2025合计入库金额、2025年入库金额。"""
+    if table == 'supplier':
+        return f'{year}{factory}入库金额'
+    return f'{year}年入库Spend' if table == 'category' else f'{year}年入库金额'
+
+
+def supplier_values(store, year, factory='合计', kind=None):
+    """某年度某工厂各供应商实体的金额，kind 默认为该年度的主度量。"""
+    kind = store.year_kind(year) if kind is None else kind
+    return store.supplier_cube[:, FACTORY_CODES.index(factory), store.year_index(year), kind]
+
+
+def supplier_year_values(store):
+    """各年度主度量的 (供应商实体, 工厂, 年份) 数组。"""
+    kinds = [store.year_kind(year) for year in store.years]
+    return store.supplier_cube[:, :, np.arange(len(store.years)), kinds]
+
+
+def _growth(base, compare):
+    # 与原始文件一致：增长率为取整后的百分数，基准为0时为空
+    growth = compare - base
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.where(base != 0, np.round(growth / base * 100), np.nan)
+    return growth, rate
+
+
+def supplier_view(store, base_year, compare_year):
+    """还原所选两个年度的供应商宽表，增长金额/增长率由年份切片重新计算。"""
+    frame = store.supplier_dim.copy()
+    for year in (base_year, compare_year):
+        for factory in FACTORY_CODES:
+            if ('supplier', int(year), factory) in store.column_names:
+                frame[supplier_column(store, year, factory)] = supplier_values(store, year, factory)
+    # 预算年度已追加实际入库时，另列出入库金额（预算执行情况）
+    for year in (base_year, compare_year):
+        if store.has_actuals(year):
+            for factory in FACTORY_CODES:
+                frame[actual_column('supplier', year, factory)] = supplier_values(store, year, factory, ACTUAL)
+    frame['增长金额'], frame['增长率'] = _growth(supplier_values(store, base_year), supplier_values(store, compare_year))
+    return frame
+
+
+def category_view(store, base_year, compare_year):
+    frame = store.category_dim.copy()
+    values = {year: store.category_cube[:, store.year_index(year), store.year_kind(year)]
+              for year in (base_year, compare_year)}
+    for year in (base_year, compare_year):
+        frame[category_column(store, year)] = values[year]
+    for year in (base_year, compare_year):
+        if store.has_actuals(year):
+            frame[actual_column('category', year)] = store.category_cube[:, store.year_index(year), ACTUAL]
+    frame['增长金额'], frame['增长率'] = _growth(values[base_year], values[compare_year])
+    return frame
+
+
+def factory_view(store, base_year, compare_year):
+    frame = store.factory_dim.copy()
+    values = {year: store.factory_cube[:, store.year_index(year), store.year_kind(year)]
+              for year in (base_year, compare_year)}
+    # 与原始文件一致：对比年度列在前
+    for year in (compare_year, base_year):
+        frame[factory_column(store, year)] = values[year]
+    for year in (base_year, compare_year):
+        if store.has_actuals(year):
+            frame[actual_column('factory', year)] = store.factory_cube[:, store.year_index(year), ACTUAL]
+    frame['增长金额'], frame['增长率'] = _growth(values[base_year], values[compare_year])
+    return frame
+
+
+def year_slice(store, base_year, compare_year):
+    """返回两个年度的 (工厂总览, 供应商, 子类别) 宽表视图。"""
+    return (
+        factory_view(store, base_year, compare_year),
+        supplier_view(store, base_year, compare_year),
+        category_view(store, base_year, compare_year),
+    )
+
+
+DELTA_FILE_PREFIX = '入库增量_'
+
+
+def _measure_code(store, name):
+    if name not in store.measures:
+        store.measures.append(name)
+    return store.measures.index(name)
+
+
+def copy_store(store):
+    """追加增量前复制一份可写的 DataStore：已发布的对象不再修改，正在使用它的重跑与接口请求不受影响。
+
+    数组整体复制（映射的只读数组也因此可写）；维度表追加时整体替换，事实表只追加新分块，只需复制列表与字典。
+    """
+    return replace(
+        store,
+        years=list(store.years),
+        measures=list(store.measures),
+        column_names=dict(store.column_names),
+        fact_chunks={table: list(chunks) for table, chunks in store.fact_chunks.items()},
+        supplier_cube=store.supplier_cube.copy(),
+        category_cube=store.category_cube.copy(),
+        factory_cube=store.factory_cube.copy(),
+        keys={table: dict(lookup) for table, lookup in store.keys.items()},
+    )
+
+
+def _ensure_year(store, year):
+    # 新的年份在三个数组中插入一列，主度量为入库；增量未涉及的单元格与 build_store 一致为 NaN（无记录）
+    if year in store.years:
+        return
+    pos = int(np.searchsorted(store.years, year))
+    store.supplier_cube = np.insert(store.supplier_cube, pos, np.nan, axis=2)
+    store.category_cube = np.insert(store.category_cube, pos, np.nan, axis=1)
+    store.factory_cube = np.insert(store.factory_cube, pos, np.nan, axis=1)
+    store.years.insert(pos, year)
+    for factory in FACTORY_CODES:
+        store.column_names[('supplier', year, factory)] = f'{year}{factory}入库金额'
+    store.column_names[('category', year, '合计')] = f'{year}年Spend'
+    store.column_names[('factory', year, '合计')] = f'{year}年入库金额'
+
+
+def _locate(store, table, dim_attr, key_frame, key_columns, new_rows):
+    # 按键查找行号；新出现的键追加到维度表末尾，数组同步追加行
+    if table not in store.keys:
+        store.keys[table] = _key_lookup(getattr(store, dim_attr), key_columns)
+    lookup = store.keys[table]
+    keys = list(zip(*[key_frame[column].astype(str) for column in key_frame.columns]))
+    rows = np.array([lookup.get(key, -1) for key in keys], dtype=np.int64)
+    missing = rows < 0
+    if missing.any():
+        dim = getattr(store, dim_attr)
+        added = new_rows.loc[missing].drop_duplicates(key_columns)
+        added = added.reindex(columns=dim.columns)
+        start = len(dim)
+        for offset, key in enumerate(zip(*[added[column].astype(str) for column in key_columns])):
+            lookup[key] = start + offset
+        setattr(store, dim_attr, pd.concat([dim, added], ignore_index=True))
+        cube_attr = f'{table}_cube'
+        cube = getattr(store, cube_attr)
+        # 新实体在已有年份中无记录，与 build_store 一致记为 NaN
+        padding = np.full((len(added),) + cube.shape[1:], np.nan)
+        setattr(store, cube_attr, np.concatenate([cube, padding]))
+        rows = np.array([lookup[key] for key in keys], dtype=np.int64)
+    return rows
+
+
+def _add(cube, index, values):
+    # 单元格原为 NaN（无记录）时从0开始累加
+    cube[index] = np.nan_to_num(cube[index])
+    np.add.at(cube, index, values)
+
+
+def apply_delta(store, delta):
+    """将月度入库增量（DELTA_SCHEMA 结构）累加到 DataStore，原地更新并返回受影响的对象。
+
+    已发布给其他会话使用的 DataStore 先用 copy_store 复制，在副本上追加。
+    这里的 version 只保证与追加前不同；增量保存后应以 delta_version 重新计算，使同样的数据总是得到同一个版本。
+
+    只更新增量涉及的供应商、子类别和工厂单元格，事实表追加一个新分块，
+    不重新读取或重算历史数据；新供应商/子类别追加到维度表末尾。
+    金额总是记入度量轴的入库：预算年度的入库与预算并存，不覆盖预算。入库金额为负数时即撤销之前追加的数额。
+    """
+    if delta.empty:
+        return {'suppliers': [], 'sub_categories': [], 'factories': [], 'years': []}
+    delta = delta.copy()
+    delta['年份'] = delta['年份'].astype(int)
+    # 月度明细只影响年度合计，先按 (供应商实体, 年份, 工厂) 汇总
+    grouped = delta.groupby(SUPPLIER_KEYS + ['年份', '工厂'], sort=False, observed=True)['入库金额'] \
+        .sum().reset_index()
+    for year in sorted(grouped['年份'].unique()):
+        _ensure_year(store, int(year))
+
+    year_pos = np.array([store.year_index(year) for year in grouped['年份']])
+    factory_codes = grouped['工厂'].map(FACTORY_CODES.index).to_numpy()
+    total_code = FACTORY_CODES.index('合计')
+    amounts = grouped['入库金额'].to_numpy(dtype=float)
+
+    # 供应商：分厂列与合计列
+    first_rows = delta.drop_duplicates(SUPPLIER_KEYS).set_index(SUPPLIER_KEYS)
+    new_suppliers = grouped[SUPPLIER_KEYS].join(first_rows, on=SUPPLIER_KEYS)
+    entities = _locate(store, 'supplier', 'supplier_dim', grouped[SUPPLIER_KEYS], SUPPLIER_KEYS, new_suppliers)
+    actual = np.full(len(entities), ACTUAL)
+    _add(store.supplier_cube, (entities, factory_codes, year_pos, actual), amounts)
+    _add(store.supplier_cube, (entities, np.full(len(entities), total_code), year_pos, actual), amounts)
+
+    # 子类别：Spend 为各供应商合计
+    subcat_keys = grouped[['Category', 'Sub Category']].set_axis(CATEGORY_KEYS, axis=1)
+    subcats = _locate(store, 'category', 'category_dim', subcat_keys, CATEGORY_KEYS, subcat_keys)
+    _add(store.category_cube, (subcats, year_pos, actual), amounts)
+
+    # 工厂总览：先按 (工厂, 年份) 汇总，再加到对应工厂行与合计行
+    by_factory = pd.DataFrame({'code': factory_codes, 'pos': year_pos, 'amount': amounts}) \
+        .groupby(['code', 'pos'])['amount'].sum()
+    by_year = by_factory.groupby(level='pos').sum()
+    cells = [(code, pos, amount) for (code, pos), amount in by_factory.items()] + \
+        [(total_code, pos, amount) for pos, amount in by_year.items()]
+    factory_rows, factory_row_codes, factory_years, factory_amounts = [], [], [], []
+    for code, pos, amount in cells:
+        rows = store.keys['factory'][code]
+        factory_rows += list(rows)
+        factory_row_codes += [code] * len(rows)
+        factory_years += [pos] * len(rows)
+        factory_amounts += [amount] * len(rows)
+    if factory_rows:
+        _add(store.factory_cube, (np.array(factory_rows), np.array(factory_years), np.full(len(factory_rows), ACTUAL)),
+             np.array(factory_amounts))
+
+    # 事实表追加新分块
+    years = grouped['年份'].to_numpy()
+    measure = _measure_code(store, '入库')
+    store.fact_chunks['supplier'].append(pd.DataFrame({
+        'entity': np.concatenate([entities, entities]).astype(np.int32),
+        'factory': np.concatenate([factory_codes, np.full(len(entities), total_code)]).astype(np.int8),
+        'year': np.concatenate([years, years]).astype(np.int16),
+        'measure': np.int8(measure),
+        'value': np.concatenate([amounts, amounts]),
+    })[FACT_COLUMNS])
+    store.fact_chunks['category'].append(pd.DataFrame({
+        'entity': subcats.astype(np.int32),
+        'factory': np.int8(total_code),
+        'year': years.astype(np.int16),
+        'measure': np.int8(measure),
+        'value': amounts,
+    })[FACT_COLUMNS])
+    if factory_rows:
+        store.fact_chunks['factory'].append(pd.DataFrame({
+            'entity': np.array(factory_rows, dtype=np.int32),
+            'factory': np.array(factory_row_codes, dtype=np.int8),
+            'year': np.array([store.years[pos] for pos in factory_years], dtype=np.int16),
+            'measure': np.int8(_measure_code(store, '入库金额')),
+            'value': np.array(factory_amounts),
+        })[FACT_COLUMNS])
+
+    digest = hashlib.sha1(store.version.encode())
+    _update_digest(digest, grouped)
+    store.version = digest.hexdigest()[:12]
+
+    return {
+        'suppliers': sorted(set(grouped['供应商'])),
+        'sub_categories': sorted(set(zip(grouped['Category'], grouped['Sub Category']))),
+        'factories': sorted(set(grouped['工厂'])),
+        'years': sorted(set(int(year) for year in years)),
+    }
+
+
+DELTA_COLUMNS = ['供应商', 'Category', 'Sub Category', '年份', '月份', '工厂', '入库金额']
+
+
+def delta_month_path(directory, year, month):
+    return os.path.join(directory, f'{DELTA_FILE_PREFIX}{int(year)}-{int(month):02d}.csv')
+
+
+def _month_digest(frame):
+    # 与行顺序、数值写法无关的内容摘要，用于识别重复上传的同一月份
+    frame = frame[DELTA_COLUMNS].astype({
+        '供应商': str, 'Category': str, 'Sub Category': str, '年份': int, '月份': int, '工厂': str, '入库金额': float
+    })
+    frame = frame.sort_values(DELTA_COLUMNS).reset_index(drop=True)
+    return hashlib.sha1(frame.to_csv(index=False).encode('utf-8')).hexdigest()
+
+
+def plan_delta(delta, directory, replace=False):
+    """按 (年份, 月份) 与 directory 中已保存的增量比对，返回 (需要累加的净增量, {(年份, 月份): 该月的增量}, 重复的月份)。
+
+    与已保存内容完全一致的月份视为重复上传，不再累加；全部月份都重复时抛出 ValueError。
+    已保存过但内容不同的月份，replace 为 True 时以新内容替换（净增量中包含旧内容的负数），否则抛出 ValueError。
+    """
+    delta = delta.copy()
+    delta[['年份', '月份']] = delta[['年份', '月份']].astype(int)
+    changes, months, duplicates, conflicts = [], {}, [], []
+    for (year, month), part in delta.groupby(['年份', '月份'], sort=True):
+        path = delta_month_path(directory, year, month)
+        saved = pd.read_csv(path, encoding='utf-8') if os.path.exists(path) else None
+        if saved is not None and _month_digest(saved) == _month_digest(part):
+            duplicates.append((year, month))
+            continue
+        if saved is not None and not replace:
+            conflicts.append((year, month))
+            continue
+        changes.append(part)
+        if saved is not None:
+            changes.append(saved.assign(入库金额=-saved['入库金额']))
+        months[(year, month)] = part
+    labels = lambda items: '、'.join(f'{year}年{month}月' for year, month in items)
+    if conflicts:
+        raise ValueError(f"{labels(conflicts)}已追加过不同的数据，如需以本文件为准请勾选替换已追加的月份")
+    if not months:
+        raise ValueError(f"{labels(duplicates)}的数据已追加过，未重复累加")
+    # 新内容在前：新供应商的维度行取自上传的文件
+    return pd.concat(changes, ignore_index=True), months, duplicates
+
+
+def save_delta(months, directory):
+    """将 plan_delta 返回的各月增量保存到 directory，每月一个文件，替换时覆盖该月原有的文件；完整重新加载时重放。"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for (year, month), part in months.items():
+        path = delta_month_path(directory, year, month)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        part[DELTA_COLUMNS].to_csv(tmp_path, index=False, encoding='utf-8')
+        os.replace(tmp_path, path)
+        paths.append(path)
+    return paths
+
+
+def delta_files(directory):
+    """已保存的增量文件：每月一个文件（入库增量_2025-01.csv），以及早期按追加时间命名的文件。"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.startswith(DELTA_FILE_PREFIX) and name.endswith('.csv')
+    )
+
+
+def delta_version(base_version, directory):
+    """由数据文件版本与 directory 中已保存的增量内容计算版本号。
+
+    按文件名（年份、月份）排序后逐个计算内容摘要，与追加的先后、替换过程及行顺序无关：
+    重启后重放得到的版本与追加时相同。没有增量时即为 base_version。
+    """
+    paths = delta_files(directory)
+    if not paths:
+        return base_version
+    digest = hashlib.sha1(base_version.encode())
+    for path in paths:
+        saved = pd.read_csv(path, encoding='utf-8')
+        digest.update(f'{os.path.basename(path)}:{_month_digest(saved)}\n'.encode('utf-8'))
+    return digest.hexdigest()[:12]
@@ -0,0 +1,286 @@
+import hashlib
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# 供应商名称末尾的公司类型后缀，按长度从长到短依次剥离
+LEGAL_SUFFIXES_ZH = sorted([
+    '股份有限公司', '有限责任公司', '集团有限公司', '有限公司', '股份公司',
+    '集团公司', '（普通合伙）', '(普通合伙)', '普通合伙', '公司',
+], key=len, reverse=True)
+LEGAL_SUFFIXES_EN = {
+    'gmbh', 'co', 'kg', 'ltd', 'limited', 'inc', 'corp', 'corporation', 'company',
+    'llc', 'ag', 'sa', 'as', 'ab', 'bv', 'nv', 'plc', 'pte', 'srl', 'spa', 'oy',
+    'public', 'group',
+}
+
+_CJK = re.compile(r'[㐀-鿿]')
+_NON_WORD = re.compile(r'[^0-9a-z㐀-鿿()]+')
+_DIGITS = re.compile(r'[0-9]+')
+
+MAP_COLUMNS = ['供应商', '标准化名称', '供应商ID', '标准供应商名称']
+
+
+def normalize_name(name):
+    """统一全角/半角、大小写与标点，并剥离公司类型后缀。"""
+    text = unicodedata.normalize('NFKC', str(name)).lower().strip()
+    # 北欧字母等变音符号折叠为基本拉丁字母
+    text = ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+    text = text.replace('ø', 'o').replace('æ', 'ae').replace('&', ' ')
+    changed = True
+    while changed:
+        changed = False
+        for suffix in LEGAL_SUFFIXES_ZH:
+            if text.endswith(suffix) and len(text) > len(suffix):
+                text = text[:-len(suffix)].rstrip()
+                changed = True
+    tokens = _NON_WORD.sub(' ', text).split()
+    while len(tokens) > 1 and tokens[-1].strip('()') in LEGAL_SUFFIXES_EN:
+        tokens.pop()
+    return ' '.join(tokens)
+
+
+def name_ngrams(normalized):
+    """中文取字符二元组，拉丁字母按单词取带边界的三元组。"""
+    grams = set()
+    for token in normalized.split():
+        if _CJK.search(token):
+            grams.update(token[i:i + 2] for i in range(max(len(token) - 1, 1)))
+        else:
+            padded = f' {token} '
+            grams.update(padded[i:i + 3] for i in range(max(len(padded) - 2, 1)))
+    return grams
+
+
+def _score_key(normalized):
+    # 参与相似度计算的部分：去掉数字；数字另行比较，只有数字完全相同的名称才会被模糊合并
+    return ' '.join(_DIGITS.sub(' ', normalized).split()), tuple(_DIGITS.findall(normalized))
+
+
+def _prefix_lengths(gram_counts, threshold):
+    # 前缀过滤：Dice ≥ threshold 的两个名称，各自按全局频次最稀有的前 p 个 n-gram 中至少有一个相同
+    ratio = threshold / (2 - threshold)
+    return gram_counts - np.ceil(ratio * gram_counts - 1e-9).astype(np.int64) + 1
+
+
+def _candidate_pairs(postings, prefix_lengths, chunk_rows=2_000_000):
+    # 每个名称只以自身最稀有的几个 n-gram 为分块键，与数据规模无关，也不会漏掉超过阈值的名称对
+    df = postings.groupby('gram')['name'].transform('size')
+    ordered = postings.assign(df=df).sort_values(['name', 'df', 'gram'])
+    rank = ordered.groupby('name').cumcount()
+    blocked = ordered[(rank < prefix_lengths[ordered['name']]) & (ordered['df'] > 1)]
+    if blocked.empty:
+        return pd.DataFrame({'a': [], 'b': []}, dtype=np.int64)
+
+    sizes = blocked.groupby('gram').size()
+    gram_chunk = (sizes ** 2).cumsum() // chunk_rows
+    blocked = blocked.assign(chunk=blocked['gram'].map(gram_chunk))
+    pairs = []
+    for _, part in blocked.groupby('chunk'):
+        joined = part[['gram', 'name']].merge(part[['gram', 'name']], on='gram', suffixes=('_a', '_b'))
+        joined = joined[joined['name_a'] < joined['name_b']]
+        pairs.append(joined[['name_a', 'name_b']].drop_duplicates())
+    return pd.concat(pairs).drop_duplicates().rename(columns={'name_a': 'a', 'name_b': 'b'})
+
+
+def _dice_scores(pairs, postings, gram_counts):
+    # 对候选对计算完整 n-gram 集合上的 Dice 系数
+    left = pairs.reset_index(drop=True).rename_axis('pair').reset_index()
+    expanded = left.merge(postings, left_on='a', right_on='name')[['pair', 'b', 'gram']]
+    shared = expanded.merge(postings, left_on=['b', 'gram'], right_on=['name', 'gram'])
+    shared_counts = np.bincount(shared['pair'], minlength=len(left))
+    total = gram_counts[left['a']] + gram_counts[left['b']]
+    return 2 * shared_counts / np.maximum(total, 1)
+
+
+def _is_subsequence(short, long):
+    chars = iter(long)
+    return all(c in chars for c in short)
+
+
+def _variant_pair(a, b):
+    # 只增删字符（如"科技"、"(中国)"）视为同一供应商的写法差异；替换字符（如 甲/乙、一厂/二厂）视为不同供应商
+    a, b = a.replace(' ', ''), b.replace(' ', '')
+    return _is_subsequence(a, b) if len(a) <= len(b) else _is_subsequence(b, a)
+
+
+def _clique_labels(n, edges_a, edges_b, scores):
+    # 完全链接聚类：按得分从高到低处理匹配边，两个簇之间的每一对名称都达到阈值时才合并，避免相似名称串联成一个ID
+    labels = np.arange(n)
+    members = {}
+    edges = set(zip(edges_a.tolist(), edges_b.tolist()))
+    for i in np.argsort(-scores, kind='stable'):
+        a, b = labels[edges_a[i]], labels[edges_b[i]]
+        if a == b:
+            continue
+        group_a, group_b = members.get(a, [a]), members.get(b, [b])
+        if all((min(x, y), max(x, y)) in edges for x in group_a for y in group_b):
+            root = min(a, b)
+            members[root] = group_a + group_b
+            members.pop(max(a, b), None)
+            labels[members[root]] = root
+    return labels
+
+
+def resolve_suppliers(names, threshold=0.85, aliases=None, existing=None, keep_canonical=False):
+    """将供应商原始名称映射到标准供应商ID。
+
+    标准化名称相同的直接合并；其余名称去掉公司类型后缀和数字后按 n-gram 的 Dice 系数比较，
+    数字相同、得分不低于 threshold 且只差增删字符的名称对才算匹配，并且只合并两两都匹配的名称。
+
+    names: 原始名称序列（可重复，出现次数用于挑选标准名称）。
+    aliases: {别名: 标准名称} 的人工映射，用于中英文名称等无法通过字符相似度识别的情况。
+    existing: 之前持久化的映射表，已有名称沿用原ID，保证ID在多次加载间稳定。
+    keep_canonical: 沿用原ID的供应商保留原来的标准名称。names 只是一部分名称（如月度增量）时，
+        已有名称的出现次数为0，重新挑选会改写已有供应商的标准名称。
+    返回包含 MAP_COLUMNS 各列的映射表，每个原始名称一行。
+    """
+    raw = pd.Series(names, dtype=object).dropna().astype(str)
+    counts = raw.value_counts()
+    if existing is not None and not existing.empty:
+        counts = counts.add(pd.Series(0, index=existing['供应商'].astype(str)), fill_value=0)
+    mapping = pd.DataFrame({'供应商': counts.index, '出现次数': counts.to_numpy()})
+
+    aliases = aliases or {}
+    mapping['标准化名称'] = [
+        normalize_name(aliases.get(name, name)) for name in mapping['供应商']
+    ]
+
+    # 标准化后完全相同的名称直接合并，只对不同的标准化名称做模糊匹配
+    norm_codes, norm_values = pd.factorize(mapping['标准化名称'])
+    keys, numbers = zip(*(_score_key(value) for value in norm_values)) if len(norm_values) else ((), ())
+    # 数字不同的名称不比较：n-gram 按 (数字, n-gram) 编码，只有数字相同的名称才会共用分块键
+    gram_lists = [name_ngrams(key) if key else set() for key in keys]
+    gram_counts = np.array([len(grams) for grams in gram_lists], dtype=np.int64)
+    postings = pd.DataFrame({
+        'name': np.repeat(np.arange(len(norm_values)), gram_counts),
+        'gram': [(number, gram) for number, grams in zip(numbers, gram_lists) for gram in grams],
+    })
+    postings['gram'] = pd.factorize(postings['gram'])[0] if len(postings) else postings['gram']
+
+    pairs = _candidate_pairs(postings, _prefix_lengths(gram_counts, threshold))
+    if len(pairs):
+        scores = _dice_scores(pairs, postings, gram_counts)
+        keep = (scores >= threshold) & np.array(
+            [_variant_pair(keys[a], keys[b]) for a, b in zip(pairs['a'], pairs['b'])], dtype=bool
+        )
+        matched, scores = pairs[keep], scores[keep]
+    else:
+        matched, scores = pairs, np.empty(0)
+    labels = _clique_labels(
+        len(norm_values),
+        matched['a'].to_numpy(dtype=np.int64),
+        matched['b'].to_numpy(dtype=np.int64),
+        np.asarray(scores, dtype=float)
+    )
+    mapping['cluster'] = labels[norm_codes]
+
+    # 分配ID：聚类中已有持久化ID的沿用最小的旧ID，其余按顺序新建
+    if existing is not None and not existing.empty:
+        old_ids = mapping['供应商'].map(existing.set_index('供应商')['供应商ID']).dropna()
+    else:
+        old_ids = pd.Series([], dtype=object)
+    cluster_ids = old_ids.groupby(mapping.loc[old_ids.index, 'cluster']).min() \
+        .reindex(pd.unique(mapping['cluster'])).astype(object)
+    # 原来同一ID的名称被拆到多个聚类时（如删除了别名），出现次数最多的聚类沿用旧ID，其余新建
+    weight = mapping.groupby('cluster')['出现次数'].sum().reindex(cluster_ids.index)
+    claimed = cluster_ids.dropna()
+    if claimed.duplicated().any():
+        ranked = weight[claimed.index].sort_values(ascending=False, kind='stable')
+        cluster_ids.loc[ranked.index[claimed[ranked.index].duplicated()]] = np.nan
+    next_number = _max_id_number(existing) + 1
+    missing = cluster_ids[cluster_ids.isna()].index
+    cluster_ids.loc[missing] = [f'S{next_number + i:06d}' for i in range(len(missing))]
+    mapping['供应商ID'] = mapping['cluster'].map(cluster_ids)
+
+    # 标准名称取出现次数最多的写法，次数相同时取较短者
+    mapping['名称长度'] = mapping['供应商'].str.len()
+    canonical = mapping.sort_values(['出现次数', '名称长度'], ascending=[False, True]) \
+        .drop_duplicates('供应商ID').set_index('供应商ID')['供应商']
+    if keep_canonical and existing is not None and not existing.empty:
+        kept = existing.drop_duplicates('供应商ID').set_index('供应商ID')['标准供应商名称']
+        # 原标准名称仍属于同一ID时才保留（别名改动拆分聚类后可能已不属于）
+        owner = kept.map(mapping.set_index('供应商')['供应商ID'])
+        kept = kept[owner == kept.index]
+        canonical.loc[kept.index.intersection(canonical.index)] = kept
+    mapping['标准供应商名称'] = mapping['供应商ID'].map(canonical)
+    return mapping[MAP_COLUMNS].sort_values('供应商ID').reset_index(drop=True)
+
+
+def _max_id_number(existing):
+    if existing is None or existing.empty:
+        return 0
+    return int(existing['供应商ID'].str[1:].astype(int).max())
+
+
+def load_aliases(path):
+    # 别名文件两列：别名, 标准名称
+    if not path or not os.path.exists(path):
+        return {}
+    aliases = pd.read_csv(path, encoding='utf-8')
+    return dict(zip(aliases.iloc[:, 0].astype(str), aliases.iloc[:, 1].astype(str)))
+
+
+def load_supplier_map(path):
+    if not path or not os.path.exists(path):
+        return pd.DataFrame(columns=MAP_COLUMNS)
+    return pd.read_csv(path, encoding='utf-8', dtype=str)
+
+
+def save_supplier_map(mapping, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    mapping.to_csv(tmp_path, index=False, encoding='utf-8')
+    os.replace(tmp_path, path)
+
+
+def alias_digest(aliases):
+    """别名映射的摘要：别名文件改动后持久化的映射需要重新生成。"""
+    text = '\n'.join(f'{alias}\t{name}' for alias, name in sorted(aliases.items()))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _digest_path(map_path):
+    return f'{map_path}.aliases'
+
+
+def build_supplier_index(names, map_path=None, alias_path=None, **kwargs):
+    """读取持久化映射；出现新名称或别名文件有改动时才重新匹配并写回，已有名称沿用原ID。
+
+    names 只是部分名称（如月度增量）时传入 keep_canonical=True，已有供应商的标准名称不变。
+    """
+    existing = load_supplier_map(map_path)
+    aliases = load_aliases(alias_path)
+    digest = alias_digest(aliases)
+    saved_digest = None
+    if map_path and os.path.exists(_digest_path(map_path)):
+        with open(_digest_path(map_path), encoding='utf-8') as f:
+            saved_digest = f.read().strip()
+    known = set(existing['供应商'])
+    unique_names = pd.unique(pd.Series(names, dtype=object).dropna().astype(str))
+    if len(existing) and saved_digest == digest and all(name in known for name in unique_names):
+        return existing
+    mapping = resolve_suppliers(names, aliases=aliases, existing=existing, **kwargs)
+    if map_path:
+        save_supplier_map(mapping, map_path)
+        with open(_digest_path(map_path), 'w', encoding='utf-8') as f:
+            f.write(digest)
+    return mapping
+
+
+def attach_supplier_ids(supplier_data, mapping):
+    """为供应商数据添加 供应商ID 与 标准供应商名称 两列。"""
+    lookup = mapping.set_index('供应商')
+    names = supplier_data['供应商'].astype(str)
+    supplier_data['供应商ID'] = names.map(lookup['供应商ID'])
+    supplier_data['标准供应商名称'] = names.map(lookup['标准供应商名称'])
+    return supplier_data
+
+
+def supplier_totals(supplier_data, value_col):
+    """按供应商ID汇总金额，用于集中度等跨子类别、跨工厂的指标。"""
+    key = '供应商ID' if '供应商ID' in supplier_data.columns else '供应商'
+    return supplier_data.groupby(key)[value_col].sum()
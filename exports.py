@@ -0,0 +1,126 @@
+import importlib.util
+import os
+import re
+import time
+import uuid
+
+import pandas as pd
+
+from config import EXPORT_CHUNK_ROWS, EXPORT_MAX_AGE, EXPORT_KEEP
+
+# 导出格式 -> 文件扩展名；XLSX 需要 openpyxl
+EXPORT_FORMATS = {'CSV': 'csv', 'XLSX': 'xlsx'}
+
+
+def xlsx_available():
+    return importlib.util.find_spec('openpyxl') is not None
+
+
+def available_formats():
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'XLSX' or xlsx_available()]
+
+
+def iter_chunks(frame, chunk_rows=EXPORT_CHUNK_ROWS):
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+
+def excel_number_formats(frame):
+    """按列名推断 Excel 数字格式：占比/增长率列为一位小数的百分数，其余数值列为千分位金额。
+
+    单元格中保存的仍是原始数值，格式只影响 Excel 中的显示。
+    """
+    formats = {}
+    for col in frame.columns:
+        if not pd.api.types.is_numeric_dtype(frame[col]):
+            continue
+        formats[col] = '0.0"%"' if '占比' in str(col) or '率' in str(col) else '#,##0'
+    return formats
+
+
+def _cell_value(value):
+    if isinstance(value, str):
+        return value
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+def write_csv(frame, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    # utf-8-sig 使 Excel 直接打开时能正确识别中文
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        frame.head(0).to_csv(f, index=False)
+        for chunk in iter_chunks(frame, chunk_rows):
+            chunk.to_csv(f, header=False, index=False)
+
+
+def write_xlsx(frame, path, sheet_name='Sheet1', chunk_rows=EXPORT_CHUNK_ROWS):
+    """以 openpyxl 的 write-only 模式逐行写入，内存占用与行数无关。"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=re.sub(r'[\[\]:*?/\\]', '_', sheet_name)[:31])
+    sheet.append([str(col) for col in frame.columns])
+    number_formats = excel_number_formats(frame)
+    formats = [number_formats.get(col) for col in frame.columns]
+    for chunk in iter_chunks(frame, chunk_rows):
+        for row in chunk.itertuples(index=False, name=None):
+            cells = []
+            for value, number_format in zip(row, formats):
+                value = _cell_value(value)
+                if number_format and value is not None:
+                    cell = WriteOnlyCell(sheet, value=value)
+                    cell.number_format = number_format
+                    value = cell
+                cells.append(value)
+            sheet.append(cells)
+    workbook.save(path)
+
+
+def clean_exports(directory, max_age=EXPORT_MAX_AGE, keep=EXPORT_KEEP):
+    """删除 directory 中超过 max_age 秒的导出文件（含中断遗留的临时文件），并只保留最新的 keep 个。"""
+    if not os.path.isdir(directory):
+        return
+    entries = []
+    for entry in os.scandir(directory):
+        try:
+            entries.append((entry.stat().st_mtime, entry.path))
+        except OSError:
+            continue
+    entries.sort(reverse=True)
+    now = time.time()
+    for rank, (mtime, path) in enumerate(entries):
+        if now - mtime > max_age or rank >= keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def export_table(frame, fmt, directory, name, version='', sheet_name='Sheet1', chunk_rows=EXPORT_CHUNK_ROWS):
+    """将 frame 按块写入 directory 下的 CSV 或 XLSX 文件，返回文件路径。
+
+    文件名为 名称_数据版本_随机后缀，不同会话同时导出同一张表时互不覆盖；写入前清理过期的导出文件。
+    先写入临时文件再整体替换，不会读到写了一半的文件。
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式：{fmt}")
+    if fmt == 'XLSX' and not xlsx_available():
+        raise ValueError("导出 XLSX 需要安装 openpyxl")
+
+    os.makedirs(directory, exist_ok=True)
+    clean_exports(directory)
+    file_name = re.sub(r'[\\/:*?"<>|\s]+', '_', '_'.join(part for part in (name, version) if part))
+    path = os.path.join(directory, f'{file_name}_{uuid.uuid4().hex[:8]}.{EXPORT_FORMATS[fmt]}')
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    try:
+        if fmt == 'XLSX':
+            write_xlsx(frame, tmp_path, sheet_name, chunk_rows)
+        else:
+            write_csv(frame, tmp_path, chunk_rows)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
@@ -0,0 +1,185 @@
+"""看板重跑的性能埋点：分段耗时、缓存命中与未命中、每个图表和数据表发送到前端的字节数。
+
+每次重跑的结果追加到 JSON Lines 日志，侧边栏的调试面板显示本次重跑的明细。
+Streamlit 每个会话的脚本在各自的线程中运行，当前重跑的记录保存在线程局部变量中；
+没有开始记录时各函数直接返回，开销可以忽略。
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import INSTRUMENTATION_ENABLED, INSTRUMENTATION_LOG, INSTRUMENTATION_LOG_MAX_BYTES
+
+# 日志中保留的最大元素数量（按字节数排序）
+TOP_ELEMENTS = 20
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+class RunRecord:
+    """一次重跑的埋点数据。"""
+
+    def __init__(self, session):
+        self.session = session
+        self.started = time.perf_counter()
+        self.seconds = None
+        self.sections = {}      # 名称 -> {'calls', 'seconds'}
+        self.cache = {}         # 缓存函数 -> {'calls', 'misses', 'seconds'}
+        self.elements = []      # {'section', 'type', 'bytes', 'seconds'}
+        self.stack = []
+        self.last_delta = self.started
+
+    def add_section(self, name, seconds):
+        entry = self.sections.setdefault(name, {'calls': 0, 'seconds': 0.0})
+        entry['calls'] += 1
+        entry['seconds'] += seconds
+
+    def add_element(self, element_type, size):
+        now = time.perf_counter()
+        self.elements.append({
+            'section': self.stack[-1] if self.stack else '',
+            'type': element_type,
+            'bytes': size,
+            # 与上一个元素之间的耗时，包含计算、Styler 渲染和图表序列化
+            'seconds': now - self.last_delta,
+        })
+        self.last_delta = now
+
+    def payload_summary(self):
+        """按元素类型汇总发送的字节数。"""
+        summary = {}
+        for element in self.elements:
+            entry = summary.setdefault(element['type'], {'count': 0, 'bytes': 0})
+            entry['count'] += 1
+            entry['bytes'] += element['bytes']
+        return summary
+
+    def to_dict(self):
+        cache = {
+            name: dict(entry, hits=entry['calls'] - entry['misses']) for name, entry in self.cache.items()
+        }
+        return {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'session': self.session,
+            'seconds': self.seconds,
+            'sections': self.sections,
+            'cache': cache,
+            'payloads': self.payload_summary(),
+            'largest_elements': sorted(self.elements, key=lambda e: e['bytes'], reverse=True)[:TOP_ELEMENTS],
+        }
+
+
+def current_run():
+    return getattr(_local, 'run', None)
+
+
+def _install_payload_hook(ctx):
+    # 包装脚本上下文的消息队列，在元素发送前记录其序列化后的大小；同一个上下文只包装一次
+    if getattr(ctx, '_instrumented', False):
+        return
+    enqueue = ctx._enqueue
+
+    def instrumented_enqueue(msg):
+        run = current_run()
+        if run is not None and msg.WhichOneof('type') == 'delta':
+            if msg.delta.WhichOneof('type') == 'new_element':
+                run.add_element(msg.delta.new_element.WhichOneof('type'), msg.ByteSize())
+            else:
+                run.last_delta = time.perf_counter()
+        enqueue(msg)
+
+    ctx._enqueue = instrumented_enqueue
+    ctx._instrumented = True
+
+
+def start_run():
+    """在脚本开头调用，开始记录本次重跑；未启用埋点时返回 None。"""
+    if not INSTRUMENTATION_ENABLED:
+        _local.run = None
+        return None
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    run = RunRecord(ctx.session_id if ctx is not None else '')
+    _local.run = run
+    if ctx is not None and hasattr(ctx, '_enqueue'):
+        _install_payload_hook(ctx)
+    return run
+
+
+def finish_run(log_path=INSTRUMENTATION_LOG):
+    """在脚本末尾调用，结束记录并写入日志，返回本次重跑的记录。"""
+    run = current_run()
+    if run is None:
+        return None
+    _local.run = None
+    run.seconds = time.perf_counter() - run.started
+    write_record(run.to_dict(), log_path)
+    return run
+
+
+def write_record(record, log_path=INSTRUMENTATION_LOG):
+    """追加一行 JSON；日志超过 INSTRUMENTATION_LOG_MAX_BYTES 时轮转为 .1 文件。"""
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    line = json.dumps(record, ensure_ascii=False)
+    with _log_lock:
+        if os.path.exists(log_path) and os.path.getsize(log_path) > INSTRUMENTATION_LOG_MAX_BYTES:
+            os.replace(log_path, f'{log_path}.1')
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+@contextmanager
+def timed(name):
+    """记录一段代码的耗时；其中发送的元素计入该段。"""
+    run = current_run()
+    if run is None:
+        yield
+        return
+    run.stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.add_section(name, time.perf_counter() - start)
+        run.stack.pop()
+
+
+def track_cache(name, cache):
+    """包装 st.cache_data / st.cache_resource，统计调用次数、未命中次数与调用耗时。
+
+    函数体只在未命中时执行，因此在函数体内计数未命中，命中次数为调用次数减去未命中次数。
+    用法：@track_cache('load_data', st.cache_resource(ttl=60))
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def body(*args, **kwargs):
+            run = current_run()
+            if run is not None:
+                run.cache.setdefault(name, {'calls': 0, 'misses': 0, 'seconds': 0.0})['misses'] += 1
+            return func(*args, **kwargs)
+
+        cached = cache(body)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            run = current_run()
+            if run is None:
+                return cached(*args, **kwargs)
+            entry = run.cache.setdefault(name, {'calls': 0, 'misses': 0, 'seconds': 0.0})
+            entry['calls'] += 1
+            start = time.perf_counter()
+            try:
+                return cached(*args, **kwargs)
+            finally:
+                entry['seconds'] += time.perf_counter() - start
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorator
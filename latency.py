@@ -0,0 +1,211 @@
+"""用 Streamlit 的 AppTest 无界面驱动 app.py，模拟一次典型会话，记录每次交互触发的整页重跑耗时与元素数量。
+
+用法：python latency.py [--rows 0 10000 100000] [--budget 2] [--budgets FILE] [--output FILE]
+
+rows 为 0 时使用 DATA_DIR 中的数据文件，其余规模使用 synthetic.py 生成的合成数据。
+每个规模在单独的子进程中运行，并通过 CAIGOU_DATA_DIR / CAIGOU_CACHE_DIR / CAIGOU_SHARED_DATA_DIR
+指定数据目录和一个临时的缓存目录，运行结束后删除，不会改动正式数据的缓存。
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from config import BASE_DIR, BENCHMARK_DIR, DELTA_DIR, SUPPLIER_ID_MAP_FILE
+
+APP_FILE = os.path.join(BASE_DIR, 'app.py')
+DEFAULT_ROWS = [0, 10000]
+# 冷启动类交互（首次加载、刷新数据）的默认预算，其余交互使用 --budget
+COLD_BUDGETS = {'initial_load': 30.0, 'refresh': 30.0}
+ELEMENT_TYPES = ['markdown', 'dataframe', 'plotly_chart', 'metric', 'selectbox']
+
+# 需要切换的下拉框（按标签查找）：切换到第二个选项
+SELECTBOXES = [
+    ('category_detail', "选择品类查看详细信息："),
+    ('subcategory_category', "选择Category查看Sub Category详情："),
+    ('supplier_level', "选择供应商等级查看详细信息："),
+    ('risk_type', "选择风险类型查看详情："),
+    ('detail_category', "选择Category查看子类别明细："),
+    ('detail_subcategory', "选择Sub Category查看供应商明细："),
+]
+# 需要切换的视图（单选框的 key 与目标选项）
+RADIOS = [
+    ('level_suppliers_scope', '全部供应商'),
+    ('supplier_detail_scope', '全部供应商'),
+    ('scenario_level', 'Sub Category'),
+]
+
+
+def _pin_year_pair(at):
+    # 年度下拉框的选项是元组，AppTest 回传控件状态时按字符串查找会失败；每次重跑前显式设回默认的最近两个年度
+    for selectbox in at.selectbox:
+        if selectbox.label == "对比年度":
+            selectbox.set_value(selectbox.options[-1])
+
+
+def _element_counts(at):
+    return {name: len(at.get(name)) for name in ELEMENT_TYPES}
+
+
+def _timed_run(at, name, timeout):
+    _pin_year_pair(at)
+    start = time.perf_counter()
+    at.run(timeout=timeout)
+    return {
+        'interaction': name,
+        'seconds': time.perf_counter() - start,
+        'elements': _element_counts(at),
+        'exceptions': [e.value for e in at.exception],
+    }
+
+
+def _second_option(widget):
+    options = list(widget.options)
+    return options[1] if len(options) > 1 else None
+
+
+def run_session(timeout=600):
+    """在当前进程中运行一次完整会话，返回各交互的记录列表。"""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    from analytics.cache import compute_cache
+    from shared_data import clear_current, clear_shared
+
+    at = AppTest.from_file(APP_FILE, default_timeout=timeout)
+    start = time.perf_counter()
+    at.run()
+    records = [{
+        'interaction': 'initial_load',
+        'seconds': time.perf_counter() - start,
+        'elements': _element_counts(at),
+        'exceptions': [e.value for e in at.exception],
+    }]
+    records.append(_timed_run(at, 'rerun', timeout))
+
+    # 管理者决策辅助：各品类的子类别下拉框
+    for selectbox in [sb for sb in at.selectbox if str(sb.key or '').startswith('subcat_selector_')]:
+        key = selectbox.key
+        option = _second_option(selectbox)
+        if option is None:
+            continue
+        at.selectbox(key=key).set_value(option)
+        records.append(_timed_run(at, f'subcat_selector:{key[len("subcat_selector_"):]}', timeout))
+
+    for name, label in SELECTBOXES:
+        selectbox = next((sb for sb in at.selectbox if sb.label == label), None)
+        option = _second_option(selectbox) if selectbox is not None else None
+        if option is None:
+            continue
+        selectbox.set_value(option)
+        records.append(_timed_run(at, name, timeout))
+
+    for key, option in RADIOS:
+        radio = next((r for r in at.radio if r.key == key), None)
+        if radio is None or option not in radio.options:
+            continue
+        radio.set_value(option)
+        records.append(_timed_run(at, f'view:{key}', timeout))
+
+    # 刷新数据：与侧边栏按钮相同，清空各层缓存（st 缓存、计算缓存、当前 DataStore 与共享数据集）后重新加载。
+    # 不直接点击按钮：按钮内的 st.rerun() 在 AppTest 中会带着同一个点击状态反复重跑
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    compute_cache.clear()
+    clear_current()
+    clear_shared()
+    records.append(_timed_run(at, 'refresh', timeout))
+    return records
+
+
+def run_scale(rows, timeout=600, seed=0):
+    """在子进程中以指定规模的数据运行会话；rows 为 0 时使用当前数据目录。
+
+    缓存目录与共享数据目录总是新建的临时目录（导出、快照、刷新数据等交互都不会写入正式缓存）；
+    rows 为 0 时复制当前的供应商ID映射与已追加的增量，使会话看到与看板相同的数据。
+    """
+    env = dict(os.environ)
+    with tempfile.TemporaryDirectory(prefix='caigou-latency-') as cache_dir:
+        env['CAIGOU_CACHE_DIR'] = cache_dir
+        env['CAIGOU_SHARED_DATA_DIR'] = os.path.join(cache_dir, 'shared')
+        if rows:
+            from benchmark import dataset_paths
+            env['CAIGOU_DATA_DIR'] = os.path.dirname(dataset_paths(rows, seed)['supplier_data'])
+        else:
+            for path in (SUPPLIER_ID_MAP_FILE, f'{SUPPLIER_ID_MAP_FILE}.aliases'):
+                if os.path.exists(path):
+                    shutil.copy2(path, cache_dir)
+            if os.path.isdir(DELTA_DIR):
+                shutil.copytree(DELTA_DIR, os.path.join(cache_dir, os.path.basename(DELTA_DIR)))
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--session', '--timeout', str(timeout)],
+            env=env, capture_output=True, text=True, cwd=BASE_DIR
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f'{rows} 行的会话运行失败：\n{result.stderr[-2000:]}')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def check_budgets(results, budget, budgets):
+    """返回超过预算或出现异常的交互。
+
+    budgets 按交互名称指定预算，也可以按规模单独指定，如 {"risk_type": 0.5, "100000": {"risk_type": 2}}；
+    未指定的冷启动交互用 COLD_BUDGETS，其余用 budget。
+    """
+    over = []
+    for scale, records in results.items():
+        scale_budgets = budgets.get(scale, {})
+        for record in records:
+            name = record['interaction']
+            limit = scale_budgets.get(name, budgets.get(name, COLD_BUDGETS.get(name, budget)))
+            if record['seconds'] > limit or record['exceptions']:
+                over.append({'rows': scale, 'interaction': name, 'seconds': record['seconds'],
+                             'budget': limit, 'exceptions': record['exceptions']})
+    return over
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='模拟看板会话并记录每次交互的重跑耗时。')
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS, help='数据规模，0 表示当前数据文件')
+    parser.add_argument('--budget', type=float, default=2.0, help='每次交互的默认耗时预算（秒）')
+    parser.add_argument('--budgets', help='按交互名称指定预算的 JSON 文件，如 {"risk_type": 0.5}')
+    parser.add_argument('--timeout', type=float, default=600, help='单次重跑的超时（秒）')
+    parser.add_argument('--output', default=os.path.join(BENCHMARK_DIR, 'latency.json'), help='结果保存路径')
+    parser.add_argument('--session', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.session:
+        print(json.dumps(run_session(args.timeout), ensure_ascii=False))
+        return 0
+
+    budgets = {}
+    if args.budgets:
+        with open(args.budgets, encoding='utf-8') as f:
+            budgets = json.load(f)
+
+    results = {}
+    for rows in args.rows:
+        results[str(rows)] = run_scale(rows, args.timeout)
+        print(f"\n== {f'{rows} 行' if rows else '当前数据'}")
+        print(f"{'交互':<36}{'耗时(秒)':>10}{'元素数':>8}")
+        for record in results[str(rows)]:
+            print(f"{record['interaction']:<36}{record['seconds']:>10.3f}{sum(record['elements'].values()):>8}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f'\n结果已保存：{args.output}')
+
+    over = check_budgets(results, args.budget, budgets)
+    for item in over:
+        reason = f"异常：{item['exceptions'][0]}" if item['exceptions'] else f"{item['seconds']:.3f} 秒 > 预算 {item['budget']} 秒"
+        scale = f"{item['rows']} 行" if item['rows'] != '0' else '当前数据'
+        print(f"超出预算：{scale} {item['interaction']} {reason}")
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""内存统计：按对象计算深层内存占用，按会话、按缓存函数汇总。
+
+年度数据与各页面结果只保存在进程级的 compute_cache 中，各会话共用同一份对象，总量由 COMPUTE_CACHE_MB 限制；
+会话自己只持有 session_state 中的少量状态（控件取值、导出文件路径、剖析结果等），按会话统计的就是这部分。
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from plotly.basedatatypes import BaseFigure
+
+def deep_size(obj, seen=None):
+    """对象及其引用对象的内存占用（字节），同一对象只计一次。"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, BaseFigure):
+        # 图表的数据保存在各 trace 与 layout 的属性字典中
+        return sys.getsizeof(obj) + deep_size(obj._data, seen) + deep_size(obj._layout, seen)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(deep_size(item, seen) for item in obj)
+    if hasattr(obj, '__dict__') and not isinstance(obj, type):
+        return sys.getsizeof(obj) + deep_size(vars(obj), seen)
+    return sys.getsizeof(obj)
+
+
+def resident_memory():
+    """进程当前常驻内存（字节）；读取 Linux 的 /proc，其他系统返回 None。"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def session_usage(session_state):
+    """一个会话自己持有的内存：session_state 中各对象的字节数合计。"""
+    return sum(deep_size(session_state[key]) for key in list(session_state))
+
+
+def sessions_usage():
+    """当前进程中所有活动会话的内存，需要在 Streamlit 运行时中调用。"""
+    from streamlit import runtime
+
+    rows = []
+    try:
+        sessions = runtime.get_instance()._session_mgr.list_active_sessions() if runtime.exists() else []
+    except AttributeError:  # AppTest 等测试环境中的运行时没有会话管理器
+        sessions = []
+    for info in sessions:
+        rows.append({'会话': info.session.id[:8], '状态字节': session_usage(info.session.session_state)})
+    return pd.DataFrame(rows, columns=['会话', '状态字节'])
+
+
+def streamlit_cache_usage(include_resource=False):
+    """st.cache_data（按序列化后的大小）与 st.cache_resource 各函数缓存的字节数。
+
+    st.cache_resource 的大小需要遍历整个对象，数据量大时较慢，默认不统计。
+    """
+    from streamlit.runtime.caching import get_data_cache_stats_provider, get_resource_cache_stats_provider
+
+    stats = list(get_data_cache_stats_provider().get_stats())
+    if include_resource:
+        stats += list(get_resource_cache_stats_provider().get_stats())
+    return pd.DataFrame(
+        [{'类型': stat.category_name, '函数': stat.cache_name, '字节': stat.byte_length} for stat in stats],
+        columns=['类型', '函数', '字节']
+    )
@@ -0,0 +1,252 @@
+"""看板进程的监控指标：重跑耗时、数据加载耗时、缓存命中、数据版本、行数、会话数与内存，输出为 Prometheus 文本格式。
+
+指标在进程内累计（Streamlit 重跑时已导入的模块不会重新执行，多个会话共享同一组指标）。
+config.METRICS_PORT 非0时在本机端口提供 /metrics，config.METRICS_FILE 非空时每次重跑后整体替换写入该文件，
+可由 node_exporter 的 textfile collector 读取。
+"""
+import os
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import METRICS_HOST, METRICS_PORT, METRICS_FILE
+from memory import resident_memory
+from shared_data import source_mtime
+from analytics.cache import compute_cache
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，不输出内存峰值
+    resource = None
+
+PREFIX = 'caigou_'
+RERUN_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+LOAD_BUCKETS = (0.5, 1, 2, 5, 10, 30, 60, 120)
+
+_lock = threading.Lock()
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    items = ','.join(
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in labels
+    )
+    return '{' + items + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name, self.help, self.type = PREFIX + name, help_text, 'counter'
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        return [(self.name, key, value) for key, value in self.values.items()]
+
+
+class Gauge(Counter):
+    def __init__(self, name, help_text):
+        super().__init__(name, help_text)
+        self.type = 'gauge'
+
+    def set(self, value, **labels):
+        with _lock:
+            self.values[tuple(sorted(labels.items()))] = value
+
+    def clear(self):
+        with _lock:
+            self.values.clear()
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name, self.help, self.type = PREFIX + name, help_text, 'histogram'
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self.values = {}    # labels -> [各桶计数, 总和, 次数]
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            counts, total, count = self.values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            counts = [c + (value <= bound) for c, bound in zip(counts, self.buckets)]
+            self.values[key] = (counts, total + value, count + 1)
+
+    def samples(self):
+        samples = []
+        for key, (counts, total, count) in self.values.items():
+            # Prometheus 的桶为累计计数：每个桶统计的是 value <= 上界 的次数
+            for bound, value in zip(self.buckets, counts):
+                samples.append((f'{self.name}_bucket', key + (('le', _number(bound)),), value))
+            samples.append((f'{self.name}_sum', key, total))
+            samples.append((f'{self.name}_count', key, count))
+        return samples
+
+
+RERUNS = Counter('reruns_total', '看板脚本重跑次数')
+RERUN_SECONDS = Histogram('rerun_seconds', '单次重跑耗时（秒）', RERUN_BUCKETS)
+SECTION_SECONDS = Counter('section_seconds_total', '各分段累计耗时（秒）')
+DATA_LOADS = Counter('data_loads_total', '完整加载数据的次数')
+DATA_LOAD_SECONDS = Histogram('data_load_seconds', '完整加载数据的耗时（秒）', LOAD_BUCKETS)
+DATA_LOAD_ERRORS = Counter('data_load_errors_total', '加载数据失败的次数')
+CACHE_CALLS = Counter('cache_calls_total', '缓存函数调用次数，result 为 hit 或 miss')
+CACHE_CLEARS = Counter('cache_clears_total', '手动刷新清空缓存的次数')
+DATASET_VERSION = Gauge('dataset_version_info', '当前数据版本，值恒为1')
+DATASET_ROWS = Gauge('dataset_rows', '当前数据各维度的行数')
+LAST_DATA_UPDATE = Gauge('last_data_update_timestamp_seconds', '数据文件、别名文件与增量文件中最新的修改时间（Unix 时间）')
+SESSIONS = Gauge('sessions', '当前活动的会话数')
+MEMORY = Gauge('process_resident_memory_bytes', '进程常驻内存（字节）')
+MEMORY_PEAK = Gauge('process_peak_resident_memory_bytes', '进程常驻内存峰值（字节）')
+API_REQUESTS = Counter('api_requests_total', '本地 JSON 接口的请求次数，status 为 HTTP 状态码')
+COMPUTE_CACHE_BYTES = Gauge('compute_cache_bytes', '计算缓存占用的内存（字节）')
+COMPUTE_CACHE_ENTRIES = Gauge('compute_cache_entries', '计算缓存的条目数')
+COMPUTE_CACHE_EVENTS = Gauge('compute_cache_events', '计算缓存启动以来的累计事件数，event 为 hit、miss、eviction 或 expiration')
+
+METRICS = [
+    RERUNS, RERUN_SECONDS, SECTION_SECONDS, DATA_LOADS, DATA_LOAD_SECONDS, DATA_LOAD_ERRORS,
+    CACHE_CALLS, CACHE_CLEARS, DATASET_VERSION, DATASET_ROWS, LAST_DATA_UPDATE, SESSIONS, MEMORY, MEMORY_PEAK,
+    COMPUTE_CACHE_BYTES, COMPUTE_CACHE_ENTRIES, COMPUTE_CACHE_EVENTS, API_REQUESTS,
+]
+
+
+def observe_load(store, seconds):
+    """完整加载数据成功后调用。"""
+    DATA_LOADS.inc()
+    DATA_LOAD_SECONDS.observe(seconds)
+    observe_data(store)
+
+
+def observe_load_error():
+    DATA_LOAD_ERRORS.inc()
+
+
+def observe_cache_clear():
+    CACHE_CLEARS.inc()
+
+
+def observe_api(endpoint, status):
+    API_REQUESTS.inc(endpoint=endpoint, status=str(status))
+
+
+def observe_data(store):
+    """加载或追加数据后更新数据版本、行数与更新时间。
+
+    更新时间取源文件的修改时间而不是调用时间：load_data 每 60 秒过期重新加载时数据并未变化，
+    不能因此重置，否则数据过期告警永远不会触发。
+    """
+    DATASET_VERSION.clear()
+    DATASET_VERSION.set(1, version=store.version)
+    DATASET_ROWS.set(len(store.supplier_dim), table='supplier')
+    DATASET_ROWS.set(len(store.category_dim), table='category')
+    DATASET_ROWS.set(len(store.factory_dim), table='factory')
+    LAST_DATA_UPDATE.set(source_mtime())
+
+
+def observe_run(run):
+    """记录一次重跑：耗时、各分段耗时与缓存命中，来自 instrumentation 的 RunRecord。"""
+    RERUNS.inc()
+    RERUN_SECONDS.observe(run.seconds)
+    for name, entry in run.sections.items():
+        SECTION_SECONDS.inc(entry['seconds'], section=name)
+    for name, entry in run.cache.items():
+        CACHE_CALLS.inc(entry['calls'] - entry['misses'], function=name, result='hit')
+        CACHE_CALLS.inc(entry['misses'], function=name, result='miss')
+
+
+def _update_process():
+    memory = resident_memory()
+    if memory is not None:
+        MEMORY.set(memory)
+    if resource is not None:
+        # ru_maxrss 在 Linux 下单位为 KB
+        MEMORY_PEAK.set(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+    stats = compute_cache.stats()
+    COMPUTE_CACHE_BYTES.set(stats['bytes'])
+    COMPUTE_CACHE_ENTRIES.set(stats['entries'])
+    for event, key in [('hit', 'hits'), ('miss', 'misses'), ('eviction', 'evictions'), ('expiration', 'expirations')]:
+        COMPUTE_CACHE_EVENTS.set(stats[key], event=event)
+    try:
+        from streamlit import runtime
+        if runtime.exists():
+            SESSIONS.set(runtime.get_instance()._session_mgr.num_active_sessions())
+    except (ImportError, AttributeError):
+        pass
+
+
+def render():
+    """当前全部指标的 Prometheus 文本格式。"""
+    _update_process()
+    lines = []
+    with _lock:
+        for metric in METRICS:
+            samples = metric.samples()
+            if not samples:
+                continue
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, labels, value in samples:
+                lines.append(f'{name}{_label_text(labels)} {_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_file(path=METRICS_FILE):
+    """整体替换写入指标文件，读取方不会读到写了一半的内容。"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+
+
+def start_server(port=METRICS_PORT, host=METRICS_HOST):
+    """在后台线程中提供 /metrics；每个进程只启动一次，端口被占用时返回 None。"""
+    global _server
+    with _lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _Handler)
+            except OSError:
+                return None
+            threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
+    return _server
+
+
+def publish(run=None):
+    """每次重跑结束时调用：记录本次重跑，并按配置启动端口或写入文件。"""
+    if run is not None:
+        observe_run(run)
+    if METRICS_PORT:
+        start_server()
+    if METRICS_FILE:
+        write_file()
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+
+def _pad_groups(codes, n_groups, *columns):
+    # 将按子类别分组的一维数组排布为 (K, M) 的二维矩阵，M 为最大组内供应商数
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    slots = np.arange(len(codes)) - starts[sorted_codes]
+    width = max(int(counts.max()) if len(counts) else 0, 1)
+
+    mask = np.zeros((n_groups, width), dtype=bool)
+    mask[sorted_codes, slots] = True
+    padded = []
+    for column in columns:
+        matrix = np.zeros((n_groups, width))
+        matrix[sorted_codes, slots] = column[order]
+        padded.append(matrix)
+    return order, sorted_codes, slots, mask, padded
+
+
+def _project(budget, lower, upper, mask, totals, mu, iterations=60):
+    # 在 [lower, upper] 与组内合计不变的约束下求 x = clip((b + tau) / (1 + mu))
+    # tau 对每个子类别独立二分，所有子类别一次完成
+    scale = (1 + mu)[:, None]
+    tau_low = -budget.max(axis=1) - 1.0
+    tau_high = (1 + mu) * upper.max(axis=1) + 1.0
+    for _ in range(iterations):
+        tau = (tau_low + tau_high) / 2
+        x = np.clip((budget + tau[:, None]) / scale, lower, upper) * mask
+        too_low = x.sum(axis=1) < totals
+        tau_low = np.where(too_low, tau, tau_low)
+        tau_high = np.where(too_low, tau_high, tau)
+    return np.clip((budget + tau_high[:, None]) / scale, lower, upper) * mask
+
+
+def _hhi(x, totals):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(totals > 0, (x ** 2).sum(axis=1) / totals ** 2 * 10000, 0.0)
+
+
+def optimize_reallocation(supplier_data, budget_col, volume_col, max_share=None, max_hhi=None, capacity_factor=1.5,
+                          group_col='Sub Category', iterations=60):
+    """在各子类别现有供应商之间重新分配预算，使最大份额与HHI不超过目标。
+
+    budget_col 为待分配的对比年度金额列（如 2025合计预算金额），volume_col 为基准年度金额列（如 2024合计入库金额），
+    与所选年度无关。max_share 为单一供应商份额上限（%），max_hhi 为HHI上限（0-10000），可同时给定。
+    每个供应商的预算上限为 max(当前预算, volume_col × capacity_factor)，下限为0。
+    在满足约束的前提下使调整量的平方和最小，所有子类别在同一批矩阵运算中求解。
+
+    返回 (供应商调整明细, 子类别汇总) 两个 DataFrame；子类别汇总中的合计列与 budget_col 同名。
+    """
+    data = supplier_data[['供应商', 'Category', group_col, budget_col, volume_col]].copy()
+    data[[budget_col, volume_col]] = data[[budget_col, volume_col]].fillna(0).clip(lower=0)
+    data = data[data[budget_col] > 0].reset_index(drop=True)
+
+    codes, group_index = pd.MultiIndex.from_frame(data[['Category', group_col]].astype(str)).factorize()
+    n_groups = len(group_index)
+    budget_values = data[budget_col].to_numpy(dtype=float)
+    capacity = np.maximum(budget_values, data[volume_col].to_numpy(dtype=float) * capacity_factor)
+
+    order, rows, slots, mask, (budget, upper) = _pad_groups(codes, n_groups, budget_values, capacity)
+    lower = np.zeros_like(budget)
+    totals = budget.sum(axis=1)
+
+    # 份额上限直接收紧每个供应商的预算上限
+    if max_share is not None:
+        upper = np.minimum(upper, totals[:, None] * max_share / 100)
+    feasible = upper.sum(axis=1) >= totals * (1 - 1e-9)
+
+    mu = np.zeros(n_groups)
+    x = _project(budget, lower, upper, mask, totals, mu, iterations)
+
+    # HHI 随 mu 单调下降：对未达标的子类别在对数尺度上二分 mu
+    if max_hhi is not None:
+        target_hhi = float(max_hhi)
+        needs = _hhi(x, totals) > target_hhi
+        mu_low = np.zeros(n_groups)
+        mu_high = np.where(needs, 1e6, 0.0)
+        for _ in range(iterations):
+            mu = np.where(needs, np.sqrt((mu_low + 1e-6) * (mu_high + 1e-6)), 0.0)
+            x_mu = _project(budget, lower, upper, mask, totals, mu, iterations)
+            over = _hhi(x_mu, totals) > target_hhi
+            mu_low = np.where(needs & over, mu, mu_low)
+            mu_high = np.where(needs & ~over, mu, mu_high)
+        x = _project(budget, lower, upper, mask, totals, mu_high, iterations)
+        feasible &= _hhi(x, totals) <= target_hhi * (1 + 1e-6)
+
+    # 不可行的子类别保持原预算不变
+    x = np.where(feasible[:, None], x, budget)
+
+    proposed = np.empty(len(data))
+    proposed[order] = x[rows, slots]
+    shifts = data[['供应商', 'Category', group_col, budget_col]].copy()
+    shifts['产能上限'] = capacity
+    shifts['建议预算金额'] = proposed
+    shifts['调整金额'] = shifts['建议预算金额'] - shifts[budget_col]
+    group_totals = totals[codes]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shifts['当前份额'] = shifts[budget_col] / group_totals * 100
+        shifts['建议份额'] = shifts['建议预算金额'] / group_totals * 100
+    shifts = shifts[shifts['调整金额'].abs() > 0.5].sort_values(
+        [group_col, '调整金额'], ascending=[True, True]
+    ).reset_index(drop=True)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        current_max = np.where(totals > 0, budget.max(axis=1) / totals * 100, 0.0)
+        proposed_max = np.where(totals > 0, x.max(axis=1) / totals * 100, 0.0)
+    current_hhi = _hhi(budget, totals)
+    proposed_hhi = _hhi(x, totals)
+    moved = np.abs(x - budget).sum(axis=1) / 2
+
+    summary = pd.DataFrame({
+        'Category': group_index.get_level_values(0),
+        group_col: group_index.get_level_values(1),
+        '供应商数量': mask.sum(axis=1),
+        budget_col: totals,
+        '当前最大份额': current_max,
+        '建议最大份额': proposed_max,
+        '当前HHI': current_hhi,
+        '建议HHI': proposed_hhi,
+        '调整金额合计': moved,
+    })
+    summary['状态'] = np.select(
+        [~feasible, moved > 0.5],
+        ['不可行', '已优化'],
+        default='已达标'
+    )
+    summary = summary.sort_values('调整金额合计', ascending=False).reset_index(drop=True)
+    return shifts, summary
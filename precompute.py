@@ -0,0 +1,92 @@
+"""预计算看板各页面的数据表与图表，按数据版本写入产物目录，看板启动后直接读取。
+
+用法：python precompute.py [--all-pairs] [--workers N] [--output DIR] [--force]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly.io as pio
+import streamlit.elements.lib.streamlit_plotly_theme  # noqa: F401
+
+from config import ARTIFACT_DIR
+from analytics import load_dataset, year_data
+from analytics.sections import compute_section, section_tasks
+from artifacts import artifact_path, section_id, encode_section, write_manifest, publish
+
+# 与看板使用同一个 plotly 模板，预计算图表的配色与在线计算一致
+pio.templates.default = 'streamlit'
+
+# 子进程中的 DataStore 与按年度对缓存的 YearData，避免每个任务重复传输和切片
+_store = None
+_year_data = {}
+
+
+def _init_worker(store):
+    global _store
+    _store = store
+    _year_data.clear()
+
+
+def _run_task(task):
+    base_year, compare_year, name, key, directory, prefix = task
+    pair = (base_year, compare_year)
+    if pair not in _year_data:
+        _year_data[pair] = year_data(_store, base_year, compare_year)
+    result = compute_section(_year_data[pair], name, key)
+    return pair, section_id(name, key), encode_section(result, directory, prefix)
+
+
+def precompute(store, pairs, output=ARTIFACT_DIR, workers=None, force=False):
+    """为 store 当前版本的每一对年度计算全部 section，返回 {年度对: 产物目录}。"""
+    tmp_paths, tasks = {}, []
+    for base_year, compare_year in pairs:
+        path = artifact_path(output, store.version, base_year, compare_year)
+        if os.path.exists(path) and not force:
+            continue
+        tmp_path = f'{path}.tmp{os.getpid()}'
+        os.makedirs(tmp_path, exist_ok=True)
+        tmp_paths[(base_year, compare_year)] = tmp_path
+        pair_tasks = section_tasks(year_data(store, base_year, compare_year))
+        tasks += [
+            (base_year, compare_year, name, key, tmp_path, f'{i:03d}')
+            for i, (name, key) in enumerate(pair_tasks)
+        ]
+
+    manifests = {pair: {'version': store.version, 'base_year': pair[0], 'compare_year': pair[1], 'sections': {}}
+                 for pair in tmp_paths}
+    if tasks:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(store,)) as pool:
+            for pair, section, entry in pool.map(_run_task, tasks):
+                manifests[pair]['sections'][section] = entry
+
+    paths = {}
+    for pair in pairs:
+        path = artifact_path(output, store.version, *pair)
+        if pair in tmp_paths:
+            write_manifest(tmp_paths[pair], manifests[pair])
+            publish(tmp_paths[pair], path, force=force)
+        paths[pair] = path
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='预计算看板各页面的数据表与图表，按数据版本写入产物目录。')
+    parser.add_argument('--output', default=ARTIFACT_DIR, help='产物根目录，默认为 config.ARTIFACT_DIR')
+    parser.add_argument('--workers', type=int, default=None, help='进程数，默认为CPU核数')
+    parser.add_argument('--all-pairs', action='store_true', help='计算所有年度对，默认只计算最近两个年度')
+    parser.add_argument('--force', action='store_true', help='覆盖同一版本已有的产物')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    store, _ = load_dataset()
+    pairs = store.year_pairs() if args.all_pairs else [(store.years[-2], store.years[-1])]
+    paths = precompute(store, pairs, args.output, args.workers, args.force)
+    for (base_year, compare_year), path in paths.items():
+        print(f'{base_year} → {compare_year}: {path}')
+    print(f'数据版本 {store.version}，用时 {time.perf_counter() - start:.1f} 秒')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""按需剖析一次脚本重跑：用 cProfile 记录完整调用，保存为 .prof 文件并汇总耗时最多的函数。
+
+环境变量 CAIGOU_PROFILE=1 时剖析每一次重跑；页面地址加上 ?profile=1 时只剖析这一次重跑。
+.prof 文件可用 python -m pstats 或 snakeviz 查看。
+
+Python 3.12 起 cProfile 基于进程级的 sys.monitoring：同一时间只能有一个剖析器，且记录进程内所有线程，
+剖析结果会包含同一时间其他会话的重跑、后台预热和 API 线程的调用；3.11 及以前只记录开始剖析的线程。
+"""
+import cProfile
+import os
+import pstats
+import threading
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+from config import BASE_DIR, PROFILE_DIR, PROFILE_ENABLED, PROFILE_TOP_N
+
+
+def profile_requested(query_params):
+    return PROFILE_ENABLED or query_params.get('profile') == '1'
+
+
+# 正在运行的剖析器：线程 ident -> (开始剖析的线程, 剖析器)
+_active = {}
+_lock = threading.Lock()
+
+
+def stop_abandoned():
+    """停用没有正常结束的剖析器，每次重跑开始时调用。
+
+    重跑以 st.stop()、st.rerun() 或异常结束时不会执行到 stop_profile；此时剖析器所在的线程已经结束，
+    或同一线程已开始下一次重跑。不停用的话 3.12 上剖析器会一直占用进程级的 sys.monitoring，之后都无法再剖析。
+    """
+    current = threading.current_thread()
+    with _lock:
+        for ident, (thread, profiler) in list(_active.items()):
+            if thread is current or not thread.is_alive():
+                profiler.disable()
+                del _active[ident]
+
+
+def start_profile():
+    """开始剖析；已有其他剖析器在运行（如另一个会话正在剖析）时返回 None。"""
+    profiler = cProfile.Profile()
+    with _lock:
+        try:
+            profiler.enable()
+        except ValueError:
+            return None
+        _active[threading.get_ident()] = (threading.current_thread(), profiler)
+    return profiler
+
+
+def _function_label(key):
+    path, line, name = key
+    if path.startswith(BASE_DIR):
+        path = os.path.relpath(path, BASE_DIR)
+    elif path != '~':
+        path = os.path.basename(path)
+    return f'{name}' if path == '~' else f'{path}:{line}({name})'
+
+
+def hotspots(stats, top_n=PROFILE_TOP_N):
+    """按自身耗时排序的前 top_n 个函数。"""
+    rows = [
+        {'函数': _function_label(key), '调用次数': calls, '自身耗时(秒)': self_time, '累计耗时(秒)': total_time}
+        for key, (_, calls, self_time, total_time, _) in stats.stats.items()
+    ]
+    frame = pd.DataFrame(rows, columns=['函数', '调用次数', '自身耗时(秒)', '累计耗时(秒)'])
+    return frame.sort_values('自身耗时(秒)', ascending=False).head(top_n).reset_index(drop=True)
+
+
+def stop_profile(profiler, directory=PROFILE_DIR):
+    """结束剖析，写入带时间戳的 .prof 文件，返回 (文件路径, 总耗时, 热点函数表)。"""
+    profiler.disable()
+    with _lock:
+        _active.pop(threading.get_ident(), None)
+    stats = pstats.Stats(profiler)
+    os.makedirs(directory, exist_ok=True)
+    # 多个会话可能在同一秒内剖析，文件名附加随机后缀
+    path = os.path.join(directory, f"rerun_{datetime.now():%Y%m%d-%H%M%S}_{uuid.uuid4().hex[:6]}.prof")
+    stats.dump_stats(path)
+    return path, stats.total_tt, hotspots(stats)
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+from config import FACTORIES, FACTORY_UNIT_KEYWORDS
+
+DETAIL_COLUMNS = ['检查项', '数据文件', '对象', '字段', '文件值', '重算值', '差异']
+
+
+def factory_unit_key(unit):
+    """将 Business Unit 名称（如“铜盟（含卓能）”）映射为供应商数据中的工厂列名。"""
+    for keyword, key in FACTORY_UNIT_KEYWORDS:
+        if keyword in str(unit):
+            return key
+    return None
+
+
+def _object_names(keys, mask):
+    # 只为存在差异的行拼接对象名称，避免在大数据量下为每一行构造字符串
+    parts = [pd.Series(part).reset_index(drop=True)[mask].astype(str) for part in keys]
+    names = parts[0]
+    for part in parts[1:]:
+        names = names + ' / ' + part
+    return names.to_numpy()
+
+
+def _mismatches(check, source, keys, field, file_values, recomputed, abs_tol, rel_tol):
+    # 对齐后的两列数值逐行比较，缺失值视为差异；只返回超出容差的行
+    # keys 为组成对象名称的若干列
+    file_values = pd.Series(file_values).to_numpy(dtype=float)
+    recomputed = pd.Series(recomputed).to_numpy(dtype=float)
+    diff = file_values - recomputed
+    tolerance = np.maximum(abs_tol, rel_tol * np.abs(recomputed))
+    with np.errstate(invalid='ignore'):
+        bad = (np.abs(diff) > tolerance) | (np.isnan(file_values) != np.isnan(recomputed))
+    detail = pd.DataFrame({
+        '检查项': check,
+        '数据文件': source,
+        '对象': _object_names(keys, bad),
+        '字段': field,
+        '文件值': file_values[bad],
+        '重算值': recomputed[bad],
+        '差异': diff[bad],
+    })
+    summary = {'检查项': check, '数据文件': source, '字段': field, '检查数量': len(bad), '差异数量': int(bad.sum())}
+    return summary, detail
+
+
+def _growth_checks(source, frame, key, base_col, new_col, abs_tol, rel_tol, rate_tol):
+    # 增长金额 = 新年度 - 基准年度；增长率 = 增长金额 / 基准年度 × 100
+    # 基准为0时文件中应为空（#DIV/0!），两个年度均为0时为0
+    results = []
+    growth = frame[new_col] - frame[base_col]
+    results.append(_mismatches(
+        '增长金额重算', source, key, '增长金额', frame['增长金额'], growth, abs_tol, rel_tol
+    ))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = (growth / frame[base_col] * 100).where(frame[base_col] != 0)
+    both_zero = (frame[base_col] == 0) & (growth == 0)
+    rate = rate.mask(both_zero, 0.0)
+    file_rate = frame['增长率'].mask(both_zero & frame['增长率'].isna(), 0.0)
+    results.append(_mismatches(
+        '增长率重算', source, key, '增长率', file_rate, rate, rate_tol, 0.0
+    ))
+    return results
+
+
+def reconcile(factory_data, supplier_data, category_data,
+              abs_tol=1.0, rel_tol=0.001, rate_tol=0.5,
+              base_year=2024, compare_year=2025):
+    """校验三个数据文件之间以及文件内部的合计关系。
+
+    abs_tol / rel_tol 为金额的绝对（元）与相对容差，rate_tol 为增长率容差（百分点；
+    文件中的增长率为取整后的百分数）。返回 (汇总表, 差异明细表)。
+    """
+    results = []
+    base_total, new_total = f'{base_year}合计入库金额', f'{compare_year}合计预算金额'
+
+    # 1. 子类别Spend 与 供应商明细按 (Category, Sub Category) 汇总后的金额
+    supplier_by_subcat = supplier_data.groupby(['Category', 'Sub Category'], observed=True)[
+        [base_total, new_total]
+    ].sum()
+    category_by_subcat = category_data.groupby(['Category', 'Sub category'], observed=True)[
+        [f'{base_year}年Spend', f'{compare_year}年Spend']
+    ].sum()
+    category_by_subcat.index.names = ['Category', 'Sub Category']
+    joined = category_by_subcat.join(supplier_by_subcat, how='outer')
+    subcat_keys = [joined.index.get_level_values(0), joined.index.get_level_values(1)]
+    for file_col, supplier_col in [(f'{base_year}年Spend', base_total), (f'{compare_year}年Spend', new_total)]:
+        results.append(_mismatches(
+            '子类别Spend与供应商明细', '各Subcategory-Spend汇总', subcat_keys, file_col,
+            joined[file_col], joined[supplier_col], abs_tol, rel_tol
+        ))
+
+    # 2. 工厂总览 与 供应商数据分厂列合计
+    factory_cols = {
+        base_year: {f: f'{base_year}{f}入库金额' for f in FACTORIES + ['合计']},
+        compare_year: {f: f'{compare_year}{f}预算金额' for f in FACTORIES + ['合计']},
+    }
+    factory_keys = factory_data['Business Unit'].map(factory_unit_key)
+    for year, file_col in [(base_year, f'{base_year}年入库金额'), (compare_year, f'{compare_year}年预测采购额')]:
+        column_totals = supplier_data[list(factory_cols[year].values())].sum()
+        recomputed = factory_keys.map(lambda key: column_totals.get(factory_cols[year].get(key), np.nan))
+        results.append(_mismatches(
+            '工厂合计与供应商分厂列', '苏州、天津工厂数据总览', [factory_data['Business Unit']], file_col,
+            factory_data[file_col], recomputed, abs_tol, rel_tol
+        ))
+
+    # 3. 各文件内部的 增长金额 / 增长率
+    results += _growth_checks(
+        '供应商2024-2025采购数据汇总', supplier_data,
+        [supplier_data['供应商'], supplier_data['Sub Category']],
+        base_total, new_total, abs_tol, rel_tol, rate_tol
+    )
+    results += _growth_checks(
+        '各Subcategory-Spend汇总', category_data,
+        [category_data['Category'], category_data['Sub category']],
+        f'{base_year}年Spend', f'{compare_year}年Spend', abs_tol, rel_tol, rate_tol
+    )
+    results += _growth_checks(
+        '苏州、天津工厂数据总览', factory_data, [factory_data['Business Unit']],
+        f'{base_year}年入库金额', f'{compare_year}年预测采购额', abs_tol, rel_tol, rate_tol
+    )
+
+    summary = pd.DataFrame([summary for summary, _ in results])
+    details = pd.concat([detail for _, detail in results], ignore_index=True)[DETAIL_COLUMNS]
+    return summary, details
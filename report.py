@@ -0,0 +1,281 @@
+"""导出离线报告：工厂业务概览、品类战略分析、供应商管理矩阵、风险预警以及每个品类的明细，
+渲染为一个不依赖看板会话的 HTML 文件；安装 kaleido 时可同时导出 PDF。
+
+用法：python report.py [--years 2024 2025] [--output DIR] [--workers N] [--pdf]
+"""
+import argparse
+import html
+import importlib.util
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.basedatatypes import BaseFigure
+from plotly.offline import get_plotlyjs
+
+from config import REPORT_DIR
+from analytics import load_dataset, year_data
+from analytics.sections import compute_section
+
+# 报告章节：(标题, section, [(输出名称, 小标题, 数据表列)])
+# 小标题为 None 时沿用图表自身的标题；数据表列为 None 时输出全部列，否则为按 YearColumns 取列的函数
+CHAPTERS = [
+    ('工厂业务概览', 'overview', [
+        ('scale_figure', None, None),
+        ('growth_figure', None, None),
+        ('top10_share', 'Top10供应商采购占比 (%)', None),
+        ('top5_concentration', 'Top5供应商采购占比 (%)', None),
+        ('high_dependency', '采购占比超过10%的供应商数量', None),
+    ]),
+    ('品类战略分析', 'category', [
+        ('matrix_figure', None, None),
+        ('top_growth_figure', None, None),
+        ('top_decline_figure', None, None),
+        ('base_trend_figure', '{base}年品类趋势矩阵', None),
+        ('compare_trend_figure', '{compare}年品类趋势矩阵', None),
+        ('changes', '品类结构变化分析', None),
+    ]),
+    ('供应商管理矩阵', 'supplier', [
+        ('matrix_figure', None, None),
+        ('top_base', '{base}年 Top 10供应商', lambda cols: [
+            '供应商', 'Category', 'Sub Category', cols.base_total, f'{cols.base_year}占比'
+        ]),
+        ('top_compare', '{compare}年 Top 10供应商', lambda cols: [
+            '供应商', 'Category', 'Sub Category', cols.compare_total, f'{cols.compare_year}占比'
+        ]),
+        ('new_top', '新进入Top10的供应商', None),
+        ('exit_top', '退出Top10的供应商', None),
+        ('category_donut', '各品类供应商分布', None),
+        ('category_stats', '品类供应商详细分布', None),
+        ('tier_count_figure', None, None),
+        ('tier_amount_figure', None, None),
+    ]),
+    ('风险预警', 'risk', [
+        ('decline', '大幅下滑品类明细（{base}年基数 > 100万元，增长率 < -30%）', lambda cols: [
+            'Category', 'Sub category', cols.base_spend, '增长率'
+        ]),
+        ('matrix_figure', '风险地图', None),
+    ]),
+]
+
+# 每个品类一章，内容与品类战略分析中的品类明细一致
+CATEGORY_ITEMS = [
+    ('supplier_pie', None, None),
+    ('suppliers', '供应商明细数据', lambda cols: [
+        '供应商', cols.base_total, cols.compare_total, '增长率', '采购占比'
+    ]),
+    ('amount_figure', None, None),
+    ('growth_figure', None, None),
+    ('detail', 'Sub Category数据变化分析', lambda cols: [
+        'Sub category', cols.base_spend, cols.compare_spend, '增长金额', '增长率'
+    ]),
+    ('budget_donut', None, None),
+]
+
+# section 名称 -> 报告中输出的内容；任务只传 section 名称，子进程在此查找
+ITEMS = dict({name: items for _, name, items in CHAPTERS}, category_detail=CATEGORY_ITEMS)
+
+# PDF 中每张数据表最多显示的行数
+PDF_TABLE_ROWS = 40
+
+# 子进程中的 DataStore 与按年度对缓存的 YearData
+_store = None
+_year_data = {}
+
+
+def pdf_available():
+    """导出 PDF 需要 kaleido 将图表渲染为图片。"""
+    return importlib.util.find_spec('kaleido') is not None
+
+
+def _init_worker(store):
+    global _store
+    _store = store
+    _year_data.clear()
+    # 报告脱离看板查看，使用 plotly 默认模板而非 Streamlit 主题
+    pio.templates.default = 'plotly'
+
+
+def _format_cell(value):
+    if isinstance(value, float):
+        return '' if pd.isna(value) else f'{value:,.2f}'
+    if isinstance(value, int):
+        return f'{value:,}'
+    return str(value)
+
+
+def _table_figure(table, caption):
+    """PDF 中的数据表以 plotly 表格绘制，与图表一起由 kaleido 输出为图片。"""
+    shown = table.head(PDF_TABLE_ROWS)
+    if len(table) > PDF_TABLE_ROWS:
+        caption = f'{caption}（共{len(table)}行，仅显示前{PDF_TABLE_ROWS}行）'
+    fig = go.Figure(go.Table(
+        header=dict(values=[str(col) for col in shown.columns], align='left'),
+        cells=dict(values=[[_format_cell(v) for v in shown[col].tolist()] for col in shown.columns], align='left')
+    ))
+    fig.update_layout(title=caption, height=160 + 28 * len(shown), margin=dict(l=20, r=20, t=60, b=20))
+    return fig
+
+
+def _value_figure(rows, title):
+    fig = go.Figure(go.Table(
+        header=dict(values=['指标', '数值'], align='left'),
+        cells=dict(values=[[label for label, _ in rows], [text for _, text in rows]], align='left')
+    ))
+    fig.update_layout(title=title, height=160 + 28 * len(rows), margin=dict(l=20, r=20, t=60, b=20))
+    return fig
+
+
+def _figure_image(fig):
+    return fig.to_image(format='png', width=1200, height=fig.layout.height or 600, scale=2)
+
+
+def _render_chapter(task):
+    """在子进程中计算一个 section 并渲染为 HTML 片段；pdf 为 True 时同时返回各页图片。"""
+    base_year, compare_year, anchor, title, name, key, pdf = task
+    pair = (base_year, compare_year)
+    if pair not in _year_data:
+        _year_data[pair] = year_data(_store, base_year, compare_year)
+    data = _year_data[pair]
+    outputs = compute_section(data, name, key)
+
+    parts = [f'<section id="{anchor}"><h2>{html.escape(title)}</h2>']
+    images, values = [], []
+    for item, caption, columns in ITEMS[name]:
+        if item not in outputs:
+            continue
+        value = outputs[item]
+        if caption:
+            caption = caption.format(base=base_year, compare=compare_year)
+
+        if isinstance(value, BaseFigure):
+            if caption:
+                parts.append(f'<h3>{html.escape(caption)}</h3>')
+            parts.append(pio.to_html(value, full_html=False, include_plotlyjs=False))
+            if pdf:
+                images.append(_figure_image(value))
+        elif isinstance(value, pd.DataFrame):
+            table = value[columns(data.columns)] if columns else value
+            parts.append(f'<h3>{html.escape(caption)}</h3>')
+            parts.append(table.to_html(index=False, border=0, classes='data', na_rep='', float_format=lambda v: f'{v:,.2f}'))
+            if pdf:
+                images.append(_figure_image(_table_figure(table, caption)))
+        else:
+            text = ('、'.join(map(str, value)) or '无') if isinstance(value, list) else _format_cell(value)
+            values.append((caption, text))
+
+    if values:
+        items_html = ''.join(f'<li><b>{html.escape(label)}</b>：{html.escape(text)}</li>' for label, text in values)
+        parts.insert(1, f'<ul class="values">{items_html}</ul>')
+        if pdf:
+            images.insert(0, _figure_image(_value_figure(values, title)))
+    parts.append('</section>')
+    return title, anchor, ''.join(parts), images
+
+
+def _write_html(path, heading, subtitle, chapters):
+    toc = ''.join(f'<li><a href="#{anchor}">{html.escape(title)}</a></li>' for title, anchor, _, _ in chapters)
+    body = ''.join(fragment for _, _, fragment, _ in chapters)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(heading)}</title>
+<script type="text/javascript">{get_plotlyjs()}</script>
+<style>
+body {{ font-family: "Microsoft YaHei", "PingFang SC", sans-serif; margin: 2em auto; max-width: 1200px; color: #262730; }}
+h2 {{ border-bottom: 2px solid #e6e9ef; padding-bottom: .3em; margin-top: 2em; }}
+table.data {{ border-collapse: collapse; font-size: 13px; margin-bottom: 1.5em; }}
+table.data th, table.data td {{ border: 1px solid #e6e9ef; padding: 4px 8px; }}
+table.data td {{ text-align: right; }}
+table.data th {{ background: #f0f2f6; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(heading)}</h1>
+<p>{html.escape(subtitle)}</p>
+<ul>{toc}</ul>
+{body}
+</body>
+</html>
+""")
+
+
+def _write_pdf(path, chapters):
+    """将各页图片依次写入 PDF，每张图表或数据表一页。"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    with PdfPages(path) as pdf:
+        for _, _, _, images in chapters:
+            for image in images:
+                picture = plt.imread(io.BytesIO(image), format='png')
+                height, width = picture.shape[:2]
+                fig = plt.figure(figsize=(11.69, 11.69 * height / width))
+                fig.figimage(picture, resize=True)
+                pdf.savefig(fig, dpi=fig.dpi)
+                plt.close(fig)
+
+
+def export_report(store, base_year, compare_year, output=REPORT_DIR, workers=None, pdf=False):
+    """导出 base_year → compare_year 的离线报告，返回生成的文件路径列表。"""
+    if pdf and not pdf_available():
+        raise RuntimeError('导出 PDF 需要安装 kaleido：pip install kaleido')
+
+    data = year_data(store, base_year, compare_year)
+    tasks = [
+        (base_year, compare_year, f'chapter-{i}', title, name, None, pdf)
+        for i, (title, name, _) in enumerate(CHAPTERS)
+    ]
+    categories = sorted(data.category_data['Category'].dropna().unique())
+    tasks += [
+        (base_year, compare_year, f'category-{i}', f'品类明细：{category}', 'category_detail', category, pdf)
+        for i, category in enumerate(categories)
+    ]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(store,)) as pool:
+        chapters = list(pool.map(_render_chapter, tasks))
+
+    os.makedirs(output, exist_ok=True)
+    name = f'采购分析报告_{base_year}-{compare_year}_{store.version}'
+    heading = f'采购数据分析报告（{base_year}年 → {compare_year}年）'
+    subtitle = f"数据版本 {store.version}，生成于 {datetime.now():%Y-%m-%d %H:%M}"
+    paths = [os.path.join(output, f'{name}.html')]
+    _write_html(paths[0], heading, subtitle, chapters)
+    if pdf:
+        paths.append(os.path.join(output, f'{name}.pdf'))
+        _write_pdf(paths[1], chapters)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='导出各页面图表与数据表的离线 HTML/PDF 报告。')
+    parser.add_argument('--years', type=int, nargs=2, metavar=('BASE', 'COMPARE'), help='基准年度与对比年度，默认为最近两个年度')
+    parser.add_argument('--output', default=REPORT_DIR, help='输出目录，默认为 config.REPORT_DIR')
+    parser.add_argument('--workers', type=int, default=None, help='进程数，默认为CPU核数')
+    parser.add_argument('--pdf', action='store_true', help='同时导出 PDF（需要 kaleido）')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    store, _ = load_dataset()
+    base_year, compare_year = args.years or (store.years[-2], store.years[-1])
+    if base_year not in store.years or compare_year not in store.years:
+        parser.error(f'数据中没有该年度，可选年度：{", ".join(map(str, store.years))}')
+    try:
+        paths = export_report(store, base_year, compare_year, args.output, args.workers, args.pdf)
+    except RuntimeError as e:
+        parser.error(str(e))
+    for path in paths:
+        print(path)
+    print(f'数据版本 {store.version}，用时 {time.perf_counter() - start:.1f} 秒')
+
+
+if __name__ == '__main__':
+    main()
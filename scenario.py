@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+from config import FACTORIES
+
+
+@dataclass
+class ScenarioBase:
+    """情景模拟的基础数据：按 (分组, 工厂) 预先聚合的预算矩阵。
+
+    多个情景只对分组与工厂施加乘数，因此所有指标都可以由分组级聚合量
+    推导，情景数量再多也无需回到供应商明细行。
+    """
+    level: str
+    groups: np.ndarray          # (G,) 分组名称
+    group_category: np.ndarray  # (G,) 分组所属 Category
+    categories: np.ndarray      # (C,) Category 名称
+    group_to_category: np.ndarray  # (G,) 分组 -> Category 编码
+    budget: np.ndarray          # (G, F) 各分组在各工厂的预算合计
+    gram: np.ndarray            # (G, F, F) 组内供应商预算向量的外积之和，用于计算HHI
+    factory_columns: list       # (F,) 各工厂预算列名，用于输出结果
+    total_column: str
+
+
+def build_scenario_base(supplier_data, level='Category', factory_columns=None, total_column=None):
+    """将供应商数据聚合为 ScenarioBase，level 可选 'Category' 或 'Sub Category'。
+
+    factory_columns 为按 FACTORIES 顺序的各工厂金额列，缺省为2025年预算列。
+    """
+    if level not in ('Category', 'Sub Category'):
+        raise ValueError(f"不支持的情景分组维度：{level}")
+
+    factory_cols = list(factory_columns or [f'2025{factory}预算金额' for factory in FACTORIES])
+    total_column = total_column or '2025合计预算金额'
+    amounts = supplier_data[factory_cols].fillna(0).to_numpy(dtype=float)
+
+    # 按 Category + 分组编码，保证 Sub Category 同名不同品类时不会被合并
+    keys = supplier_data[['Category', level]].astype(str)
+    group_codes, group_index = pd.MultiIndex.from_frame(keys).factorize()
+    n_groups = len(group_index)
+
+    budget = np.zeros((n_groups, len(FACTORIES)))
+    np.add.at(budget, group_codes, amounts)
+    gram = np.zeros((n_groups, len(FACTORIES), len(FACTORIES)))
+    np.add.at(gram, group_codes, amounts[:, :, None] * amounts[:, None, :])
+
+    group_category = group_index.get_level_values(0).to_numpy()
+    group_to_category, categories = pd.factorize(group_category)
+
+    return ScenarioBase(
+        level=level,
+        groups=group_index.get_level_values(1).to_numpy(),
+        group_category=group_category,
+        categories=np.asarray(categories),
+        group_to_category=group_to_category,
+        budget=budget,
+        gram=gram,
+        factory_columns=factory_cols,
+        total_column=total_column,
+    )
+
+
+def sample_price_multipliers(n_scenarios, n_groups, annual_vol, drift=0.0,
+                             months=12, correlation=0.5, seed=None):
+    """蒙特卡洛模拟月度价格路径，返回各情景下各分组的全年平均价格乘数 (S, G)。
+
+    价格服从几何布朗运动；各分组的冲击由一个公共因子和分组自身因子组合，
+    correlation 为两两之间的相关系数。预算在全年均匀发生，所以取路径均值。
+    """
+    rng = np.random.default_rng(seed)
+    annual_vol = np.broadcast_to(np.asarray(annual_vol, dtype=float), (n_groups,))
+    drift = np.broadcast_to(np.asarray(drift, dtype=float), (n_groups,))
+    dt = 1.0 / 12
+
+    common = rng.standard_normal((n_scenarios, 1, months))
+    own = rng.standard_normal((n_scenarios, n_groups, months))
+    shocks = np.sqrt(correlation) * common + np.sqrt(1 - correlation) * own
+
+    sigma = annual_vol[None, :, None]
+    steps = (drift[None, :, None] - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * shocks
+    paths = np.exp(np.cumsum(steps, axis=2))
+    return paths.mean(axis=2)
+
+
+def simulate(base, price=None, volume=None, factory=None):
+    """对所有情景一次性重算预算、工厂合计与集中度。
+
+    price / volume 形状为 (S, G) 或 (G,)，factory 形状为 (S, F) 或 (F,)，
+    缺省为 1。返回的数组第一维均为情景。
+    """
+    n_groups, n_factories = base.budget.shape
+    group_mult = np.ones((1, n_groups))
+    for mult in (price, volume):
+        if mult is not None:
+            group_mult = group_mult * np.atleast_2d(mult)
+    factory_mult = np.ones((1, n_factories)) if factory is None else np.atleast_2d(factory)
+
+    # (S, G, F)：每个情景、分组、工厂的乘数
+    mult = group_mult[:, :, None] * factory_mult[:, None, :]
+    cell_totals = mult * base.budget[None, :, :]
+
+    group_totals = cell_totals.sum(axis=2)
+    factory_totals = cell_totals.sum(axis=1)
+    total = factory_totals.sum(axis=1)
+
+    category_totals = np.zeros((group_totals.shape[0], len(base.categories)))
+    np.add.at(category_totals.T, base.group_to_category, group_totals.T)
+
+    # 供应商HHI：组内乘数相同，sum_i (m·b_i)^2 = m^T (Σ b_i b_i^T) m
+    sum_sq = np.einsum('sgf,gfh,sgh->s', mult, base.gram, mult)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hhi = np.where(total > 0, sum_sq / total ** 2 * 10000, np.nan)
+
+    return {
+        'total': total,
+        'factory_totals': factory_totals,
+        'group_totals': group_totals,
+        'category_totals': category_totals,
+        'hhi': hhi,
+    }
+
+
+def run_monte_carlo(base, shocked_groups, annual_vol, drift=0.0, volume=None,
+                    factory=None, n_scenarios=10000, correlation=0.5, seed=None,
+                    chunk_size=5000):
+    """对指定分组做价格蒙特卡洛模拟，分块执行以控制内存。
+
+    shocked_groups 为受价格波动影响的分组名称；未列出的分组价格保持不变。n_scenarios 至少为1。
+    """
+    if n_scenarios < 1:
+        raise ValueError(f"情景数量至少为1：{n_scenarios}")
+    n_groups = len(base.groups)
+    shocked = np.isin(base.groups, list(shocked_groups))
+    rng = np.random.default_rng(seed)
+
+    chunks = []
+    for start in range(0, n_scenarios, chunk_size):
+        size = min(chunk_size, n_scenarios - start)
+        price = np.ones((size, n_groups))
+        if shocked.any():
+            price[:, shocked] = sample_price_multipliers(
+                size, int(shocked.sum()), annual_vol, drift,
+                correlation=correlation, seed=rng.integers(2 ** 32)
+            )
+        chunks.append(simulate(base, price=price, volume=volume, factory=factory))
+
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+
+def results_frame(base, results):
+    """将模拟结果整理为每个情景一行的 DataFrame。"""
+    frame = pd.DataFrame({base.total_column: results['total'], 'HHI': results['hhi']})
+    for i, column in enumerate(base.factory_columns):
+        frame[column] = results['factory_totals'][:, i]
+    for i, category in enumerate(base.categories):
+        frame[category] = results['category_totals'][:, i]
+    return frame
+
+
+def summarize(frame, baseline, percentiles=(5, 50, 95)):
+    """按指标汇总情景分布的分位数及相对基准值的变化。"""
+    quantiles = np.percentile(frame.to_numpy(), percentiles, axis=0).T
+    summary = pd.DataFrame(quantiles, index=frame.columns, columns=[f'P{p}' for p in percentiles])
+    summary.insert(0, '基准值', pd.Series(baseline))
+    summary['均值'] = frame.mean()
+    summary[f'P{percentiles[-1]}变化'] = summary[f'P{percentiles[-1]}'] - summary['基准值']
+    return summary
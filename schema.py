@@ -0,0 +1,316 @@
+import re
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+import pandas as pd
+
+from config import FACTORIES
+
+ERROR_COLUMNS = ['文件', '行号', '列', '值', '错误类型', '级别', '说明']
+FATAL, WARNING = '致命', '警告'
+
+
+@dataclass
+class Column:
+    name: str
+    kind: str = 'text'          # text / amount / percent
+    required: bool = True       # 文件中必须包含该列
+    nullable: bool = True       # 允许空值
+    min_value: float = None     # 取值范围，超出为警告
+    max_value: float = None
+    null_tokens: tuple = ()     # 视为空值的特殊文本，如 Excel 导出的 '#DIV/0!'
+    pattern: str = None         # 按年份展开的列：匹配该正则的每一列都按本规则校验，required 表示至少有一列
+    choices: tuple = None       # 文本列的允许取值
+
+
+@dataclass
+class TableSchema:
+    name: str
+    columns: list
+    unique: list = field(default_factory=list)  # 不允许重复的键列
+
+
+class SchemaValidationError(ValueError):
+    """数据文件不符合声明的结构；errors 为按行号索引的错误表。"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        first = errors.iloc[0]
+        super().__init__(
+            f"{first['文件']} 第{first['行号']}行 {first['列']}：{first['说明']}"
+            f"（共{int((errors['级别'] == FATAL).sum())}个致命错误）"
+        )
+
+
+def _amount(name, **kwargs):
+    return Column(name, kind='amount', **kwargs)
+
+
+def _growth_columns():
+    return [
+        _amount('增长金额'),
+        Column('增长率', kind='percent', min_value=-100, null_tokens=('#DIV/0!',)),
+    ]
+
+
+def _yearly(name, pattern):
+    return _amount(name, min_value=0, pattern=pattern)
+
+
+DATASET_SCHEMAS = {
+    'factory_data': TableSchema(
+        name='苏州、天津工厂数据总览',
+        columns=[
+            Column('Business Unit', nullable=False),
+            _yearly('YYYY年预测采购额', r'^\d{4}年预测采购额$'),
+            _yearly('YYYY年入库金额', r'^\d{4}年入库金额$'),
+        ] + _growth_columns(),
+        unique=['Business Unit'],
+    ),
+    'supplier_data': TableSchema(
+        name='供应商2024-2025采购数据汇总',
+        columns=[
+            Column('序号', kind='amount', required=False),
+            Column('供应商', nullable=False),
+            Column('Category', nullable=False),
+            Column('Sub Category', nullable=False),
+        ] + [
+            _yearly(f'YYYY{factory}入库金额', rf'^\d{{4}}{factory}入库金额$') for factory in FACTORIES + ['合计']
+        ] + [
+            _yearly(f'YYYY{factory}预算金额', rf'^\d{{4}}{factory}预算金额$') for factory in FACTORIES + ['合计']
+        ] + _growth_columns(),
+        unique=['供应商', 'Category', 'Sub Category'],
+    ),
+    'category_data': TableSchema(
+        name='各Subcategory-Spend汇总',
+        columns=[
+            Column('Category', nullable=False),
+            Column('Sub category', nullable=False),
+            _yearly('YYYY年Spend', r'^\d{4}年Spend$'),
+        ] + _growth_columns(),
+        unique=['Category', 'Sub category'],
+    ),
+}
+
+# 月度入库增量文件：每行为某供应商某月在某工厂的新增入库金额
+DELTA_SCHEMA = TableSchema(
+    name='月度入库增量',
+    columns=[
+        Column('供应商', nullable=False),
+        Column('Category', nullable=False),
+        Column('Sub Category', nullable=False),
+        _amount('年份', nullable=False, min_value=2000, max_value=2100),
+        _amount('月份', nullable=False, min_value=1, max_value=12),
+        Column('工厂', nullable=False, choices=tuple(FACTORIES)),
+        _amount('入库金额', nullable=False),
+    ],
+)
+
+
+def _error_rows(schema, rows, column, values, error_type, level, message, limit):
+    # rows 为 DataFrame 位置索引，转换为CSV中的行号（表头为第1行）
+    rows = np.asarray(rows)[:limit]
+    return pd.DataFrame({
+        '文件': schema.name,
+        '行号': rows + 2,
+        '列': column,
+        '值': pd.Series(values).iloc[:limit].astype(str).to_numpy() if len(rows) else [],
+        '错误类型': error_type,
+        '级别': level,
+        '说明': message,
+    })
+
+
+def coerce_numeric(series, null_tokens=()):
+    """去掉千分位与百分号后转换为数值，返回 (数值列, 转换失败的布尔掩码)。
+
+    先整列直接转换，只有直接转换失败的单元格才做字符串清洗，干净的大文件不走字符串路径。
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float), np.zeros(len(series), dtype=bool)
+    values = pd.to_numeric(series, errors='coerce').astype(float)
+    pending = values.isna() & series.notna()
+    if pending.any():
+        text = series[pending].astype(str).str.strip()
+        if null_tokens:
+            text = text[~text.isin(null_tokens)]
+        text = text[text != '']
+        cleaned = pd.to_numeric(text.str.replace(',', '', regex=False).str.rstrip('%'), errors='coerce')
+        values.loc[cleaned.index] = cleaned
+        failed = pd.Series(False, index=series.index)
+        failed.loc[cleaned.index[cleaned.isna()]] = True
+        return values, failed.to_numpy()
+    return values, np.zeros(len(series), dtype=bool)
+
+
+def expand_columns(schema, columns):
+    """将按年份声明的列规则展开为文件中实际存在的列。"""
+    expanded = []
+    for column in schema.columns:
+        if column.pattern is None:
+            expanded.append(column)
+        else:
+            expanded += [replace(column, name=name, pattern=None)
+                         for name in columns if re.match(column.pattern, str(name))]
+    return expanded
+
+
+def check_columns(schema, columns):
+    """只检查列名；读取表头后即可调用，缺列时无需解析整个文件。"""
+    missing = [
+        column.name for column in schema.columns
+        if column.required and (
+            not any(re.match(column.pattern, str(name)) for name in columns)
+            if column.pattern else column.name not in columns
+        )
+    ]
+    if not missing:
+        return pd.DataFrame(columns=ERROR_COLUMNS)
+    return pd.DataFrame({
+        '文件': schema.name,
+        '行号': 1,
+        '列': missing,
+        '值': '',
+        '错误类型': '缺少列',
+        '级别': FATAL,
+        '说明': '文件中缺少必需的列',
+    })[ERROR_COLUMNS]
+
+
+def check_duplicates(frame, schema, row_offset=0, max_errors=1000):
+    """检查键列重复（如同一供应商在同一子类别下出现多行），返回错误表。"""
+    unique = [name for name in schema.unique if name in frame.columns]
+    if not unique:
+        return pd.DataFrame(columns=ERROR_COLUMNS)
+    duplicated = frame.duplicated(unique, keep='first').to_numpy()
+    rows = np.flatnonzero(duplicated)[:max_errors]
+    keys = frame[unique].iloc[rows].astype(str).agg(' / '.join, axis=1)
+    return _error_rows(schema, rows + row_offset, ' + '.join(unique), keys, '重复记录', FATAL,
+                       '与前面的行键值重复', max_errors)
+
+
+def validate_frame(frame, schema, fail_fast=False, max_errors_per_rule=1000,
+                   row_offset=0, check_unique=True):
+    """按声明的结构校验并转换一个数据表。
+
+    逐列一次性完成类型转换、空值、取值范围检查，并检查键列重复。
+    fail_fast=True 时遇到第一个致命错误立即抛出 SchemaValidationError；
+    否则返回 (转换后的数据表, 错误表)，错误表按行号排序。
+    row_offset 为该数据表第一行在文件中的位置，分块读取时用于换算行号。
+    """
+    errors = []
+
+    def collect(error_frame):
+        if len(error_frame):
+            errors.append(error_frame)
+            if fail_fast and (error_frame['级别'] == FATAL).any():
+                raise SchemaValidationError(error_frame[error_frame['级别'] == FATAL].reset_index(drop=True))
+
+    def rule_errors(mask, column, raw, error_type, level, message):
+        rows = np.flatnonzero(mask)
+        return _error_rows(schema, rows + row_offset, column, raw.iloc[rows[:max_errors_per_rule]],
+                           error_type, level, message, max_errors_per_rule)
+
+    collect(check_columns(schema, frame.columns))
+    frame = frame.copy()
+    for column in expand_columns(schema, frame.columns):
+        if column.name not in frame.columns:
+            continue
+        raw = frame[column.name]
+
+        if column.kind == 'text':
+            if not pd.api.types.is_object_dtype(raw):
+                frame[column.name] = raw.astype(object).where(raw.notna(), np.nan)
+            if column.choices is not None:
+                invalid = (raw.notna() & ~raw.isin(column.choices)).to_numpy()
+                if invalid.any():
+                    collect(rule_errors(invalid, column.name, raw, '取值错误', FATAL,
+                                        f"取值应为 {'/'.join(column.choices)} 之一"))
+        else:
+            values, failed = coerce_numeric(raw, column.null_tokens)
+            if failed.any():
+                kind = '百分比' if column.kind == 'percent' else '数值'
+                collect(rule_errors(failed, column.name, raw, '类型错误', FATAL, f'无法转换为{kind}'))
+            frame[column.name] = values
+
+            out_of_range = np.zeros(len(values), dtype=bool)
+            if column.min_value is not None:
+                out_of_range |= (values < column.min_value).to_numpy()
+            if column.max_value is not None:
+                out_of_range |= (values > column.max_value).to_numpy()
+            if out_of_range.any():
+                collect(rule_errors(out_of_range, column.name, raw, '超出范围', WARNING,
+                                    f'取值应在 [{column.min_value}, {column.max_value}] 之间'))
+
+        if not column.nullable:
+            empty = frame[column.name].isna().to_numpy()
+            if column.kind == 'text':
+                empty |= (frame[column.name] == '').to_numpy()
+            if empty.any():
+                collect(rule_errors(empty, column.name, raw, '缺失值', FATAL, '该列不允许为空'))
+
+    if check_unique:
+        collect(check_duplicates(frame, schema, row_offset, max_errors_per_rule))
+
+    if not errors:
+        return frame, pd.DataFrame(columns=ERROR_COLUMNS)
+    error_table = pd.concat(errors, ignore_index=True)
+    return frame, error_table.sort_values('行号', kind='stable').reset_index(drop=True)
+
+
+def read_validated(path, schema, encoding='utf-8', fail_fast=False, chunk_rows=50000):
+    """先只读表头做列检查，再读取全文件并校验，返回 (数据表, 错误表)。
+
+    fail_fast=True 时分块读取和校验，遇到第一个致命错误即停止，不再解析文件剩余部分。
+    path 也可以是已打开的文件对象（如上传的文件）。
+    """
+    header = pd.read_csv(path, encoding=encoding, nrows=0)
+    if hasattr(path, 'seek'):
+        path.seek(0)
+    column_errors = check_columns(schema, header.columns)
+    if len(column_errors):
+        raise SchemaValidationError(column_errors)
+    # 文本列按字符串读取，数值列交给 coerce_numeric 统一转换并记录失败
+    text_columns = {column.name: str for column in expand_columns(schema, header.columns) if column.kind == 'text'}
+    if not fail_fast:
+        frame = pd.read_csv(path, encoding=encoding, dtype=text_columns, low_memory=False)
+        return validate_frame(frame, schema)
+
+    chunks, tables, offset = [], [], 0
+    for chunk in pd.read_csv(path, encoding=encoding, dtype=text_columns, chunksize=chunk_rows):
+        converted, table = validate_frame(chunk, schema, fail_fast=True, row_offset=offset, check_unique=False)
+        chunks.append(converted)
+        tables.append(table)
+        offset += len(chunk)
+    frame = pd.concat(chunks, ignore_index=True) if chunks else header
+    duplicates = check_duplicates(frame, schema)
+    if len(duplicates):
+        raise SchemaValidationError(duplicates)
+    tables = [table for table in tables if len(table)]
+    errors = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=ERROR_COLUMNS)
+    return frame, errors
+
+
+def load_validated(paths, encoding='utf-8', fail_fast=False):
+    """读取并校验 DATA_FILES 中的全部文件。
+
+    存在致命错误时抛出 SchemaValidationError（包含所有文件的错误表）；
+    否则返回 ({名称: 数据表}, 警告表)。
+    """
+    frames, tables = {}, []
+    for key, schema in DATASET_SCHEMAS.items():
+        frames[key], table = read_validated(paths[key], schema, encoding, fail_fast)
+        if len(table):
+            tables.append(table)
+    errors = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=ERROR_COLUMNS)
+    if (errors['级别'] == FATAL).any():
+        raise SchemaValidationError(errors[errors['级别'] == FATAL].reset_index(drop=True))
+    return frames, errors
+
+
+def load_delta(path, encoding='utf-8', fail_fast=False):
+    """读取并校验一个月度入库增量文件，存在致命错误时抛出 SchemaValidationError；返回 (数据表, 警告表)。"""
+    frame, errors = read_validated(path, DELTA_SCHEMA, encoding, fail_fast)
+    if (errors['级别'] == FATAL).any():
+        raise SchemaValidationError(errors[errors['级别'] == FATAL].reset_index(drop=True))
+    return frame, errors
@@ -0,0 +1,266 @@
+"""多进程共享数据集：把整理好的 DataStore 按数据版本发布为 Arrow IPC 文件，各 worker 以内存映射方式读取。
+
+负载均衡后面的每个 Streamlit worker 原本各自解析 CSV、各持有一份完整数据。现在第一个加载的 worker
+把三个数组、事实表、维度表和数据质量报告写入 SHARED_DATA_DIR/<版本>/（默认在 /dev/shm），
+其余 worker 直接映射这些文件：三个数组与不含空值的数值列零拷贝，这部分由 N 个 worker 共用一份物理内存；
+文本列（维度表中的名称、数据质量报告等）和含空值的数值列在每个 worker 中转为各自的 pandas 对象，不共享。
+
+版本目录先写入临时目录再整体改名，随后替换 CURRENT 指针文件，读取方只会看到完整的版本。
+数据重新加载或追加增量后发布新版本，各 worker 在下一次重跑时发现 CURRENT 变化，整体切换到新版本。
+CURRENT 中同时记录数据文件、别名文件与增量文件的指纹，文件变化后旧版本不再被采用，由下一个加载的 worker 重新发布。
+
+进程内的 DataStore 发布后不再修改：切换版本或追加增量都换成新的对象（set_current），
+每次重跑和每个接口请求开始时用 bind_store 取一次，之后只使用这一个对象，不会看到一半新一半旧的数据。
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from config import DATA_FILES, SUPPLIER_ALIAS_FILE, DELTA_DIR, SHARED_DATA_DIR, SHARED_DATA_KEEP
+from datastore import DataStore, delta_files
+
+CURRENT_FILE = 'CURRENT'
+META_FILE = 'meta.json'
+CUBES = ['supplier_cube', 'category_cube', 'factory_cube']
+# 共享数据的结构版本：DataStore 的数组结构或元数据变化（如增加度量轴、base_version）后加一，旧版本发布的数据不再被挂载
+STORE_FORMAT = 3
+DIMS = ['supplier_dim', 'category_dim', 'factory_dim']
+FACT_TABLES = ['supplier', 'category', 'factory']
+QUALITY_TABLES = ['summary', 'details', 'validation']
+
+
+def _source_paths(paths, alias_path, delta_dir):
+    return list(paths.values()) + [alias_path] + delta_files(delta_dir)
+
+
+def source_mtime(paths=DATA_FILES, alias_path=SUPPLIER_ALIAS_FILE, delta_dir=DELTA_DIR):
+    """数据文件、别名文件与已保存增量文件中最新的修改时间（Unix 时间），即数据内容最近一次变化的时间。"""
+    mtimes = [os.path.getmtime(path) for path in _source_paths(paths, alias_path, delta_dir) if os.path.exists(path)]
+    return max(mtimes, default=0.0)
+
+
+def source_fingerprint(paths=DATA_FILES, alias_path=SUPPLIER_ALIAS_FILE, delta_dir=DELTA_DIR):
+    """数据文件、别名文件与已保存增量文件的路径、大小和修改时间的摘要，任一文件变化后随之变化。"""
+    digest = hashlib.sha1(f'format={STORE_FORMAT}\n'.encode('utf-8'))
+    for path in _source_paths(paths, alias_path, delta_dir):
+        try:
+            stat = os.stat(path)
+            digest.update(f'{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}\n'.encode('utf-8'))
+        except OSError:
+            digest.update(f'{os.path.abspath(path)}|missing\n'.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def _write_table(table, path):
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_table(path):
+    # 内存映射读取：数值列的缓冲区直接指向映射的文件，不复制
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+
+def _frame_from_table(table):
+    # 不含空值的数值列零拷贝（只读）；文本列和含空值的数值列在本进程中复制为 pandas 对象（不共享），空值与读取 CSV 时一致为 NaN
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        if pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+            if column.null_count == 0:
+                columns[name] = column.to_numpy()
+                continue
+        values = column.to_pandas()
+        if values.dtype == object:
+            values = values.where(values.notna(), np.nan)
+        columns[name] = values.to_numpy()
+    return pd.DataFrame(columns, columns=table.column_names, copy=False)
+
+
+def _cube_table(cube):
+    return pa.table({'value': np.ascontiguousarray(cube).reshape(-1)}).replace_schema_metadata(
+        {'shape': json.dumps(list(cube.shape))}
+    )
+
+
+def _cube_from_table(table):
+    shape = json.loads(table.schema.metadata[b'shape'])
+    return table.column('value').to_numpy().reshape(shape)
+
+
+def publish_store(store, quality_report, fingerprint, root=SHARED_DATA_DIR, keep=SHARED_DATA_KEEP):
+    """发布 store 的当前版本并更新 CURRENT；未启用或写入失败时返回 None，不影响本进程继续使用 store。"""
+    if not root:
+        return None
+    directory = os.path.join(root, store.version)
+    try:
+        os.makedirs(root, exist_ok=True)
+        if not os.path.isdir(directory):
+            tmp_dir = os.path.join(root, f'.{store.version}.{uuid.uuid4().hex}.tmp')
+            os.makedirs(tmp_dir)
+            try:
+                _write_version(store, quality_report, tmp_dir)
+                os.rename(tmp_dir, directory)
+            except OSError:
+                # 其他 worker 同时发布了同一版本
+                if not os.path.isdir(directory):
+                    raise
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        current = {'version': store.version, 'fingerprint': fingerprint,
+                   'published': datetime.now().isoformat(timespec='seconds')}
+        tmp_path = os.path.join(root, f'.{CURRENT_FILE}.{uuid.uuid4().hex}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(current, f)
+        os.replace(tmp_path, os.path.join(root, CURRENT_FILE))
+    except (OSError, pa.ArrowException):
+        return None
+    _prune(root, keep, store.version)
+    return directory
+
+
+def _write_version(store, quality_report, directory):
+    for name in CUBES:
+        _write_table(_cube_table(getattr(store, name)), os.path.join(directory, f'{name}.arrow'))
+    for name in DIMS:
+        _write_table(pa.Table.from_pandas(getattr(store, name), preserve_index=False),
+                     os.path.join(directory, f'{name}.arrow'))
+    for table in FACT_TABLES:
+        _write_table(pa.Table.from_pandas(store.facts(table), preserve_index=False),
+                     os.path.join(directory, f'facts_{table}.arrow'))
+    for name in QUALITY_TABLES:
+        _write_table(pa.Table.from_pandas(quality_report[name], preserve_index=False),
+                     os.path.join(directory, f'quality_{name}.arrow'))
+    meta = {
+        'version': store.version,
+        'base_version': store.base_version,
+        'years': store.years,
+        'measures': store.measures,
+        'column_names': [[table, year, factory, column] for (table, year, factory), column in store.column_names.items()],
+        # 供应商与子类别的键在追加增量时按需重建，只保存工厂行
+        'factory_rows': {str(code): rows.tolist() for code, rows in store.keys.get('factory', {}).items()},
+    }
+    with open(os.path.join(directory, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+
+def _prune(root, keep, current):
+    # 按修改时间只保留最近 keep 个版本；已映射的文件删除后在各 worker 解除映射前仍然有效
+    try:
+        versions = [
+            name for name in os.listdir(root)
+            if not name.startswith('.') and name != current and os.path.isdir(os.path.join(root, name))
+        ]
+        versions.sort(key=lambda name: os.path.getmtime(os.path.join(root, name)), reverse=True)
+    except OSError:
+        return
+    for name in versions[max(keep - 1, 0):]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def current_version(root=SHARED_DATA_DIR):
+    """CURRENT 指向的 {'version', 'fingerprint', 'published'}；未发布过时返回 None。"""
+    if not root:
+        return None
+    try:
+        with open(os.path.join(root, CURRENT_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def attach_store(version, root=SHARED_DATA_DIR):
+    """映射一个已发布的版本，返回 (DataStore, 数据质量报告)。"""
+    directory = os.path.join(root, version)
+    with open(os.path.join(directory, META_FILE), encoding='utf-8') as f:
+        meta = json.load(f)
+    store = DataStore(
+        years=meta['years'],
+        measures=meta['measures'],
+        column_names={(table, year, factory): column for table, year, factory, column in meta['column_names']},
+        supplier_dim=_frame_from_table(_read_table(os.path.join(directory, 'supplier_dim.arrow'))),
+        category_dim=_frame_from_table(_read_table(os.path.join(directory, 'category_dim.arrow'))),
+        factory_dim=_frame_from_table(_read_table(os.path.join(directory, 'factory_dim.arrow'))),
+        fact_chunks={
+            table: [_frame_from_table(_read_table(os.path.join(directory, f'facts_{table}.arrow')))]
+            for table in FACT_TABLES
+        },
+        supplier_cube=_cube_from_table(_read_table(os.path.join(directory, 'supplier_cube.arrow'))),
+        category_cube=_cube_from_table(_read_table(os.path.join(directory, 'category_cube.arrow'))),
+        factory_cube=_cube_from_table(_read_table(os.path.join(directory, 'factory_cube.arrow'))),
+        version=meta['version'],
+        base_version=meta['base_version'],
+        keys={'factory': {int(code): np.asarray(rows, dtype=np.int64) for code, rows in meta['factory_rows'].items()}},
+    )
+    quality_report = {
+        name: _frame_from_table(_read_table(os.path.join(directory, f'quality_{name}.arrow')))
+        for name in QUALITY_TABLES
+    }
+    return store, quality_report
+
+
+def load_shared(fingerprint, root=SHARED_DATA_DIR):
+    """CURRENT 对应当前数据文件时映射该版本，返回 (DataStore, 数据质量报告)，否则返回 None。"""
+    current = current_version(root)
+    if current is None or current['fingerprint'] != fingerprint:
+        return None
+    try:
+        return attach_store(current['version'], root)
+    except (OSError, ValueError, KeyError, pa.ArrowException):
+        return None
+
+
+# 本进程当前使用的数据：(数据文件指纹, DataStore, 数据质量报告)
+_current = None
+_current_lock = threading.Lock()
+
+
+def set_current(store, quality_report, fingerprint):
+    """将新的 DataStore 设为本进程当前使用的数据，如追加增量得到的新对象；之后不能再修改该对象。"""
+    global _current
+    with _current_lock:
+        _current = (fingerprint, store, quality_report)
+
+
+def clear_current():
+    """刷新数据时调用：下一次 bind_store 改用重新加载的数据。"""
+    global _current
+    with _current_lock:
+        _current = None
+
+
+def clear_shared(root=SHARED_DATA_DIR):
+    """刷新数据时调用：移除 CURRENT 指针，下一次加载重新解析 CSV 并发布；已映射旧版本的 worker 不受影响。"""
+    if not root:
+        return
+    try:
+        os.remove(os.path.join(root, CURRENT_FILE))
+    except FileNotFoundError:
+        pass
+
+
+def bind_store(loaded=None, root=SHARED_DATA_DIR):
+    """每次重跑或接口请求开始时调用一次，返回本次使用的 (DataStore, 数据质量报告)；还没有数据时返回 None。
+
+    loaded 为刚加载的 (store, quality_report, fingerprint)；本进程还没有当前数据，或其指纹已过期而 loaded 对应
+    当前数据文件时改用 loaded。指纹都已过期（其他 worker 追加了增量或重新加载）时映射其发布的新版本。
+    """
+    global _current
+    fingerprint = source_fingerprint()
+    with _current_lock:
+        current = _current
+        if loaded is not None and (current is None or current[0] != fingerprint and loaded[2] == fingerprint):
+            current = _current = (loaded[2], loaded[0], loaded[1])
+    if current is not None and current[0] != fingerprint:
+        shared = load_shared(fingerprint, root)
+        if shared is not None:
+            with _current_lock:
+                current = _current = (fingerprint, shared[0], shared[1])
+    return None if current is None else (current[1], current[2])
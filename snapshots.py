@@ -0,0 +1,168 @@
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from datastore import ACTUAL, FACTORY_CODES, actual_column, supplier_column, supplier_values
+
+MANIFEST_FILE = 'manifest.csv'
+MANIFEST_COLUMNS = ['版本', '保存时间', '行数']
+DIFF_KEYS = ['供应商', 'Sub Category']
+CHANGE_COLUMNS = ['供应商', 'Category', 'Sub Category', '字段', '旧值', '新值', '差异']
+
+
+def supplier_table(store):
+    """DataStore 中全部年度的供应商宽表（不含增长金额/增长率），作为快照内容。"""
+    frame = store.supplier_dim.copy()
+    for year in store.years:
+        for factory in FACTORY_CODES:
+            if ('supplier', year, factory) in store.column_names:
+                frame[supplier_column(store, year, factory)] = supplier_values(store, year, factory)
+        if store.has_actuals(year):
+            for factory in FACTORY_CODES:
+                frame[actual_column('supplier', year, factory)] = supplier_values(store, year, factory, ACTUAL)
+    return frame
+
+
+def list_snapshots(directory):
+    """已保存的快照清单，按保存时间升序；多个进程同时保存同一版本时只保留最早的一条。"""
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=MANIFEST_COLUMNS)
+    manifest = pd.read_csv(path, encoding='utf-8', dtype={'版本': str})
+    return manifest.drop_duplicates('版本').reset_index(drop=True)
+
+
+def _append_manifest(directory, row):
+    # 清单只追加不改写：表头随文件一次性创建（硬链接已存在时失败），每条记录一次 O_APPEND 写入，
+    # 多个 worker 同时保存快照时不会互相覆盖，也不需要文件锁
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(','.join(MANIFEST_COLUMNS) + '\n')
+        try:
+            os.link(tmp_path, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+    line = pd.DataFrame([row], columns=MANIFEST_COLUMNS).to_csv(index=False, header=False, lineterminator='\n')
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+    try:
+        os.write(fd, line.encode('utf-8'))
+    finally:
+        os.close(fd)
+
+
+def save_snapshot(frame, version, directory):
+    """以列式文件保存一次加载的数据；同一版本只写一次，已存在的快照不会被覆盖。"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{version}.parquet')
+    if os.path.exists(path):
+        return path
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    # 文本列按字典编码保存，读取时直接得到 category 列，对比时不必逐行比较字符串
+    text_columns = [column for column in frame.columns if pd.api.types.is_object_dtype(frame[column])]
+    frame.astype({column: 'category' for column in text_columns}).to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    _append_manifest(directory, {'版本': version, '保存时间': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                                 '行数': len(frame)})
+    return path
+
+
+def load_snapshot(directory, version):
+    return pd.read_parquet(os.path.join(directory, f'{version}.parquet'))
+
+
+def _amount_columns(old, new):
+    # 两个版本共有的金额列
+    skip = set(DIFF_KEYS) | {'Category', '序号'}
+    return [column for column in new.columns
+            if column in old.columns and column not in skip
+            and pd.api.types.is_numeric_dtype(new[column]) and pd.api.types.is_numeric_dtype(old[column])]
+
+
+def _key_codes(old, new, columns):
+    # 将两个版本的键列编码到同一组整数编码，再合成一个 int64 键
+    old_key = np.zeros(len(old), dtype=np.int64)
+    new_key = np.zeros(len(new), dtype=np.int64)
+    for column in columns:
+        old_col = old[column].astype('category')
+        new_col = new[column].astype('category')
+        categories = new_col.cat.categories
+        remap = categories.get_indexer(old_col.cat.categories)
+        only_old = remap < 0
+        remap[only_old] = len(categories) + np.arange(only_old.sum())
+        size = len(categories) + int(only_old.sum()) + 1  # 最后一个编码表示空值
+        old_codes = np.append(remap, size - 1)[old_col.cat.codes.to_numpy()]
+        new_codes = np.where(new_col.cat.codes.to_numpy() < 0, size - 1, new_col.cat.codes.to_numpy())
+        old_key = old_key * size + old_codes
+        new_key = new_key * size + new_codes
+    return old_key, new_key
+
+
+def diff_snapshots(old, new, abs_tol=1.0):
+    """按 供应商 + Sub Category 对比两个版本的供应商数据。
+
+    先按 (供应商, Category, Sub Category) 完整键对齐；剩余未对齐的行再按 (供应商, Sub Category)
+    对齐，对上的视为品类变更。全部对齐与比较均为整列运算。返回包含
+    summary / added / removed / moved / changed 的字典，changed 为 (行, 字段) 粒度的金额变化。
+    """
+    full_keys = ['供应商', 'Category', 'Sub Category']
+    old = old.reset_index(drop=True).assign(_old_row=lambda f: np.arange(len(f)))
+    new = new.reset_index(drop=True).assign(_new_row=lambda f: np.arange(len(f)))
+
+    # 完整键在每个版本内唯一（见 schema 的重复检查），可直接用整数键索引对齐
+    old_key, new_key = _key_codes(old, new, full_keys)
+    position = pd.Index(new_key).get_indexer(old_key)
+    found = position >= 0
+    matched = pd.DataFrame({'_old_row': np.flatnonzero(found), '_new_row': position[found]})
+    new_found = np.zeros(len(new), dtype=bool)
+    new_found[position[found]] = True
+    old_rest = old[~found]
+    new_rest = new[~new_found]
+
+    # 品类变更：同一供应商、同一子类别，Category 不同；未对齐的行很少，转为普通文本列再连接
+    text = {column: object for column in DIFF_KEYS + ['Category']}
+    moved = old_rest[DIFF_KEYS + ['Category', '_old_row']].astype(text).merge(
+        new_rest[DIFF_KEYS + ['Category', '_new_row']].astype(text), on=DIFF_KEYS, suffixes=('_旧', '_新')
+    ).drop_duplicates('_old_row').drop_duplicates('_new_row')
+    removed = old_rest[~old_rest['_old_row'].isin(moved['_old_row'])]
+    added = new_rest[~new_rest['_new_row'].isin(moved['_new_row'])]
+
+    # 金额变化：对齐后的行按列整块比较
+    pairs = pd.concat([matched[['_old_row', '_new_row']], moved[['_old_row', '_new_row']]], ignore_index=True)
+    columns = _amount_columns(old, new)
+    old_values = old[columns].to_numpy(dtype=float)[pairs['_old_row'].to_numpy()]
+    new_values = new[columns].to_numpy(dtype=float)[pairs['_new_row'].to_numpy()]
+    with np.errstate(invalid='ignore'):
+        changed_mask = (np.abs(np.nan_to_num(new_values) - np.nan_to_num(old_values)) > abs_tol) | \
+            (np.isnan(old_values) != np.isnan(new_values))
+    rows, cols = np.nonzero(changed_mask)
+    new_rows = pairs['_new_row'].to_numpy()[rows]
+    changed = pd.DataFrame({
+        '供应商': new['供应商'].to_numpy()[new_rows],
+        'Category': new['Category'].to_numpy()[new_rows],
+        'Sub Category': new['Sub Category'].to_numpy()[new_rows],
+        '字段': np.asarray(columns, dtype=object)[cols],
+        '旧值': old_values[rows, cols],
+        '新值': new_values[rows, cols],
+    })
+    changed['差异'] = changed['新值'].fillna(0) - changed['旧值'].fillna(0)
+
+    moved = moved.rename(columns={'Category_旧': '原Category', 'Category_新': '新Category'})
+    summary = pd.DataFrame({
+        '变更类型': ['新增供应商行', '删除供应商行', '品类变更', '金额变化'],
+        '数量': [len(added), len(removed), len(moved), len(changed)],
+    })
+    return {
+        'summary': summary,
+        'added': added.drop(columns=['_new_row']).reset_index(drop=True),
+        'removed': removed.drop(columns=['_old_row']).reset_index(drop=True),
+        'moved': moved[DIFF_KEYS + ['原Category', '新Category']].reset_index(drop=True),
+        'changed': changed[CHANGE_COLUMNS],
+    }
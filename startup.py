@@ -0,0 +1,123 @@
+"""冷启动耗时报告：在全新的子进程中运行 app.py 的第一次重跑，对比不同预热方式下首屏与整页的耗时。
+
+用法：python startup.py [--runs 3] [--modes eager background off] [--output FILE]
+
+每次运行都启动新的 Python 进程，先导入 Streamlit（相当于 worker 启动，单独计时），再用 AppTest 运行第一次重跑，记录：
+- 首屏：从开始运行脚本到第一个元素发出（侧边栏标题）的耗时
+- 整页：第一次重跑的总耗时
+- 第二次重跑：模块已导入、缓存已就绪后的耗时
+eager 即改动前的行为（首屏之前导入全部页面模块），background 为默认的延迟导入加后台预热。
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from config import BASE_DIR, BENCHMARK_DIR
+
+APP_FILE = os.path.join(BASE_DIR, 'app.py')
+MODES = ['eager', 'background', 'off']
+METRICS = [('first_element', '首屏(秒)'), ('first_run', '整页(秒)'), ('second_run', '第二次重跑(秒)')]
+
+
+def probe(timeout=600):
+    """在当前（全新）进程中运行两次重跑，返回各阶段耗时。"""
+    start = time.perf_counter()
+    from streamlit.runtime.scriptrunner.script_run_context import ScriptRunContext
+    from streamlit.testing.v1 import AppTest
+    streamlit_import = time.perf_counter() - start
+
+    first_element = []
+    enqueue = ScriptRunContext.enqueue
+
+    def timed_enqueue(ctx, msg):
+        if not first_element and msg.WhichOneof('type') == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+            first_element.append(time.perf_counter())
+        enqueue(ctx, msg)
+
+    ScriptRunContext.enqueue = timed_enqueue
+    at = AppTest.from_file(APP_FILE, default_timeout=timeout)
+    run_start = time.perf_counter()
+    at.run()
+    first_run = time.perf_counter() - run_start
+    exceptions = [e.value for e in at.exception]
+
+    for selectbox in at.selectbox:
+        if selectbox.label == "对比年度":
+            selectbox.set_value(selectbox.options[-1])
+    second_start = time.perf_counter()
+    at.run()
+    return {
+        'streamlit_import': streamlit_import,
+        'first_element': first_element[0] - run_start if first_element else None,
+        'first_run': first_run,
+        'second_run': time.perf_counter() - second_start,
+        'exceptions': exceptions + [e.value for e in at.exception],
+    }
+
+
+def run_probe(mode, timeout=600):
+    env = dict(os.environ, CAIGOU_WARM_UP=mode)
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--probe', '--timeout', str(timeout)],
+        env=env, capture_output=True, text=True, cwd=BASE_DIR
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'{mode} 模式运行失败：\n{result.stderr[-2000:]}')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(results):
+    """各模式各阶段的中位数。"""
+    summary = {}
+    for mode, records in results.items():
+        summary[mode] = {
+            key: statistics.median(record[key] for record in records if record[key] is not None)
+            for key in ['streamlit_import'] + [key for key, _ in METRICS]
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='对比不同预热方式下看板冷启动的首屏与整页耗时。')
+    parser.add_argument('--runs', type=int, default=3, help='每种模式运行的次数（取中位数）')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES, help='预热方式')
+    parser.add_argument('--timeout', type=float, default=600, help='单次重跑的超时（秒）')
+    parser.add_argument('--output', default=os.path.join(BENCHMARK_DIR, 'startup.json'), help='结果保存路径')
+    parser.add_argument('--probe', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        print(json.dumps(probe(args.timeout), ensure_ascii=False))
+        return 0
+
+    # 轮流运行各模式，避免磁盘缓存等因素只偏向某一种
+    results = {mode: [] for mode in args.modes}
+    for _ in range(args.runs):
+        for mode in args.modes:
+            results[mode].append(run_probe(mode, args.timeout))
+    summary = summarize(results)
+
+    print(f"{'模式':<14}{'Streamlit导入(秒)':>18}" + ''.join(f'{label:>16}' for _, label in METRICS))
+    for mode, values in summary.items():
+        print(f"{mode:<14}{values['streamlit_import']:>18.3f}" + ''.join(f'{values[key]:>16.3f}' for key, _ in METRICS))
+    if 'eager' in summary and 'background' in summary:
+        saved = summary['eager']['first_element'] - summary['background']['first_element']
+        print(f"\n延迟导入后首屏提前 {saved:.3f} 秒（中位数，{args.runs} 次）")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'runs': results, 'summary': summary}, f, ensure_ascii=False, indent=2)
+    print(f'结果已保存：{args.output}')
+
+    failed = [(mode, record['exceptions']) for mode, records in results.items() for record in records if record['exceptions']]
+    for mode, exceptions in failed:
+        print(f"{mode} 模式出现异常：{exceptions[0]}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
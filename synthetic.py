@@ -0,0 +1,175 @@
+"""生成与 DATA_FILES 结构一致的合成采购数据，用于在十万到千万行规模下测试加载与各页面的计算。
+
+用法：python synthetic.py --rows 1000000 --output cache/synthetic/1m [--seed 0]
+
+同一组参数与 seed 生成的文件完全相同；三个文件之间的合计关系与原始数据一致，可以通过对账检查。
+"""
+import argparse
+import os
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from config import DATA_FILES, FACTORIES
+
+
+@dataclass
+class SyntheticConfig:
+    rows: int = 100000                  # 供应商文件行数（供应商 × 子类别）
+    categories: int = 6
+    subcategories_per_category: int = 17
+    factories: list = field(default_factory=lambda: list(FACTORIES))  # 看板按 config.FACTORIES 读取分厂列
+    years: tuple = (2024, 2025)         # 最后一个年度为预算年度，其余为入库年度
+    total_spend: float = 8e8            # 第一个年度的采购总额
+    spend_skew: float = 1.1             # 供应商采购额的 Zipf 指数，越大越集中
+    subcategory_skew: float = 0.8       # 子类别规模的 Zipf 指数
+    factory_presence: float = 0.4       # 供应商在每个工厂有采购的概率（至少一个工厂）
+    growth_mean: float = 0.05           # 年度增长率的对数均值与标准差
+    growth_sd: float = 0.35
+    new_share: float = 0.05             # 第一个年度为0的新增供应商比例
+    stopped_share: float = 0.05         # 最后一个年度为0的停止供应商比例
+    seed: int = 0
+
+
+def _zipf_weights(rng, n, skew):
+    # 按随机排名分配幂律权重，再乘以对数正态噪声，避免同一排名的金额完全相同
+    ranks = rng.permutation(n) + 1.0
+    weights = ranks ** -skew * rng.lognormal(0.0, 0.3, n)
+    return weights / weights.sum()
+
+
+def _amount_column(year, factory, is_budget):
+    return f"{year}{factory}{'预算' if is_budget else '入库'}金额"
+
+
+def _growth(base, new):
+    # 增长率为空表示基准为0（原始文件中的 #DIV/0!），两个年度均为0时为0
+    growth = np.round(new - base, 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.where(base != 0, np.round(growth / base * 100, 1), np.nan)
+    rate[(base == 0) & (growth == 0)] = 0.0
+    return growth, rate
+
+
+def generate_frames(config):
+    """按配置生成 (factory_data, supplier_data, category_data) 三个宽表。"""
+    rng = np.random.default_rng(config.seed)
+    n, years = config.rows, list(config.years)
+    n_subcategories = config.categories * config.subcategories_per_category
+
+    # 子类别按 Zipf 权重抽样，每个子类别属于一个品类
+    subcategory = rng.choice(n_subcategories, size=n, p=_zipf_weights(rng, n_subcategories, config.subcategory_skew))
+    category_names = [f'Category {i + 1:02d}' for i in range(config.categories)]
+    subcategory_names = [f'子类别{i + 1:04d}' for i in range(n_subcategories)]
+
+    # 第一个年度的金额按 Zipf 分布，之后每年乘以对数正态增长
+    totals = np.empty((n, len(years)))
+    totals[:, 0] = _zipf_weights(rng, n, config.spend_skew) * config.total_spend
+    for pos in range(1, len(years)):
+        totals[:, pos] = totals[:, pos - 1] * rng.lognormal(config.growth_mean, config.growth_sd, n)
+    status = rng.random(n)
+    totals[status < config.new_share, 0] = 0.0
+    totals[status > 1 - config.stopped_share, -1] = 0.0
+
+    # 各工厂份额：按概率决定供应商在哪些工厂有采购，份额为归一化的 Gamma 随机数
+    shares = rng.gamma(1.0, size=(n, len(config.factories)))
+    present = rng.random(shares.shape) < config.factory_presence
+    present[np.arange(n), shares.argmax(axis=1)] = True
+    shares = np.where(present, shares, 0.0)
+    shares /= shares.sum(axis=1, keepdims=True)
+
+    # 按第一个年度金额降序排列；文本列用 pyarrow 与分类编码构造，千万行时避免逐行拼接字符串
+    order = np.argsort(-totals[:, 0], kind='stable')
+    names = pc.binary_join_element_wise(
+        '合成供应商', pc.utf8_lpad(pa.array(order).cast(pa.string()), 8, '0'), '有限公司', ''
+    )
+    supplier = pd.DataFrame({
+        '序号': np.arange(1, n + 1),
+        '供应商': pd.arrays.ArrowStringArray(names),
+        'Category': pd.Categorical.from_codes(subcategory[order] % config.categories, category_names),
+        'Sub Category': pd.Categorical.from_codes(subcategory[order], subcategory_names),
+    })
+    for pos, year in enumerate(years):
+        is_budget = pos == len(years) - 1
+        amounts = np.round(shares[order] * totals[order, pos][:, None], 2)
+        for i, factory in enumerate(config.factories):
+            supplier[_amount_column(year, factory, is_budget)] = amounts[:, i]
+        supplier[_amount_column(year, '合计', is_budget)] = amounts.sum(axis=1)
+    base_total = supplier[_amount_column(years[-2], '合计', False)].to_numpy()
+    new_total = supplier[_amount_column(years[-1], '合计', True)].to_numpy()
+    supplier['增长金额'], supplier['增长率'] = _growth(base_total, new_total)
+
+    # 子类别 Spend 与工厂总览均由供应商明细汇总，与对账规则一致
+    category = supplier.groupby(['Category', 'Sub Category'], observed=True, sort=True)[
+        [_amount_column(year, '合计', pos == len(years) - 1) for pos, year in enumerate(years)]
+    ].sum().reset_index()
+    category.columns = ['Category', 'Sub category'] + [f'{year}年Spend' for year in years]
+    category['增长金额'], category['增长率'] = _growth(
+        category[f'{years[-2]}年Spend'].to_numpy(), category[f'{years[-1]}年Spend'].to_numpy()
+    )
+
+    units = [f'{factory}工厂' for factory in config.factories] + ['合计']
+    factory = pd.DataFrame({'Business Unit': units})
+    for pos, year in reversed(list(enumerate(years))):
+        is_budget = pos == len(years) - 1
+        factory[f"{year}年{'预测采购额' if is_budget else '入库金额'}"] = [
+            supplier[_amount_column(year, name, is_budget)].sum() for name in config.factories + ['合计']
+        ]
+    factory['增长金额'], factory['增长率'] = _growth(
+        factory[f'{years[-2]}年入库金额'].to_numpy(), factory[f'{years[-1]}年预测采购额'].to_numpy()
+    )
+    return factory, supplier, category
+
+
+def write_dataset(frames, output):
+    """以与 DATA_FILES 相同的文件名写入 output 目录，返回可传给 load_dataset 的路径字典。"""
+    os.makedirs(output, exist_ok=True)
+    paths = {}
+    for key, frame in zip(('factory_data', 'supplier_data', 'category_data'), frames):
+        paths[key] = os.path.join(output, os.path.basename(DATA_FILES[key]))
+        # pyarrow 多线程写CSV，千万行时明显快于 DataFrame.to_csv
+        pa_csv.write_csv(pa.Table.from_pandas(frame, preserve_index=False), paths[key])
+    return paths
+
+
+def generate(config, output):
+    return write_dataset(generate_frames(config), output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='生成与看板数据文件结构一致的合成采购数据。')
+    parser.add_argument('--output', required=True, help='输出目录')
+    parser.add_argument('--rows', type=int, default=SyntheticConfig.rows, help='供应商文件行数')
+    parser.add_argument('--categories', type=int, default=SyntheticConfig.categories)
+    parser.add_argument('--subcategories', type=int, default=SyntheticConfig.subcategories_per_category,
+                        help='每个品类的子类别数')
+    parser.add_argument('--factories', nargs='+', default=list(FACTORIES),
+                        help='工厂名称；看板只读取 config.FACTORIES 中的工厂')
+    parser.add_argument('--years', type=int, nargs='+', default=list(SyntheticConfig.years),
+                        help='年度列表，最后一个为预算年度')
+    parser.add_argument('--spend-skew', type=float, default=SyntheticConfig.spend_skew, help='供应商金额的 Zipf 指数')
+    parser.add_argument('--new-share', type=float, default=SyntheticConfig.new_share, help='新增供应商比例')
+    parser.add_argument('--stopped-share', type=float, default=SyntheticConfig.stopped_share, help='停止供应商比例')
+    parser.add_argument('--seed', type=int, default=SyntheticConfig.seed)
+    args = parser.parse_args(argv)
+    if len(args.years) < 2:
+        parser.error('至少需要两个年度')
+
+    start = time.perf_counter()
+    config = SyntheticConfig(
+        rows=args.rows, categories=args.categories, subcategories_per_category=args.subcategories,
+        factories=args.factories, years=tuple(sorted(args.years)), spend_skew=args.spend_skew,
+        new_share=args.new_share, stopped_share=args.stopped_share, seed=args.seed
+    )
+    for path in generate(config, args.output).values():
+        print(path)
+    print(f'{args.rows} 行，用时 {time.perf_counter() - start:.1f} 秒')
+
+
+if __name__ == '__main__':
+    main()
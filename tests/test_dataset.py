@@ -0,0 +1,42 @@
+import unittest
+
+from analytics.dataset import filter_year_data, year_data
+from analytics.factory import factory_scale_lines
+from datastore import FACTORY_CODES, apply_delta
+from tests.test_datastore import delta, small_store
+
+
+class FilterYearDataTest(unittest.TestCase):
+    def test_factory_drops_suppliers_without_spend_there(self):
+        store = small_store()
+        data = year_data(store, 2024, 2025)
+        self.assertEqual(len(filter_year_data(data, factory='汇风').supplier_data), 2)
+        # 两个供应商在铜盟两个年度都为0
+        self.assertTrue(filter_year_data(data, factory='铜盟').supplier_data.empty)
+        self.assertEqual(len(filter_year_data(data).supplier_data), 2)
+
+    def test_factory_keeps_suppliers_with_spend_in_one_year(self):
+        store = small_store()
+        # 乙公司在汇风 2025 年为0，2024 年仍有金额
+        store.supplier_cube[1, FACTORY_CODES.index('汇风'), store.year_index(2025), :] = 0.0
+        filtered = filter_year_data(year_data(store, 2024, 2025), factory='汇风').supplier_data
+        self.assertEqual(filtered['供应商'].tolist(), ['甲公司', '乙公司'])
+        self.assertEqual(filtered['增长金额'].tolist(), [5.0, -20.0])
+
+
+class FactoryScaleLinesTest(unittest.TestCase):
+    def test_lines_follow_selected_years(self):
+        store = small_store()
+        apply_delta(store, delta(2026, 60.0))
+        lines, regions = factory_scale_lines(year_data(store, 2025, 2026))
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].startswith('汇风2025预算'))
+        self.assertIn('2026实际', lines[0])
+        self.assertTrue(lines[0].endswith('增长50%'))
+        self.assertEqual(regions[0]['地区'], '天津')
+        self.assertEqual((regions[0]['基准'], regions[0]['对比']), (40.0, 60.0))
+        self.assertEqual(regions[1]['变化'], '无基准年度数据')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from datastore import (
+    ACTUAL, BUDGET, FACTORY_CODES, apply_delta, build_store, copy_store, delta_files, delta_version, plan_delta, save_delta,
+    supplier_values, supplier_view
+)
+
+
+def small_store():
+    # 两个供应商、一个子类别；2024 为入库，2025 为预算
+    supplier_data = pd.DataFrame({'供应商': ['甲公司', '乙公司'], 'Category': ['C1', 'C1'], 'Sub Category': ['S1', 'S1']})
+    for factory in FACTORY_CODES:
+        supplier_data[f'2024{factory}入库金额'] = [10.0, 20.0] if factory in ('汇风', '合计') else [0.0, 0.0]
+    for factory in FACTORY_CODES:
+        supplier_data[f'2025{factory}预算金额'] = [15.0, 25.0] if factory in ('汇风', '合计') else [0.0, 0.0]
+    category_data = pd.DataFrame({'Category': ['C1'], 'Sub category': ['S1'], '2024年Spend': [30.0], '2025年Spend': [40.0]})
+    factory_data = pd.DataFrame({'Business Unit': ['汇风', '合计'], '2024年入库金额': [30.0, 30.0],
+                                 '2025年预测采购额': [40.0, 40.0]})
+    return build_store(factory_data, supplier_data, category_data)
+
+
+def delta(year, amount, supplier='甲公司'):
+    return pd.DataFrame({'供应商': [supplier], 'Category': ['C1'], 'Sub Category': ['S1'], '年份': [year],
+                         '月份': [1], '工厂': ['汇风'], '入库金额': [amount]})
+
+
+class ApplyDeltaTest(unittest.TestCase):
+    def test_budget_year_takes_actuals_next_to_budget(self):
+        store = small_store()
+        apply_delta(store, delta(2025, 5.0))
+        self.assertEqual(store.year_kind(2025), BUDGET)
+        np.testing.assert_array_equal(supplier_values(store, 2025), [15.0, 25.0])
+        self.assertEqual(supplier_values(store, 2025, kind=ACTUAL)[0], 5.0)
+        self.assertTrue(np.isnan(supplier_values(store, 2025, kind=ACTUAL)[1]))
+        view = supplier_view(store, 2024, 2025)
+        self.assertEqual(view['2025合计预算金额'].tolist(), [15.0, 25.0])
+        self.assertEqual(view['2025合计入库金额'].iloc[0], 5.0)
+        self.assertEqual(store.category_cube[0, store.year_index(2025)].tolist(), [5.0, 40.0])
+
+    def test_new_year_leaves_other_entities_without_records(self):
+        store = small_store()
+        apply_delta(store, delta(2026, 7.0))
+        self.assertEqual(store.year_kind(2026), ACTUAL)
+        values = supplier_values(store, 2026)
+        self.assertEqual(values[0], 7.0)
+        self.assertTrue(np.isnan(values[1]))
+        self.assertTrue(np.isnan(store.supplier_cube[:, :, store.year_index(2026), BUDGET]).all())
+
+    def test_copy_leaves_published_store_unchanged(self):
+        store = small_store()
+        before = store.supplier_cube.copy()
+        updated = copy_store(store)
+        apply_delta(updated, delta(2026, 7.0, supplier='丙公司'))
+        np.testing.assert_array_equal(store.supplier_cube, before)
+        self.assertEqual(store.years, [2024, 2025])
+        self.assertEqual(len(store.supplier_dim), 2)
+        self.assertEqual(len(store.fact_chunks['supplier']), 1)
+        self.assertNotEqual(updated.version, store.version)
+        self.assertEqual(len(updated.supplier_dim), 3)
+
+
+class PlanDeltaTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+        self.store = small_store()
+
+    def append(self, frame, replace=False):
+        changes, months, duplicates = plan_delta(frame, self.directory, replace=replace)
+        apply_delta(self.store, changes)
+        save_delta(months, self.directory)
+        return duplicates
+
+    def actual(self):
+        return supplier_values(self.store, 2025, kind=ACTUAL)[0]
+
+    def test_same_month_is_not_counted_twice(self):
+        self.append(delta(2025, 5.0))
+        with self.assertRaises(ValueError):
+            self.append(delta(2025, 5.0))
+        self.assertEqual(self.actual(), 5.0)
+        self.assertEqual([os.path.basename(path) for path in delta_files(self.directory)], ['入库增量_2025-01.csv'])
+
+    def test_changed_month_needs_replace(self):
+        self.append(delta(2025, 5.0))
+        with self.assertRaises(ValueError):
+            self.append(delta(2025, 8.0))
+        self.append(delta(2025, 8.0), replace=True)
+        self.assertEqual(self.actual(), 8.0)
+
+    def test_version_depends_only_on_saved_months(self):
+        # 先追加2月、再追加并替换1月，与另一处直接按1月、2月顺序追加的结果版本相同
+        self.append(delta(2025, 2.0).assign(月份=2))
+        self.append(delta(2025, 5.0))
+        self.append(delta(2025, 8.0), replace=True)
+        with tempfile.TemporaryDirectory() as other:
+            for frame in (delta(2025, 8.0), delta(2025, 2.0).assign(月份=2)):
+                save_delta(plan_delta(frame, other)[1], other)
+            self.assertEqual(delta_version(self.store.base_version, self.directory),
+                             delta_version(self.store.base_version, other))
+        self.assertNotEqual(delta_version(self.store.base_version, self.directory), self.store.base_version)
+
+    def test_duplicate_months_are_skipped(self):
+        self.append(delta(2025, 5.0))
+        february = delta(2025, 2.0).assign(月份=2)
+        duplicates = self.append(pd.concat([delta(2025, 5.0), february], ignore_index=True))
+        self.assertEqual(duplicates, [(2025, 1)])
+        self.assertEqual(self.actual(), 7.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
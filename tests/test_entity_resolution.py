@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from entity_resolution import build_supplier_index, resolve_suppliers
+
+
+def supplier_ids(names, **kwargs):
+    mapping = resolve_suppliers(names, **kwargs)
+    return mapping.set_index('供应商')['供应商ID'].reindex(names).tolist()
+
+
+class ResolveSuppliersTest(unittest.TestCase):
+    def test_name_variants_merge(self):
+        ids = supplier_ids([
+            '克鲁勃润滑剂(上海)有限公司', '克鲁勃润滑剂（上海）有限公司',
+            '江苏万源新材料股份有限公司', '江苏万源新材料有限公司',
+            'Danotherm Electric A/S', 'Danotherm Electrics A/S',
+        ])
+        self.assertEqual(ids[0], ids[1])
+        self.assertEqual(ids[2], ids[3])
+        self.assertEqual(ids[4], ids[5])
+        self.assertEqual(len(set(ids)), 3)
+
+    def test_distinct_entities_stay_apart(self):
+        # 只差一个字或编号不同的是不同供应商，也不能经由相似名称串联合并
+        names = ['上海一二三四五六七八九十甲有限公司', '上海一二三四五六七八九十乙有限公司',
+                 '无锡市宏达精密机械制造厂', '无锡市宏远精密机械制造厂']
+        self.assertEqual(len(set(supplier_ids(names))), len(names))
+        synthetic = [f'合成供应商{i:08d}有限公司' for i in range(1000)]
+        self.assertEqual(resolve_suppliers(synthetic)['供应商ID'].nunique(), 1000)
+
+    def test_result_does_not_depend_on_dataset_size(self):
+        pair = ['苏州宏达精密机械制造有限公司', '苏州宏达精密机械制造厂有限公司']
+        others = [f'合成供应商{i:08d}有限公司' for i in range(3000)]
+        small, large = supplier_ids(pair), supplier_ids(pair + others)[:2]
+        self.assertEqual(small[0], small[1])
+        self.assertEqual(large[0], large[1])
+
+
+class BuildSupplierIndexTest(unittest.TestCase):
+    def test_alias_changes_are_applied(self):
+        with tempfile.TemporaryDirectory() as directory:
+            map_path = os.path.join(directory, 'map.csv')
+            alias_path = os.path.join(directory, 'aliases.csv')
+            names = ['ECS Cleaning Solutions GmbH', '艾西斯清洁方案(上海)有限公司']
+
+            def ids():
+                mapping = build_supplier_index(names, map_path, alias_path)
+                return mapping.set_index('供应商')['供应商ID'].reindex(names).tolist()
+
+            before = ids()
+            self.assertNotEqual(before[0], before[1])
+            pd.DataFrame({'别名': [names[0]], '标准名称': [names[1]]}).to_csv(alias_path, index=False)
+            merged = ids()
+            self.assertEqual(merged[0], merged[1])
+            self.assertIn(merged[0], before)
+            os.remove(alias_path)
+            split = ids()
+            self.assertNotEqual(split[0], split[1])
+
+    def test_delta_names_keep_existing_canonical_names(self):
+        with tempfile.TemporaryDirectory() as directory:
+            map_path = os.path.join(directory, 'map.csv')
+            names = ['江苏万源新材料股份有限公司'] * 3 + ['江苏万源新材料有限公司']
+            build_supplier_index(names, map_path)
+            # 增量中只出现另一种写法和一个新供应商
+            mapping = build_supplier_index(['江苏万源新材料有限公司', '天津新供应商有限公司'], map_path,
+                                           keep_canonical=True).set_index('供应商')
+            self.assertEqual(mapping.at['江苏万源新材料有限公司', '标准供应商名称'], '江苏万源新材料股份有限公司')
+            self.assertEqual(mapping.at['天津新供应商有限公司', '标准供应商名称'], '天津新供应商有限公司')
+
+
+if __name__ == '__main__':
+    unittest.main()
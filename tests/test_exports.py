@@ -0,0 +1,30 @@
+import os
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+from exports import clean_exports, export_table
+
+
+class ExportTableTest(unittest.TestCase):
+    def test_sessions_do_not_overwrite_each_other(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = export_table(pd.DataFrame({'a': [1]}), 'CSV', directory, '供应商明细', version='abc123')
+            second = export_table(pd.DataFrame({'a': [2]}), 'CSV', directory, '供应商明细', version='abc123')
+            self.assertNotEqual(first, second)
+            self.assertIn('abc123', os.path.basename(first))
+            self.assertEqual(pd.read_csv(first, encoding='utf-8-sig')['a'].tolist(), [1])
+
+    def test_old_and_surplus_exports_are_removed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [export_table(pd.DataFrame({'a': [i]}), 'CSV', directory, f't{i}') for i in range(4)]
+            stale = time.time() - 7200
+            os.utime(paths[0], (stale, stale))
+            clean_exports(directory, max_age=3600, keep=2)
+            self.assertEqual(sorted(os.listdir(directory)), sorted(os.path.basename(path) for path in paths[2:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
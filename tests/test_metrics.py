@@ -0,0 +1,33 @@
+import os
+import tempfile
+import unittest
+
+from metrics import LAST_DATA_UPDATE, observe_data
+from shared_data import source_mtime
+from tests.test_datastore import small_store
+
+
+class SourceMtimeTest(unittest.TestCase):
+    def test_newest_source_or_delta_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = {}
+            for i, name in enumerate(['a.csv', 'b.csv', 'alias.csv', os.path.join('deltas', '入库增量_2025-01.csv')]):
+                path = os.path.join(directory, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                open(path, 'w').close()
+                os.utime(path, (1000 + i, 1000 + i))
+                paths[name] = path
+            mtime = source_mtime({'a': paths['a.csv'], 'b': paths['b.csv']}, paths['alias.csv'],
+                                 os.path.join(directory, 'deltas'))
+            self.assertEqual(mtime, 1003)
+            # 重新加载不改变源文件时，更新时间保持不变
+            self.assertEqual(source_mtime({'a': paths['a.csv']}, paths['alias.csv'], os.path.join(directory, 'missing')),
+                             1002)
+
+    def test_reload_does_not_reset_update_time(self):
+        store = small_store()
+        observe_data(store)
+        first = LAST_DATA_UPDATE.values[()]
+        observe_data(store)
+        self.assertEqual(LAST_DATA_UPDATE.values[()], first)
+        self.assertEqual(first, source_mtime())
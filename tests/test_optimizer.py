@@ -0,0 +1,34 @@
+import unittest
+
+import pandas as pd
+
+from optimizer import optimize_reallocation
+
+
+class OptimizeReallocationTest(unittest.TestCase):
+    def test_any_year_pair(self):
+        # 2023 → 2024：S1 可在两家供应商之间调整，S2 只有一家供应商，份额上限下不可行
+        supplier_data = pd.DataFrame({
+            '供应商': ['甲', '乙', '丙'],
+            'Category': ['C1', 'C1', 'C1'],
+            'Sub Category': ['S1', 'S1', 'S2'],
+            '2023合计入库金额': [80.0, 40.0, 50.0],
+            '2024合计入库金额': [90.0, 10.0, 60.0],
+        })
+        shifts, summary = optimize_reallocation(
+            supplier_data, budget_col='2024合计入库金额', volume_col='2023合计入库金额', max_share=60
+        )
+        self.assertIn('2024合计入库金额', summary.columns)
+        self.assertNotIn('2025合计预算金额', summary.columns)
+        status = summary.set_index('Sub Category')['状态']
+        self.assertEqual(status['S1'], '已优化')
+        self.assertEqual(status['S2'], '不可行')
+        infeasible = summary[summary['状态'] == '不可行']
+        self.assertEqual(infeasible['2024合计入库金额'].tolist(), [60.0])
+        proposed = shifts.set_index('供应商')['建议预算金额']
+        self.assertAlmostEqual(proposed['甲'], 60.0, places=3)
+        self.assertAlmostEqual(proposed['乙'], 40.0, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import sys
+import threading
+import unittest
+
+from profiling import start_profile, stop_abandoned
+
+
+class StopAbandonedTest(unittest.TestCase):
+    def test_profile_left_by_finished_thread_is_disabled(self):
+        # 模拟以 st.stop() 或异常结束的重跑：开始剖析的线程结束时没有停用剖析器
+        thread = threading.Thread(target=start_profile)
+        thread.start()
+        thread.join()
+        if sys.version_info >= (3, 12):
+            self.assertIsNone(start_profile())
+        stop_abandoned()
+        profiler = start_profile()
+        self.assertIsNotNone(profiler)
+        # 同一线程的下一次重跑（st.rerun()）
+        stop_abandoned()
+        self.assertIsNotNone(start_profile())
+        stop_abandoned()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+import pandas as pd
+
+from config import FACTORIES
+from scenario import build_scenario_base, run_monte_carlo
+
+
+def small_base():
+    supplier_data = pd.DataFrame({'供应商': ['甲公司', '乙公司'], 'Category': ['C1', 'C2'], 'Sub Category': ['S1', 'S2']})
+    for factory in FACTORIES:
+        supplier_data[f'2025{factory}预算金额'] = [10.0, 20.0]
+    supplier_data['2025合计预算金额'] = [10.0 * len(FACTORIES), 20.0 * len(FACTORIES)]
+    return build_scenario_base(supplier_data)
+
+
+class RunMonteCarloTest(unittest.TestCase):
+    def test_scenario_count_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            run_monte_carlo(small_base(), ['C1'], 0.2, n_scenarios=0)
+
+    def test_results_span_chunks(self):
+        results = run_monte_carlo(small_base(), ['C1'], 0.2, n_scenarios=7, chunk_size=3, seed=1)
+        self.assertEqual(len(results['total']), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from shared_data import bind_store, clear_current, set_current, source_fingerprint
+from tests.test_datastore import small_store
+
+
+class BindStoreTest(unittest.TestCase):
+    def tearDown(self):
+        clear_current()
+
+    def test_published_object_is_not_replaced_in_place(self):
+        fingerprint = source_fingerprint()
+        loaded = small_store()
+        store, _ = bind_store((loaded, {}, fingerprint), root='')
+        self.assertIs(store, loaded)
+        # 追加增量得到的新对象：之后的绑定使用新对象，已绑定的旧对象不变
+        updated = small_store()
+        set_current(updated, {}, fingerprint)
+        self.assertIs(bind_store((loaded, {}, fingerprint), root='')[0], updated)
+        self.assertIs(store, loaded)
+
+    def test_nothing_loaded(self):
+        clear_current()
+        self.assertIsNone(bind_store(root=''))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from snapshots import list_snapshots, save_snapshot
+
+
+class SaveSnapshotTest(unittest.TestCase):
+    def test_concurrent_writers_keep_every_version(self):
+        frame = pd.DataFrame({'供应商': ['甲公司', '乙公司'], '2024合计入库金额': [1.0, 2.0]})
+        versions = [f'v{i:03d}' for i in range(40)]
+        with tempfile.TemporaryDirectory() as directory:
+            with ThreadPoolExecutor(8) as pool:
+                # 每个版本由两个 writer 同时保存
+                list(pool.map(lambda version: save_snapshot(frame, version, directory), versions * 2))
+            manifest = list_snapshots(directory)
+        self.assertEqual(sorted(manifest['版本']), versions)
+        self.assertTrue((manifest['行数'] == 2).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
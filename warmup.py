@@ -0,0 +1,61 @@
+"""冷启动优化：首屏之后才用到的重模块延迟导入，并在首屏渲染后于后台线程预先加载。
+
+worker 启动后的第一次重跑原本在渲染第一个元素之前就要导入 plotly.express 与全部页面的计算模块；
+pandas 的 Styler 在第一次 .style 时还会导入 matplotlib。现在 app.py 在侧边栏渲染之后、各页面渲染之前才导入它们，
+config.WARM_UP 为 background（默认）时在首屏之后启动一个后台线程预先导入，并构建一个小图表、渲染一个带色阶的 Styler，
+让 plotly 模板、图表校验器、jinja2 模板和 matplotlib 色图在数据加载期间就绪。
+WARM_UP 为 eager 时在首屏之前同步导入页面模块，即原来的行为，用于 startup.py 对比；为 off 时不预热。
+"""
+import importlib
+import threading
+import time
+
+from config import WARM_UP
+
+# 原来在 app.py 顶部导入的页面模块：plotly.express 与各页面的计算（analytics.sections 导入全部子模块）
+VIEW_MODULES = ['plotly.express', 'plotly.graph_objects', 'analytics.sections']
+# 首屏之后第一次用到时才导入的模块：Styler（导入 matplotlib）与 Parquet 读取
+DEFERRED_MODULES = ['pandas.io.formats.style', 'matplotlib.colors', 'pyarrow.parquet']
+
+_lock = threading.Lock()
+_thread = None
+# 本进程的预热情况，显示在性能调试面板中
+status = {'mode': WARM_UP, 'started': None, 'seconds': None, 'modules': {}, 'error': None}
+
+
+def import_modules(names):
+    """按顺序导入模块，记录每个模块的导入耗时（已导入的模块耗时接近0）。"""
+    for name in names:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        status['modules'].setdefault(name, time.perf_counter() - start)
+
+
+def _render_samples():
+    import pandas as pd
+    import plotly.express as px
+
+    px.bar(x=[0, 1], y=[1, 2], title='warm-up').to_json()
+    pd.DataFrame({'a': [1.0, 2.0]}).style.format('{:.1f}').background_gradient(cmap='YlOrRd').to_html()
+
+
+def warm_up():
+    """同步预热全部模块；失败只记录，不影响看板。"""
+    status['started'] = time.time()
+    start = time.perf_counter()
+    try:
+        import_modules(VIEW_MODULES + DEFERRED_MODULES)
+        _render_samples()
+    except Exception as e:  # 预热只是优化，任何失败都留给真正用到时再报错
+        status['error'] = repr(e)
+    status['seconds'] = time.perf_counter() - start
+
+
+def start_warm_up():
+    """首屏渲染后调用：每个进程只启动一次后台预热线程。"""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+            _thread.start()
+    return _thread